@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.contrib import admin
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin, TabularInline
 from unfold.decorators import display, action
+from .compaction import compact_abandoned_carts
 from .models import Cart, CartItem
+from .versioning import change_cart, delete_items
 
 
 class CartItemInline(TabularInline):
@@ -54,7 +57,22 @@ class CartAdmin(ModelAdmin):
     )
     date_hierarchy = "updated_at"
     list_per_page = 20
-    actions = ["clear_carts", "delete_empty_carts"]
+    actions = ["clear_carts", "delete_empty_carts", "compact_abandoned"]
+
+    def save_formset(self, request, form, formset, change):
+        # Admin o'zgarishlari ham savat versiyasini oshiradi (mijoz deltasi uchun)
+        with change_cart(cart=form.instance) as cart_change:
+            instances = formset.save(commit=False)
+            for obj in instances:
+                obj.version = cart_change.version
+                obj.save()
+            deleted = [obj.pk for obj in formset.deleted_objects]
+            for obj in formset.deleted_objects:
+                obj.delete()
+            if instances:
+                cart_change.mark_changed()
+            cart_change.mark_removed(deleted)
+            formset.save_m2m()
 
     @display(description="Foydalanuvchi")
     def display_user(self, obj):
@@ -101,8 +119,8 @@ class CartAdmin(ModelAdmin):
     def clear_carts(self, request, queryset):
         count = 0
         for cart in queryset:
-            count += cart.items.count()
-            cart.items.all().delete()
+            with change_cart(cart=cart) as change:
+                count += delete_items(change, change.cart.items.all())
         self.message_user(request, f"{count} ta element {queryset.count()} ta savatdan o'chirildi.")
 
     @action(description="Bo'sh savatlarni o'chirish", icon="cleaning_services")
@@ -110,3 +128,14 @@ class CartAdmin(ModelAdmin):
         empty = [c.pk for c in queryset if c.items_count == 0]
         deleted = Cart.objects.filter(pk__in=empty).delete()[0]
         self.message_user(request, f"{deleted} ta bo'sh savat o'chirildi.")
+
+    @action(description="Tashlab ketilgan savatlarni tozalash", icon="auto_delete")
+    def compact_abandoned(self, request, queryset):
+        # So'rov ichida, bo'laklab (CART_COMPACTION_BATCH_SIZE) — fon oqimi
+        # worker qayta ishga tushganda jimgina yo'qolardi
+        freed = compact_abandoned_carts(queryset=queryset)
+        self.message_user(
+            request,
+            f"{freed['carts']} ta savat, {freed['items']} ta element o'chirildi "
+            f"({settings.CART_IDLE_DAYS} kundan beri o'zgarmaganlar).",
+        )
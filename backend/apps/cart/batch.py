@@ -0,0 +1,107 @@
+"""Savatga bir nechta o'zgarishni bitta tranzaksiyada qo'llash.
+
+Operatsiyalar (`add` — qo'shish, `set` — miqdorni o'rnatish, 0 bo'lsa
+o'chirish, `remove` — o'chirish) xotirada ketma-ket qo'llanadi, so'ng natija
+bitta bulk upsert (`ON CONFLICT (cart, product, size) DO UPDATE`) va bitta
+DELETE bilan yoziladi. Savat qatori qulflanadi (`change_cart`) — parallel
+batch'lar bir-birini ustidan yozmaydi, butun batch bitta versiya beradi.
+"""
+from django.db import connection
+
+from apps.products.models import Product
+
+from .models import CartItem
+from .versioning import change_cart
+
+MAX_QUANTITY = 99
+
+# PostgreSQL'da LEAST, SQLite'da ikki argumentli MIN — ikkalasi ham
+# `INSERT ... ON CONFLICT DO UPDATE` ni qo'llaydi
+_SMALLER = {"postgresql": "LEAST", "sqlite": "MIN"}
+
+
+def add_item(change, product_id, size, quantity):
+    """Elementni bitta SQL bilan qo'shish yoki miqdorini oshirish (99 gacha).
+
+    O'qish-o'zgartirish-yozish yo'q: ikki marta bosish ham, parallel
+    so'rovlar ham miqdorni yo'qotmaydi va `unique_together` xatosi bermaydi.
+    `(id, quantity)` qaytaradi.
+    """
+    qn = connection.ops.quote_name
+    table = qn(CartItem._meta.db_table)
+    smaller = _SMALLER.get(connection.vendor, "LEAST")
+    sql = (
+        f"INSERT INTO {table} ({qn('cart_id')}, {qn('product_id')}, {qn('size')}, "
+        f"{qn('quantity')}, {qn('version')}) VALUES (%s, %s, %s, %s, %s) "
+        f"ON CONFLICT ({qn('cart_id')}, {qn('product_id')}, {qn('size')}) DO UPDATE SET "
+        f"{qn('quantity')} = {smaller}({table}.{qn('quantity')} + EXCLUDED.{qn('quantity')}, %s), "
+        f"{qn('version')} = EXCLUDED.{qn('version')} "
+        f"RETURNING {qn('id')}, {qn('quantity')}"
+    )
+    params = [change.cart.pk, product_id, size, min(quantity, MAX_QUANTITY), change.version, MAX_QUANTITY]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    change.mark_changed()
+    return row
+
+
+def apply_cart_operations(user, operations, request=None):
+    """`(cart, skipped)` qaytaradi; `skipped` — qo'llanmagan operatsiyalar.
+
+    `request` berilsa If-Match tekshiriladi (`change_cart`).
+    """
+    product_ids = {op["product_id"] for op in operations}
+    with change_cart(user, request=request) as change:
+        cart = change.cart
+        items = {
+            (item.product_id, item.size): item
+            for item in CartItem.objects.filter(cart=cart, product_id__in=product_ids)
+        }
+        available = dict(
+            Product.objects.filter(id__in=product_ids, is_active=True)
+            .order_by()
+            .values_list("id", "in_stock")
+        )
+
+        quantities = {key: item.quantity for key, item in items.items()}
+        skipped = []
+        for index, op in enumerate(operations):
+            key = (op["product_id"], op["size"])
+            if op["op"] == "remove" or (op["op"] == "set" and op["quantity"] == 0):
+                quantities[key] = 0
+                continue
+            if op["product_id"] not in available:
+                skipped.append({"index": index, "error": "Mahsulot topilmadi"})
+                continue
+            if not available[op["product_id"]]:
+                skipped.append({"index": index, "error": "Mahsulot sotuvda yo'q"})
+                continue
+            current = quantities.get(key, 0) if op["op"] == "add" else 0
+            quantities[key] = min(current + op["quantity"], MAX_QUANTITY)
+
+        upserts, removed = [], []
+        for (product_id, size), quantity in quantities.items():
+            existing = items.get((product_id, size))
+            if not quantity:
+                if existing:
+                    removed.append(existing.pk)
+            elif existing is None or existing.quantity != quantity:
+                upserts.append(
+                    CartItem(
+                        cart=cart, product_id=product_id, size=size, quantity=quantity, version=change.version
+                    )
+                )
+
+        if upserts:
+            CartItem.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=["cart", "product", "size"],
+                update_fields=["quantity", "version"],
+            )
+            change.mark_changed()
+        if removed:
+            CartItem.objects.filter(pk__in=removed).delete()
+            change.mark_removed(removed)
+    return cart, skipped
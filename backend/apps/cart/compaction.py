@@ -0,0 +1,69 @@
+"""Tashlab ketilgan savatlarni tozalash.
+
+`CART_IDLE_DAYS` kundan beri o'zgarmagan savatlar elementlari va
+tombstone'lari bilan birga o'chiriladi (foydalanuvchi qaytsa, bo'sh savat
+qayta yaratiladi; eski versiyali mijoz to'liq savat oladi).
+
+Nomzodlar server-side cursor (`iterator`) bilan o'qiladi, o'chirish esa
+`batch_size` tadan qisqa tranzaksiyalarda: savat qatorlari
+`select_for_update(skip_locked=True)` bilan olinadi — hozir checkout yoki
+savat o'zgarishi ushlab turgan qatorlar kutilmaydi, o'tkazib yuboriladi.
+Admin amali ham shu yo'l bilan, so'rov ichida ishlaydi: tanlov id ro'yxati
+emas, queryset (subquery) sifatida uzatiladi.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Cart, CartItem, CartItemTombstone
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for value in iterable:
+        chunk.append(value)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _compact_chunk(cart_ids, cutoff):
+    with transaction.atomic():
+        locked = list(
+            Cart.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=cart_ids, updated_at__lt=cutoff)
+            .values_list("pk", flat=True)
+        )
+        if not locked:
+            return {}
+        # Elementlar va tombstone'lar kaskad bilan — har biri bitta DELETE
+        _, deleted = Cart.objects.filter(pk__in=locked).delete()
+    return deleted
+
+
+def compact_abandoned_carts(days=None, batch_size=None, queryset=None):
+    """Eski savatlarni bo'laklab o'chirish.
+
+    `queryset` — faqat shu savatlar orasidan (masalan, admin tanlovi).
+    `{"carts": .., "items": .., "tombstones": ..}` — bo'shatilgan qatorlar.
+    """
+    days = settings.CART_IDLE_DAYS if days is None else days
+    batch_size = batch_size or settings.CART_COMPACTION_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    candidates = Cart.objects.filter(updated_at__lt=cutoff)
+    if queryset is not None:
+        candidates = candidates.filter(pk__in=queryset.order_by().values("pk"))
+    ids = candidates.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=batch_size)
+
+    labels = {"carts": Cart, "items": CartItem, "tombstones": CartItemTombstone}
+    freed = dict.fromkeys(labels, 0)
+    for chunk in _chunks(ids, batch_size):
+        deleted = _compact_chunk(chunk, cutoff)
+        for key, model in labels.items():
+            freed[key] += deleted.get(model._meta.label, 0)
+    return freed
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.cart.compaction import compact_abandoned_carts
+
+
+class Command(BaseCommand):
+    help = (
+        "Uzoq vaqt o'zgarmagan savatlarni elementlari bilan o'chirish. Qisqa "
+        "tranzaksiyalarda ishlaydi — band savatlar o'tkazib yuboriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.CART_IDLE_DAYS)
+        parser.add_argument("--batch-size", type=int, default=settings.CART_COMPACTION_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        freed = compact_abandoned_carts(days=options["days"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"O'chirildi: {freed['carts']} ta savat, {freed['items']} ta element, "
+            f"{freed['tombstones']} ta tombstone."
+        ))
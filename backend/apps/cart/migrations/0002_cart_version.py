@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:37
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='cartitem',
+            name='quantity',
+            field=models.PositiveIntegerField(default=1, validators=[django.core.validators.MaxValueValidator(99)]),
+        ),
+        migrations.CreateModel(
+            name='CartItemTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_id', models.PositiveBigIntegerField()),
+                ('version', models.PositiveBigIntegerField()),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='cart.cart')),
+            ],
+            options={
+                'verbose_name': "O'chirilgan savat elementi",
+                'verbose_name_plural': "O'chirilgan savat elementlari",
+                'indexes': [models.Index(fields=['cart', 'version'], name='cart_cartit_cart_id_c28858_idx')],
+            },
+        ),
+    ]
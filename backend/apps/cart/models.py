@@ -11,6 +11,9 @@ class Cart(models.Model):
     user = models.OneToOneField(
         TelegramUser, on_delete=models.CASCADE, related_name="cart"
     )
+    # Har bir element o'zgarishida oshadi (versioning.py) — delta javoblar
+    # va If-Match tekshiruvi uchun
+    version = models.PositiveBigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -44,6 +47,8 @@ class CartItem(models.Model):
         validators=[MaxValueValidator(99)],
     )
     size = models.CharField(max_length=50, blank=True)
+    # Savatning shu element oxirgi marta o'zgargan versiyasi
+    version = models.PositiveBigIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Savat elementi"
@@ -56,3 +61,19 @@ class CartItem(models.Model):
     @property
     def subtotal(self):
         return self.product.price * self.quantity
+
+
+class CartItemTombstone(models.Model):
+    """O'chirilgan savat elementi izi — delta javobda `removed` uchun"""
+
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="tombstones")
+    item_id = models.PositiveBigIntegerField()
+    version = models.PositiveBigIntegerField()
+
+    class Meta:
+        verbose_name = "O'chirilgan savat elementi"
+        verbose_name_plural = "O'chirilgan savat elementlari"
+        indexes = [models.Index(fields=["cart", "version"])]
+
+    def __str__(self):
+        return f"#{self.item_id} (v{self.version})"
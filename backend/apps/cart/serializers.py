@@ -1,9 +1,9 @@
 from rest_framework import serializers
 from .models import Cart, CartItem
-from apps.products.serializers import ProductListSerializer
+from apps.products.serializers import ProductListSerializer, SparseFieldsMixin
 
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
     subtotal = serializers.DecimalField(max_digits=12, decimal_places=0, read_only=True)
 
@@ -12,14 +12,16 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ["id", "product", "quantity", "size", "subtotal"]
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total = serializers.DecimalField(max_digits=12, decimal_places=0, read_only=True)
     items_count = serializers.IntegerField(read_only=True)
+    delta = serializers.BooleanField(read_only=True)
+    removed = serializers.ListField(child=serializers.IntegerField(), read_only=True)
 
     class Meta:
         model = Cart
-        fields = ["id", "items", "total", "items_count"]
+        fields = ["id", "version", "delta", "items", "removed", "total", "items_count"]
 
 
 class AddToCartSerializer(serializers.Serializer):
@@ -30,3 +32,27 @@ class AddToCartSerializer(serializers.Serializer):
 
 class UpdateCartItemSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(min_value=0)
+
+
+class CartOperationSerializer(serializers.Serializer):
+    OPS = ["add", "set", "remove"]
+
+    op = serializers.ChoiceField(choices=OPS)
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, max_value=99, required=False)
+    size = serializers.CharField(required=False, allow_blank=True, default="")
+
+    def validate(self, attrs):
+        quantity = attrs.get("quantity")
+        if attrs["op"] == "add":
+            if quantity is None:
+                attrs["quantity"] = 1
+            elif quantity < 1:
+                raise serializers.ValidationError({"quantity": "Miqdor kamida 1 bo'lishi kerak"})
+        elif attrs["op"] == "set" and quantity is None:
+            raise serializers.ValidationError({"quantity": "Miqdor kiritilishi shart"})
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
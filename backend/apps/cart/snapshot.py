@@ -0,0 +1,66 @@
+"""Savatning o'qish modeli.
+
+Savat, elementlar, mahsulotlar (brend, kategoriya, asosiy rasm) va — to'liq
+shaklda — mahsulot rasmlari qat'iy sonli so'rovda yuklanadi: savat (1),
+elementlar JOIN mahsulotlar (1), rasmlar prefetch (1, `shape=card` da yo'q).
+`total` va `items_count` shu ro'yxatdan Python'da hisoblanadi.
+
+Mijoz versiyasi (`since`) berilsa — delta: `items` da faqat shu versiyadan
+keyin qo'shilgan/o'zgargan elementlar, `removed` da o'chirilganlar id'lari
+(+1 so'rov). Juda eski yoki noma'lum versiyaga to'liq savat qaytadi.
+"""
+from django.db.models import prefetch_related_objects
+
+from apps.products.serializers import get_shape_options
+
+from .models import Cart, CartItem, CartItemTombstone
+from .versioning import KEEP_VERSIONS
+
+
+class CartSnapshot:
+    """`CartSerializer` uchun tayyor savat ko'rinishi."""
+
+    def __init__(self, cart, items, since=None, removed=()):
+        self.id = cart.id
+        self.cart = cart
+        self.version = cart.version
+        self.total = sum((item.subtotal for item in items), 0)
+        self.items_count = sum(item.quantity for item in items)
+        self.delta = since is not None
+        self.items = [item for item in items if item.version > since] if self.delta else items
+        self.removed = list(removed)
+
+
+def items_queryset(cart, request=None):
+    """Elementlar so'rovi va serializatsiya uchun kerakli prefetch'lar."""
+    _, expand, card = get_shape_options(request)
+    queryset = CartItem.objects.filter(cart=cart).order_by("id")
+    if card:
+        related = ["product__brand", "product__primary_image"]
+        if "category" in expand:
+            related.append("product__category")
+        prefetch = ["product__images"] if "images" in expand else []
+        return queryset.select_related(*related), prefetch
+    related = ["product__brand", "product__category", "product__primary_image"]
+    return queryset.select_related(*related), ["product__images"]
+
+
+def build_cart_snapshot(cart, request=None, since=None):
+    if since is not None and not (cart.version - KEEP_VERSIONS <= since <= cart.version):
+        since = None
+    queryset, prefetch = items_queryset(cart, request)
+    removed = ()
+    if since is not None:
+        removed = CartItemTombstone.objects.filter(cart=cart, version__gt=since).values_list(
+            "item_id", flat=True
+        )
+    snapshot = CartSnapshot(cart, list(queryset), since, removed)
+    # Rasmlar faqat javobga tushadigan elementlar uchun
+    prefetch_related_objects(snapshot.items, *prefetch)
+    return snapshot
+
+
+def load_cart_snapshot(user, request=None, cart=None, since=None):
+    if cart is None:
+        cart, _ = Cart.objects.get_or_create(user=user)
+    return build_cart_snapshot(cart, request, since)
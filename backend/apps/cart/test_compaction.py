@@ -0,0 +1,65 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.cart.compaction import compact_abandoned_carts
+from apps.cart.models import Cart, CartItem, CartItemTombstone
+from apps.products.models import Category, Product
+from apps.users.models import TelegramUser
+
+
+class CartCompactionTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.product = Product.objects.create(name="A", price=Decimal("10000"), category=category)
+        self.old = [self._cart(1000 + i, days_ago=90) for i in range(5)]
+        self.fresh = self._cart(2000, days_ago=1)
+
+    def _cart(self, telegram_id, days_ago):
+        user = TelegramUser.objects.create(telegram_id=telegram_id, first_name="Test")
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=2)
+        CartItemTombstone.objects.create(cart=cart, item_id=1, version=1)
+        Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now() - timedelta(days=days_ago))
+        return cart
+
+    def test_deletes_idle_carts_in_batches(self):
+        freed = compact_abandoned_carts(days=30, batch_size=2)
+        self.assertEqual(freed, {"carts": 5, "items": 5, "tombstones": 5})
+        self.assertEqual(list(Cart.objects.values_list("pk", flat=True)), [self.fresh.pk])
+        self.assertEqual(CartItem.objects.count(), 1)
+
+    def test_only_selected_carts(self):
+        selected = Cart.objects.filter(pk__in=[self.old[0].pk, self.fresh.pk])
+        freed = compact_abandoned_carts(days=30, queryset=selected)
+        self.assertEqual(freed["carts"], 1)
+        self.assertEqual(Cart.objects.count(), 5)
+
+    def test_batch_queries_are_bounded(self):
+        # nomzodlar + har bo'lakda: savepoint (2) + qulf + kaskad yig'ish
+        # + elementlar + tombstone + savat — bo'lak hajmiga bog'liq emas
+        with self.assertNumQueries(1 + 3 * 7):
+            compact_abandoned_carts(days=30, batch_size=2)
+
+    def test_admin_action_runs_in_request_in_batches(self):
+        User.objects.create_superuser(username="admin", password="pass12345", email="a@a.uz")
+        self.client.login(username="admin", password="pass12345")
+        response = self.client.post(
+            "/admin/cart/cart/",
+            {"action": "compact_abandoned", "select_across": "1", "index": "0",
+             "_selected_action": [self.old[0].pk]},
+        )
+        messages = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn("5 ta savat, 5 ta element o'chirildi", messages[0])
+        self.assertEqual(list(Cart.objects.values_list("pk", flat=True)), [self.fresh.pk])
+
+    def test_command_reports_freed_rows(self):
+        out = StringIO()
+        call_command("compact_abandoned_carts", "--days", "30", stdout=out)
+        self.assertIn("5 ta savat, 5 ta element, 5 ta tombstone", out.getvalue())
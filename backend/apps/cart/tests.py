@@ -1,10 +1,12 @@
 from decimal import Decimal
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 
 from apps.users.models import TelegramUser
-from apps.products.models import Category, Product
-from apps.cart.models import Cart, CartItem
+from apps.products.models import Brand, Category, Product, ProductImage
+from apps.products.test_image_urls import TEST_MEDIA_ROOT, MediaTempMixin, make_image
+from apps.cart.models import Cart, CartItem, CartItemTombstone
+from apps.cart.versioning import KEEP_VERSIONS
 
 
 class CartModelTest(TestCase):
@@ -106,3 +108,257 @@ class CartAPITest(TestCase):
             format="json",
         )
         self.assertEqual(response.status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class CartSnapshotTest(MediaTempMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=555666777, first_name="Test")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Teri", slug="teri")
+        brand = Brand.objects.create(name="Nivea", slug="nivea")
+        self.cart = Cart.objects.create(user=self.user)
+        for i in range(4):
+            product = Product.objects.create(
+                name=f"Krem {i}", price=Decimal("10000") * (i + 1), category=category, brand=brand
+            )
+            ProductImage.objects.create(product=product, image=make_image(), is_main=True)
+            CartItem.objects.create(cart=self.cart, product=product, quantity=i + 1)
+
+    def test_get_cart_fixed_queries(self):
+        # savat + elementlar/mahsulotlar + rasmlar
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/cart/")
+        self.assertEqual(response.data["items_count"], 10)
+        self.assertEqual(response.data["total"], "300000")
+        self.assertEqual(response.data["items"][0]["product"]["brand"]["name"], "Nivea")
+        self.assertEqual(len(response.data["items"][3]["product"]["images"]), 1)
+
+    def test_card_shape_skips_images_table(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/cart/", {"shape": "card"})
+        self.assertTrue(response.data["items"][0]["product"]["main_image"].endswith(".jpg"))
+
+    def test_mutations_use_snapshot(self):
+        item = self.cart.items.order_by("id").first()
+        response = self.client.patch(f"/api/cart/items/{item.id}/", {"quantity": 5}, format="json")
+        self.assertEqual(response.data["items_count"], 14)
+        response = self.client.delete(f"/api/cart/items/{item.id}/remove/")
+        self.assertEqual(response.data["items_count"], 9)
+        self.assertEqual(len(response.data["items"]), 3)
+
+
+class CartBatchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=999000111, first_name="Test")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.a = Product.objects.create(name="A", price=Decimal("10000"), category=category)
+        self.b = Product.objects.create(name="B", price=Decimal("20000"), category=category)
+        self.c = Product.objects.create(name="C", price=Decimal("30000"), category=category, in_stock=False)
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.a, quantity=2)
+        CartItem.objects.create(cart=self.cart, product=self.b, quantity=1)
+
+    def _batch(self, operations):
+        return self.client.post("/api/cart/batch/", {"operations": operations}, format="json")
+
+    def _quantities(self):
+        return dict(CartItem.objects.filter(cart=self.cart).values_list("product__name", "quantity"))
+
+    def test_mixed_operations(self):
+        response = self._batch([
+            {"op": "add", "product_id": self.a.id, "quantity": 3},
+            {"op": "add", "product_id": self.a.id},
+            {"op": "remove", "product_id": self.b.id},
+            {"op": "set", "product_id": self.b.id, "quantity": 4, "size": "50 ml"},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["skipped"], [])
+        self.assertEqual(response.data["items_count"], 10)
+        self.assertEqual(
+            sorted(CartItem.objects.filter(cart=self.cart).values_list("product__name", "size", "quantity")),
+            [("A", "", 6), ("B", "50 ml", 4)],
+        )
+
+    def test_clamps_to_99_and_set_zero_removes(self):
+        self._batch([
+            {"op": "add", "product_id": self.a.id, "quantity": 99},
+            {"op": "set", "product_id": self.b.id, "quantity": 0},
+        ])
+        self.assertEqual(self._quantities(), {"A": 99})
+
+    def test_unavailable_products_are_skipped(self):
+        response = self._batch([
+            {"op": "add", "product_id": self.c.id},
+            {"op": "add", "product_id": 999999},
+            {"op": "add", "product_id": self.b.id},
+        ])
+        self.assertEqual([s["index"] for s in response.data["skipped"]], [0, 1])
+        self.assertEqual(self._quantities(), {"A": 2, "B": 2})
+
+    def test_invalid_payload_changes_nothing(self):
+        response = self._batch([
+            {"op": "add", "product_id": self.b.id},
+            {"op": "set", "product_id": self.a.id},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post("/api/cart/batch/", {"operations": []}, format="json").status_code, 400)
+        self.assertEqual(self._quantities(), {"A": 2, "B": 1})
+
+    def test_fixed_query_count(self):
+        operations = [{"op": "add", "product_id": self.b.id}] * 20 + [{"op": "remove", "product_id": self.a.id}]
+        # savepoint (2) + savat (qulf) + elementlar + mahsulotlar + upsert
+        # + delete + tombstone + versiya + snapshot (2) — operatsiyalar soniga bog'liq emas
+        with self.assertNumQueries(11):
+            self._batch(operations)
+
+
+class AddToCartUpsertTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=444555666, first_name="Test")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.product = Product.objects.create(name="A", price=Decimal("10000"), category=category)
+
+    def _add(self, quantity, size=""):
+        return self.client.post(
+            "/api/cart/add/", {"product_id": self.product.id, "quantity": quantity, "size": size}, format="json"
+        )
+
+    def test_repeated_adds_accumulate_and_clamp(self):
+        self._add(60)
+        self._add(30)
+        self.assertEqual(CartItem.objects.get().quantity, 90)
+        response = self._add(50)
+        self.assertEqual(response.data["items_count"], 99)
+        self.assertEqual(CartItem.objects.get().quantity, 99)
+
+    def test_sizes_are_separate_rows(self):
+        self._add(1)
+        self._add(2, "50 ml")
+        self.assertEqual(
+            sorted(CartItem.objects.values_list("size", "quantity")), [("", 1), ("50 ml", 2)]
+        )
+
+    def test_single_write_statement(self):
+        self._add(1)
+        # mahsulot + savepoint (2) + savat (qulf) + upsert + versiya + snapshot (2)
+        with self.assertNumQueries(8):
+            self._add(1)
+
+
+class CartVersionTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=777000111, first_name="Test")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.a = Product.objects.create(name="A", price=Decimal("10000"), category=category)
+        self.b = Product.objects.create(name="B", price=Decimal("20000"), category=category)
+
+    def _add(self, product, **headers):
+        return self.client.post("/api/cart/add/", {"product_id": product.id}, format="json", headers=headers)
+
+    def test_mutations_bump_version_and_etag(self):
+        self.assertEqual(self._add(self.a)["ETag"], '"v1"')
+        response = self._add(self.b)
+        self.assertEqual(response.data["version"], 2)
+        self.assertEqual(response["ETag"], '"v2"')
+
+    def test_not_modified(self):
+        self._add(self.a)
+        response = self.client.get("/api/cart/", headers={"If-None-Match": '"v1"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], '"v1"')
+
+    def test_product_change_invalidates_etag(self):
+        self._add(self.a)
+        self.a.price = Decimal("15000")
+        self.a.save()
+        response = self.client.get("/api/cart/", headers={"If-None-Match": '"v1"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"v2"')
+        self.assertTrue(response.data["delta"])
+        self.assertEqual(Decimal(response.data["items"][0]["product"]["price"]), Decimal("15000"))
+        self.assertEqual(Decimal(response.data["total"]), Decimal("15000"))
+
+    def test_filtered_stock_action_bumps_version(self):
+        from django.contrib.auth.models import User
+
+        self._add(self.a)
+        Product.objects.filter(pk=self.a.pk).update(in_stock=False)
+        User.objects.create_superuser(username="admin", password="pass12345", email="a@a.uz")
+        admin = APIClient()
+        admin.login(username="admin", password="pass12345")
+        admin.post(
+            "/admin/products/product/?in_stock__exact=0",
+            {"action": "mark_in_stock", "_selected_action": [self.a.pk]},
+        )
+        self.assertTrue(Product.objects.get(pk=self.a.pk).in_stock)
+        self.assertEqual(Cart.objects.get(user=self.user).version, 2)
+        response = self.client.get("/api/cart/", headers={"If-None-Match": '"v1"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_product_delete_appears_in_removed(self):
+        self._add(self.a)
+        self._add(self.b)
+        item_a = CartItem.objects.get(product=self.a)
+        self.a.delete()
+        response = self.client.get("/api/cart/", headers={"If-None-Match": '"v2"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["removed"], [item_a.id])
+        self.assertEqual(response.data["items"], [])
+        self.assertEqual(response.data["items_count"], 1)
+
+    def test_delta_since_version(self):
+        self._add(self.a)
+        self._add(self.b)
+        item_a = CartItem.objects.get(product=self.a)
+        self.client.delete(f"/api/cart/items/{item_a.id}/remove/")
+
+        response = self.client.get("/api/cart/", {"since": 1})
+        self.assertTrue(response.data["delta"])
+        self.assertEqual([i["product"]["name"] for i in response.data["items"]], ["B"])
+        self.assertEqual(response.data["removed"], [item_a.id])
+        # Jami summalar doim butun savat bo'yicha
+        self.assertEqual(response.data["items_count"], 1)
+
+        full = self.client.get("/api/cart/")
+        self.assertFalse(full.data["delta"])
+        self.assertEqual(full.data["removed"], [])
+
+    def test_mutation_with_if_match_returns_delta(self):
+        self._add(self.a)
+        response = self._add(self.b, **{"If-Match": '"v1"'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data["delta"])
+        self.assertEqual([i["product"]["name"] for i in response.data["items"]], ["B"])
+
+    def test_stale_if_match_is_rejected(self):
+        self._add(self.a)
+        self._add(self.a)
+        response = self._add(self.b, **{"If-Match": '"v1"'})
+        self.assertEqual(response.status_code, 412)
+        self.assertFalse(CartItem.objects.filter(product=self.b).exists())
+        self.assertEqual(Cart.objects.get(user=self.user).version, 2)
+
+    def test_too_old_version_returns_full_cart(self):
+        self._add(self.a)
+        Cart.objects.filter(user=self.user).update(version=KEEP_VERSIONS + 5)
+        response = self.client.get("/api/cart/", {"since": 1})
+        self.assertFalse(response.data["delta"])
+        self.assertEqual(len(response.data["items"]), 1)
+
+    def test_clear_records_tombstones(self):
+        self._add(self.a)
+        self._add(self.b)
+        response = self.client.delete("/api/cart/clear/", headers={"If-Match": '"v2"'})
+        self.assertEqual(sorted(response.data["removed"]), sorted(
+            CartItemTombstone.objects.values_list("item_id", flat=True)
+        ))
+        self.assertEqual(len(response.data["removed"]), 2)
+        self.assertEqual(response.data["version"], 3)
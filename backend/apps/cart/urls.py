@@ -7,4 +7,5 @@ urlpatterns = [
     path("cart/items/<int:item_id>/", views.update_cart_item, name="cart-update"),
     path("cart/items/<int:item_id>/remove/", views.remove_from_cart, name="cart-remove"),
     path("cart/clear/", views.clear_cart, name="cart-clear"),
+    path("cart/batch/", views.batch_cart, name="cart-batch"),
 ]
@@ -0,0 +1,136 @@
+"""Savat versiyalari.
+
+Har bir o'zgarish savat qatorini qulflab (`select_for_update`) bajariladi va
+savat `version` ini bittaga oshiradi. O'zgargan elementlar yangi versiya bilan
+belgilanadi, o'chirilganlar uchun tombstone yoziladi — shunda mijoz o'zidagi
+versiyadan beri nima qo'shilgan/o'zgargan/o'chirilganini oladi.
+
+Element javobida mahsulotning jonli ma'lumoti (narx, sotuvda borligi, nom,
+rasm) bor — mahsulot o'zgarganda yoki o'chirilganda uni o'z ichiga olgan
+savatlar versiyasi ham oshiriladi (`touch_product_carts`), aks holda mijoz
+eski narx bilan 304 olardi.
+
+Mijoz versiyasi: `?since=N`, GET uchun `If-None-Match: "vN"`, o'zgartirishlar
+uchun `If-Match: "vN"` (mos kelmasa 412).
+"""
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Cart, CartItem, CartItemTombstone
+
+# Tombstone'lar shuncha versiya saqlanadi; eskiroq versiyali mijoz to'liq savat oladi
+KEEP_VERSIONS = 100
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "Savat boshqa joyda o'zgargan — qayta yuklang"
+    default_code = "precondition_failed"
+
+
+def cart_etag(version):
+    return f'"v{version}"'
+
+
+def parse_version(value):
+    """`"v12"` / `W/"v12"` → 12, aks holda None."""
+    for tag in parse_etags(value or ""):
+        tag = tag.removeprefix("W/")
+        if tag.startswith('"v') and tag[2:-1].isdigit():
+            return int(tag[2:-1])
+    return None
+
+
+def client_version(request):
+    """Mijozdagi savat versiyasi (`?since=` yoki ETag sarlavhalaridan)."""
+    since = request.query_params.get("since", "")
+    if since.isdigit():
+        return int(since)
+    header = "If-None-Match" if request.method == "GET" else "If-Match"
+    return parse_version(request.headers.get(header))
+
+
+class CartChange:
+    def __init__(self, cart):
+        self.cart = cart
+        self.version = cart.version + 1
+        self.changed = False
+        self.removed_ids = []
+
+    def mark_changed(self):
+        self.changed = True
+
+    def mark_removed(self, item_ids):
+        self.removed_ids.extend(item_ids)
+
+    def commit(self):
+        if not (self.changed or self.removed_ids):
+            return
+        if self.removed_ids:
+            CartItemTombstone.objects.bulk_create(
+                CartItemTombstone(cart=self.cart, item_id=item_id, version=self.version)
+                for item_id in self.removed_ids
+            )
+            CartItemTombstone.objects.filter(
+                cart=self.cart, version__lte=self.version - KEEP_VERSIONS
+            ).delete()
+        Cart.objects.filter(pk=self.cart.pk).update(version=self.version, updated_at=timezone.now())
+        self.cart.version = self.version
+
+
+@contextmanager
+def change_cart(user=None, cart=None, request=None):
+    """Savatni qulflab o'zgartirish. `request` berilsa If-Match tekshiriladi.
+
+    Ichida o'zgargan elementlarga `change.version` yozilishi va
+    `mark_changed()` / `mark_removed(ids)` chaqirilishi kerak.
+    """
+    with transaction.atomic():
+        if cart is None:
+            cart, _ = Cart.objects.select_for_update().get_or_create(user=user)
+        else:
+            cart = Cart.objects.select_for_update().get(pk=cart.pk)
+        if request is not None and "If-Match" in request.headers:
+            expected = request.headers["If-Match"].strip()
+            if expected != "*" and parse_version(expected) != cart.version:
+                raise PreconditionFailed()
+        change = CartChange(cart)
+        yield change
+        change.commit()
+
+
+def delete_items(change, queryset):
+    """Elementlarni o'chirish va tombstone'ga yozish."""
+    item_ids = list(queryset.values_list("pk", flat=True))
+    if item_ids:
+        queryset.model.objects.filter(pk__in=item_ids).delete()
+        change.mark_removed(item_ids)
+    return len(item_ids)
+
+
+def touch_product_carts(product_ids, removed=False):
+    """Mahsulotlar bor savatlar versiyasini oshirish (set-based, 2-3 so'rov).
+
+    `removed=True` — mahsulot o'chirilmoqda (elementlar CASCADE bilan
+    o'chadi): elementlar uchun tombstone yoziladi. `updated_at` ataylab
+    o'zgartirilmaydi — u savatning foydalanuvchi faolligi (compaction).
+    """
+    items = CartItem.objects.filter(product_id__in=list(product_ids))
+    with transaction.atomic():
+        touched = Cart.objects.filter(pk__in=items.values("cart_id")).update(version=F("version") + 1)
+        if not touched:
+            return 0
+        if removed:
+            CartItemTombstone.objects.bulk_create(
+                CartItemTombstone(cart_id=cart_id, item_id=item_id, version=version)
+                for item_id, cart_id, version in items.values_list("pk", "cart_id", "cart__version")
+            )
+        else:
+            items.update(version=Subquery(Cart.objects.filter(pk=OuterRef("cart_id")).values("version")[:1]))
+    return touched
@@ -3,11 +3,15 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from .models import Cart, CartItem
+from .batch import add_item, apply_cart_operations
 from .serializers import (
     CartSerializer,
     AddToCartSerializer,
+    CartBatchSerializer,
     UpdateCartItemSerializer,
 )
+from .snapshot import build_cart_snapshot
+from .versioning import cart_etag, change_cart, client_version, delete_items
 from apps.products.models import Product
 
 
@@ -17,15 +21,31 @@ def get_or_create_cart(user):
     return cart
 
 
+def cart_response(request, cart=None, status_code=status.HTTP_200_OK):
+    """Savatning joriy holati (bitta o'qish modeli orqali).
+
+    Mijoz versiyasi ma'lum bo'lsa faqat o'zgarishlar (delta) qaytadi,
+    GET'da versiya o'zgarmagan bo'lsa — 304.
+    """
+    if cart is None:
+        cart = get_or_create_cart(request.user)
+    since = client_version(request)
+    if request.method == "GET" and since == cart.version:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        snapshot = build_cart_snapshot(cart, request, since)
+        response = Response(CartSerializer(snapshot, context={"request": request}).data, status=status_code)
+    response["ETag"] = cart_etag(cart.version)
+    return response
+
+
 @api_view(["GET"])
 def get_cart(request):
     """Savatni ko'rish"""
     if not hasattr(request.user, "telegram_id"):
         return Response({"error": "Avtorizatsiya talab qilinadi"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    cart = get_or_create_cart(request.user)
-    serializer = CartSerializer(cart)
-    return Response(serializer.data)
+    return cart_response(request)
 
 
 @api_view(["POST"])
@@ -38,28 +58,21 @@ def add_to_cart(request):
     serializer.is_valid(raise_exception=True)
     data = serializer.validated_data
 
-    try:
-        product = Product.objects.get(id=data["product_id"], is_active=True)
-    except Product.DoesNotExist:
+    in_stock = (
+        Product.objects.filter(id=data["product_id"], is_active=True)
+        .values_list("in_stock", flat=True)
+        .first()
+    )
+    if in_stock is None:
         return Response({"error": "Mahsulot topilmadi"}, status=status.HTTP_404_NOT_FOUND)
 
-    if not product.in_stock:
+    if not in_stock:
         return Response({"error": "Mahsulot sotuvda yo'q"}, status=status.HTTP_400_BAD_REQUEST)
 
-    cart = get_or_create_cart(request.user)
+    with change_cart(request.user, request=request) as change:
+        add_item(change, data["product_id"], data.get("size", ""), data["quantity"])
 
-    cart_item, created = CartItem.objects.get_or_create(
-        cart=cart,
-        product=product,
-        size=data.get("size", ""),
-        defaults={"quantity": data["quantity"]},
-    )
-
-    if not created:
-        cart_item.quantity += data["quantity"]
-        cart_item.save()
-
-    return Response(CartSerializer(cart).data, status=status.HTTP_201_CREATED)
+    return cart_response(request, change.cart, status.HTTP_201_CREATED)
 
 
 @api_view(["PATCH"])
@@ -80,14 +93,16 @@ def update_cart_item(request, item_id):
 
     quantity = serializer.validated_data["quantity"]
 
-    if quantity == 0:
-        cart_item.delete()
-    else:
-        cart_item.quantity = quantity
-        cart_item.save()
+    with change_cart(request.user, request=request) as change:
+        if quantity == 0:
+            delete_items(change, CartItem.objects.filter(pk=cart_item.pk))
+        else:
+            cart_item.quantity = quantity
+            cart_item.version = change.version
+            cart_item.save()
+            change.mark_changed()
 
-    cart = get_or_create_cart(request.user)
-    return Response(CartSerializer(cart).data)
+    return cart_response(request, change.cart)
 
 
 @api_view(["DELETE"])
@@ -96,16 +111,11 @@ def remove_from_cart(request, item_id):
     if not hasattr(request.user, "telegram_id"):
         return Response({"error": "Avtorizatsiya talab qilinadi"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    try:
-        cart_item = CartItem.objects.get(
-            id=item_id, cart__user=request.user
-        )
-        cart_item.delete()
-    except CartItem.DoesNotExist:
-        return Response({"error": "Element topilmadi"}, status=status.HTTP_404_NOT_FOUND)
+    with change_cart(request.user, request=request) as change:
+        if not delete_items(change, CartItem.objects.filter(id=item_id, cart=change.cart)):
+            return Response({"error": "Element topilmadi"}, status=status.HTTP_404_NOT_FOUND)
 
-    cart = get_or_create_cart(request.user)
-    return Response(CartSerializer(cart).data)
+    return cart_response(request, change.cart)
 
 
 @api_view(["DELETE"])
@@ -114,7 +124,24 @@ def clear_cart(request):
     if not hasattr(request.user, "telegram_id"):
         return Response({"error": "Avtorizatsiya talab qilinadi"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    cart = get_or_create_cart(request.user)
-    cart.items.all().delete()
+    with change_cart(request.user, request=request) as change:
+        delete_items(change, change.cart.items.all())
+
+    return cart_response(request, change.cart)
+
+
+@api_view(["POST"])
+def batch_cart(request):
+    """Bir nechta savat o'zgarishini bitta tranzaksiyada qo'llash"""
+    if not hasattr(request.user, "telegram_id"):
+        return Response({"error": "Avtorizatsiya talab qilinadi"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    serializer = CartBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
 
-    return Response(CartSerializer(cart).data)
+    cart, skipped = apply_cart_operations(
+        request.user, serializer.validated_data["operations"], request=request
+    )
+    response = cart_response(request, cart)
+    response.data["skipped"] = skipped
+    return response
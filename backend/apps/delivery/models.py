@@ -7,6 +7,7 @@ class Region(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name="Nomi")
     is_active = models.BooleanField(default=True, verbose_name="Faol")
     ordering = models.PositiveIntegerField(default=0, verbose_name="Tartib")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="O'zgartirilgan")
 
     class Meta:
         verbose_name = "Viloyat"
@@ -48,6 +49,7 @@ class DeliveryZone(models.Model):
     )
     is_active = models.BooleanField(default=True, verbose_name="Faol")
     ordering = models.PositiveIntegerField(default=0, verbose_name="Tartib")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="O'zgartirilgan")
 
     class Meta:
         verbose_name = "Yetkazish zonasi"
@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.delivery.models import DeliveryZone, Region
+
+
+class DeliveryConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.region = Region.objects.create(name="Test viloyati")
+        self.zone = DeliveryZone.objects.create(region=self.region, name="Markaz", fee=Decimal("20000"))
+
+    def test_304_after_probe_only(self):
+        etag = self.client.get("/api/delivery/regions/")["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/delivery/regions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_zone_change_invalidates_regions(self):
+        etag = self.client.get("/api/delivery/regions/")["ETag"]
+        self.zone.fee = Decimal("25000")
+        self.zone.save()
+        response = self.client.get("/api/delivery/regions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_zone_delete_invalidates(self):
+        etag = self.client.get("/api/delivery/zones/", {"region": self.region.id})["ETag"]
+        DeliveryZone.objects.create(region=self.region, name="Chekka").delete()
+        response = self.client.get(
+            "/api/delivery/zones/", {"region": self.region.id}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        self.zone.delete()
+        response = self.client.get(
+            "/api/delivery/zones/", {"region": self.region.id}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
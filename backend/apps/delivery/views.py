@@ -1,12 +1,15 @@
 from rest_framework import viewsets, permissions
 
+from apps.products.conditional import ConditionalGetMixin
+
 from .models import Region, DeliveryZone
 from .serializers import RegionSerializer, DeliveryZoneSerializer
 
 
-class RegionViewSet(viewsets.ReadOnlyModelViewSet):
+class RegionViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Faol viloyatlar ro'yxati (zonalari bilan)."""
 
+    conditional_models = [Region, DeliveryZone]
     queryset = (
         Region.objects.filter(is_active=True)
         .prefetch_related("zones")
@@ -17,9 +20,10 @@ class RegionViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
 
-class DeliveryZoneViewSet(viewsets.ReadOnlyModelViewSet):
+class DeliveryZoneViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Yetkazish zonalari. ?region=ID filterini qo'llab-quvvatlaydi."""
 
+    conditional_models = [DeliveryZone, Region]
     serializer_class = DeliveryZoneSerializer
     permission_classes = [permissions.AllowAny]
     pagination_class = None
@@ -1,17 +1,19 @@
-import logging
-
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db import transaction
 from django.db.models import Count
+from django.utils import timezone
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin, TabularInline
 from unfold.contrib.import_export.forms import ExportForm
 from unfold.decorators import display, action
 from import_export import resources
 from import_export.admin import ExportMixin
-from .models import Order, OrderItem
-from .utils import send_status_notification
-
-logger = logging.getLogger(__name__)
+from .export import export_response
+from .models import Notification, Order, OrderItem
+from .rollup import record_orders, track_orders
+from .transitions import transition_orders
+from .utils import queue_status_notifications
 
 
 class OrderResource(resources.ModelResource):
@@ -36,10 +38,10 @@ class OrderItemInline(TabularInline):
 
     @display(description="Mahsulot")
     def display_product(self, obj):
-        if obj.product:
+        if obj.product_name:
             return format_html(
                 '<span class="font-medium">{}</span>',
-                obj.product.name
+                obj.product_name
             )
         return "—"
 
@@ -52,8 +54,25 @@ class OrderItemInline(TabularInline):
         return format_html('<span class="font-semibold {}">{} so\'m</span>', color, profit_formatted)
 
 
+class OrderAdminForm(forms.ModelForm):
+    class Meta:
+        model = Order
+        fields = "__all__"
+
+    def clean_status(self):
+        status = self.cleaned_data["status"]
+        current = self.instance.status if self.instance.pk else None
+        if current and status != current and not self.instance.can_transition(status):
+            raise forms.ValidationError(
+                f"«{self.instance.get_status_display()}» holatidan "
+                f"«{dict(Order.STATUS_CHOICES)[status]}» ga o'tib bo'lmaydi."
+            )
+        return status
+
+
 @admin.register(Order)
 class OrderAdmin(ExportMixin, ModelAdmin):
+    form = OrderAdminForm
     export_form_class = ExportForm
     resource_classes = [OrderResource]
     list_display = [
@@ -78,7 +97,10 @@ class OrderAdmin(ExportMixin, ModelAdmin):
     date_hierarchy = "created_at"
     list_per_page = 20
     save_on_top = True
-    actions = ["mark_confirmed", "mark_processing", "mark_shipped", "mark_delivered", "mark_cancelled", "mark_paid", "mark_unpaid"]
+    actions = [
+        "mark_confirmed", "mark_processing", "mark_shipped", "mark_delivered", "mark_cancelled", "mark_paid", "mark_unpaid",
+        "export_orders_csv", "export_orders_xlsx", "export_lines_csv", "export_lines_xlsx",
+    ]
 
     fieldsets = (
         ("Buyurtma", {
@@ -164,59 +186,68 @@ class OrderAdmin(ExportMixin, ModelAdmin):
 
     @action(description="To'langan deb belgilash", icon="payments")
     def mark_paid(self, request, queryset):
-        queryset.update(is_paid=True)
+        with track_orders(queryset.values_list("pk", flat=True)):
+            queryset.update(is_paid=True)
         self.message_user(request, f"{queryset.count()} ta buyurtma to'langan deb belgilandi.")
 
     @action(description="To'lanmagan deb belgilash", icon="money_off")
     def mark_unpaid(self, request, queryset):
-        queryset.update(is_paid=False)
+        with track_orders(queryset.values_list("pk", flat=True)):
+            queryset.update(is_paid=False)
         self.message_user(request, f"{queryset.count()} ta buyurtma to'lanmagan deb belgilandi.")
 
+    def _export(self, queryset, kind, fmt):
+        """Tanlangan (yoki filtrdagi barcha) buyurtmalar — oqim bilan eksport."""
+        filename = f"ziyora-{kind}-{timezone.localdate():%Y-%m-%d}"
+        return export_response(queryset, kind, fmt, filename)
+
+    @action(description="Eksport: buyurtmalar (CSV)", icon="download")
+    def export_orders_csv(self, request, queryset):
+        return self._export(queryset, "orders", "csv")
+
+    @action(description="Eksport: buyurtmalar (XLSX)", icon="download")
+    def export_orders_xlsx(self, request, queryset):
+        return self._export(queryset, "orders", "xlsx")
+
+    @action(description="Eksport: elementlar (CSV)", icon="download")
+    def export_lines_csv(self, request, queryset):
+        return self._export(queryset, "lines", "csv")
+
+    @action(description="Eksport: elementlar (XLSX)", icon="download")
+    def export_lines_xlsx(self, request, queryset):
+        return self._export(queryset, "lines", "xlsx")
+
     def _bulk_status_update(self, request, queryset, new_status, message):
-        """Ommaviy status yangilash va notification yuborish."""
-        for order in queryset.select_related("user"):
-            order.status = new_status
-            order.save(update_fields=["status"])
-            try:
-                send_status_notification(order, new_status)
-            except Exception as e:
-                logger.error(f"Failed to send notification for order #{order.id}: {e}")
-        self.message_user(request, message)
+        """Ommaviy status yangilash — bitta UPDATE, xabarlar navbatga (yuborish fonda)."""
+        orders, skipped = transition_orders(queryset, new_status)
+        self.message_user(request, message.format(len(orders)))
+        if skipped:
+            self.message_user(
+                request,
+                f"{skipped} ta buyurtma o'tkazib yuborildi: joriy holatidan "
+                f"«{dict(Order.STATUS_CHOICES)[new_status]}» ga o'tib bo'lmaydi.",
+                messages.WARNING,
+            )
 
     @action(description="Tasdiqlash", icon="check_circle")
     def mark_confirmed(self, request, queryset):
-        self._bulk_status_update(
-            request, queryset, "confirmed",
-            f"{queryset.count()} ta buyurtma tasdiqlandi.",
-        )
+        self._bulk_status_update(request, queryset, "confirmed", "{} ta buyurtma tasdiqlandi.")
 
     @action(description="Jarayonda", icon="sync")
     def mark_processing(self, request, queryset):
-        self._bulk_status_update(
-            request, queryset, "processing",
-            f"{queryset.count()} ta buyurtma jarayonga o'tkazildi.",
-        )
+        self._bulk_status_update(request, queryset, "processing", "{} ta buyurtma jarayonga o'tkazildi.")
 
     @action(description="Yuborildi", icon="local_shipping")
     def mark_shipped(self, request, queryset):
-        self._bulk_status_update(
-            request, queryset, "shipped",
-            f"{queryset.count()} ta buyurtma yuborildi.",
-        )
+        self._bulk_status_update(request, queryset, "shipped", "{} ta buyurtma yuborildi.")
 
     @action(description="Yetkazildi", icon="done_all")
     def mark_delivered(self, request, queryset):
-        self._bulk_status_update(
-            request, queryset, "delivered",
-            f"{queryset.count()} ta buyurtma yetkazildi.",
-        )
+        self._bulk_status_update(request, queryset, "delivered", "{} ta buyurtma yetkazildi.")
 
     @action(description="Bekor qilish", icon="cancel")
     def mark_cancelled(self, request, queryset):
-        self._bulk_status_update(
-            request, queryset, "cancelled",
-            f"{queryset.count()} ta buyurtma bekor qilindi.",
-        )
+        self._bulk_status_update(request, queryset, "cancelled", "{} ta buyurtma bekor qilindi.")
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related("user").annotate(
@@ -231,16 +262,33 @@ class OrderAdmin(ExportMixin, ModelAdmin):
             count,
         )
 
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        """Tahrirlash (buyurtma + elementlar) kunlik yig'indiga farq sifatida."""
+        if request.method == "POST" and object_id and object_id.isdigit():
+            with track_orders([int(object_id)]):
+                return super().changeform_view(request, object_id, form_url, extra_context)
+        return super().changeform_view(request, object_id, form_url, extra_context)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        if not change:
+            record_orders(Order.objects.filter(pk=form.instance.pk))
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            record_orders(Order.objects.filter(pk=obj.pk), sign=-1)
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            record_orders(queryset, sign=-1)
+            super().delete_queryset(request, queryset)
+
     def save_model(self, request, obj, form, change):
-        """Holat o'zgarganda foydalanuvchiga Telegram xabar yuborish."""
+        """Holat o'zgarganda foydalanuvchiga Telegram xabar (navbat orqali)."""
+        super().save_model(request, obj, form, change)
         if change and "status" in form.changed_data:
-            super().save_model(request, obj, form, change)
-            try:
-                send_status_notification(obj, obj.status)
-            except Exception as e:
-                logger.error(f"Failed to send status notification for order #{obj.id}: {e}")
-        else:
-            super().save_model(request, obj, form, change)
+            queue_status_notifications([obj], obj.status)
 
     @display(description="Manzil")
     def display_address(self, obj):
@@ -249,3 +297,24 @@ class OrderAdmin(ExportMixin, ModelAdmin):
             short = addr[:25] + "..." if len(addr) > 25 else addr
             return format_html('<span class="text-xs">{}</span>', short)
         return format_html('<span class="text-gray-400 text-xs">Ko\'rsatilmagan</span>')
+
+
+@admin.register(Notification)
+class NotificationAdmin(ModelAdmin):
+    list_display = ["id", "chat_id", "order", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status"]
+    search_fields = ["chat_id", "order__id"]
+    readonly_fields = [f.name for f in Notification._meta.fields]
+    list_select_related = ["order__user"]
+    list_per_page = 50
+    actions = ["retry"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @action(description="Qayta yuborish", icon="replay")
+    def retry(self, request, queryset):
+        count = queryset.exclude(status="sent").update(
+            status="pending", attempts=0, next_attempt_at=timezone.now(), last_error=""
+        )
+        self.message_user(request, f"{count} ta xabar qayta navbatga qo'yildi.")
@@ -0,0 +1,157 @@
+"""Buyurtmalar va buyurtma elementlarini oqim (streaming) bilan eksport qilish.
+
+`ExportMixin` butun queryset va faylni xotirada yig'adi — bir yillik
+buyurtmalarda gunicorn worker xotirasi tugashi yoki 120s timeout mumkin.
+Bu yerda qatorlar `.iterator(chunk_size=...)` bilan bo'lak-bo'lak o'qiladi:
+
+- CSV — `StreamingHttpResponse` orqali yozilgan sari yuboriladi;
+- XLSX — openpyxl `write_only` rejimi (qatorlar vaqtinchalik faylga
+  yoziladi, xotirada saqlanmaydi), tayyor fayl bo'lak-bo'lak yuboriladi.
+"""
+import csv
+import io
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .models import OrderItem
+
+CHUNK_SIZE = 2000
+# CSV bufferi shu hajmga yetganda javobga yuboriladi
+FLUSH_BYTES = 64 * 1024
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+ORDER_HEADERS = [
+    "ID", "Sana", "Mijoz", "Telegram ID", "Telefon", "Holat", "To'lov usuli",
+    "To'langan", "Yetkazish zonasi", "Manzil", "Yetkazish", "Jami", "Izoh",
+]
+LINE_HEADERS = [
+    "Buyurtma ID", "Sana", "Holat", "Mahsulot ID", "Mahsulot", "O'lcham",
+    "Soni", "Narx", "Tannarx", "Summa",
+]
+
+
+def _local(value):
+    # XLSX vaqt zonasini qo'llamaydi — mahalliy vaqt, zonasiz
+    return timezone.localtime(value).replace(tzinfo=None, microsecond=0)
+
+
+def _yes_no(value):
+    return "Ha" if value else "Yo'q"
+
+
+def order_rows(queryset):
+    orders = queryset.select_related("user", "delivery_zone__region").order_by("created_at", "pk")
+    for order in orders.iterator(chunk_size=CHUNK_SIZE):
+        zone = order.delivery_zone
+        yield (
+            order.pk,
+            _local(order.created_at),
+            order.user.first_name if order.user else "",
+            order.user.telegram_id if order.user else "",
+            order.phone,
+            order.get_status_display(),
+            order.get_payment_method_display(),
+            _yes_no(order.is_paid),
+            f"{zone.region.name} — {zone.name}" if zone else "",
+            order.delivery_address,
+            order.delivery_fee,
+            order.total,
+            order.comment,
+        )
+
+
+def line_rows(queryset):
+    items = (
+        OrderItem.objects.filter(order__in=queryset.order_by().values("pk"))
+        .select_related("order")
+        .order_by("order__created_at", "order_id", "pk")
+    )
+    for item in items.iterator(chunk_size=CHUNK_SIZE):
+        order = item.order
+        yield (
+            order.pk,
+            _local(order.created_at),
+            order.get_status_display(),
+            item.product_id,
+            item.product_name,
+            item.size,
+            item.quantity,
+            item.price,
+            item.cost_price,
+            item.subtotal,
+        )
+
+
+EXPORTS = {
+    "orders": ("Buyurtmalar", ORDER_HEADERS, order_rows),
+    "lines": ("Elementlar", LINE_HEADERS, line_rows),
+}
+
+
+def stream_csv(headers, rows):
+    """CSV matnini ~64KB bo'laklarda qaytaruvchi generator."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")  # Excel UTF-8 ni tanishi uchun BOM
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def cell(sheet, value, **style):
+    """Uslubli katak (write-only rejimda uslub faqat shu orqali)."""
+    from openpyxl.cell import WriteOnlyCell
+
+    result = WriteOnlyCell(sheet, value=value)
+    for name, attr in style.items():
+        setattr(result, name, attr)
+    return result
+
+
+def write_xlsx(title, build_rows, widths=()):
+    """Write-only kitob yozib, boshiga qaytarilgan vaqtinchalik faylni qaytaradi.
+
+    `build_rows(sheet)` — qatorlar iteratori (uslubli kataklar uchun `sheet`).
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    for index, width in enumerate(widths, start=1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+    for row in build_rows(sheet):
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def xlsx_response(output, filename):
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def export_response(queryset, kind, fmt, filename):
+    """`kind` — `orders`/`lines`, `fmt` — `csv`/`xlsx`; `filename` kengaytmasiz."""
+    title, headers, rows = EXPORTS[kind]
+    if fmt == "xlsx":
+        from openpyxl.styles import Font
+
+        def build_rows(sheet):
+            yield [cell(sheet, text, font=Font(bold=True)) for text in headers]
+            yield from rows(queryset)
+
+        return xlsx_response(write_xlsx(title, build_rows), f"{filename}.xlsx")
+    response = StreamingHttpResponse(
+        stream_csv(headers, rows(queryset)), content_type="text/csv; charset=utf-8"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
@@ -0,0 +1,123 @@
+"""Checkout uchun `Idempotency-Key`.
+
+Kalit qatori buyurtma bilan bitta tranzaksiyada yoziladi va javob ham shu
+yerda saqlanadi. Parallel takroriy so'rov (PostgreSQL'da) unique indeks
+ustida birinchisi tugashini kutadi, so'ng saqlangan javobni oladi. Xato
+bilan tugagan so'rov kalitni saqlamaydi — mijoz shu kalit bilan qayta
+urinishi mumkin.
+
+Kalit `IDEMPOTENCY_KEY_TTL_HOURS` soat amal qiladi: eski kalit yangi so'rov
+kabi qabul qilinadi, eskilarini `purge_idempotency_keys` buyrug'i o'chiradi.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+class KeyRollback(Exception):
+    """Muvaffaqiyatsiz javob — kalit yozuvi bekor qilinadi."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def request_fingerprint(request):
+    raw = json.dumps(
+        [request.method, request.get_full_path(), request.data],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def claim_key(user, key, fingerprint):
+    """`(record, created)`. Band kalit uchun birinchi so'rov tugashini kutadi."""
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(user=user, key=key, fingerprint=fingerprint), True
+    except IntegrityError:
+        record = IdempotencyKey.objects.get(user=user, key=key)
+    if record.created_at >= expiry_cutoff():
+        return record, False
+    # Muddati o'tgan kalit — o'chirib, yangi so'rov sifatida qayta band qilamiz
+    IdempotencyKey.objects.filter(pk=record.pk).delete()
+    return claim_key(user, key, fingerprint)
+
+
+def purge_expired_keys(batch_size=500):
+    """Muddati o'tgan kalitlarni bo'laklab o'chirish; o'chirilganlar soni."""
+    cutoff = expiry_cutoff()
+    total = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(created_at__lt=cutoff)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        total += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
+
+
+def replay(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        return Response(
+            {"error": "Bu Idempotency-Key boshqa so'rov uchun ishlatilgan"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    response = Response(record.response_body, status=record.response_status)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def store_response(record, response):
+    record.order_id = response.data.get("id")
+    record.response_status = response.status_code
+    record.response_body = response.data
+    record.save(update_fields=["order", "response_status", "response_body"])
+
+
+def idempotent(view_method):
+    """Buyurtma yaratuvchi metod uchun: kalit bo'lsa javobni saqlash/qaytarish."""
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER, "").strip()
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": f"{HEADER} {MAX_KEY_LENGTH} belgidan oshmasligi kerak"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        fingerprint = request_fingerprint(request)
+        try:
+            with transaction.atomic():
+                record, created = claim_key(request.user, key, fingerprint)
+                if not created:
+                    return replay(record, fingerprint)
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_201_CREATED:
+                    raise KeyRollback(response)
+                store_response(record, response)
+                return response
+        except KeyRollback as e:
+            return e.response
+
+    return wrapper
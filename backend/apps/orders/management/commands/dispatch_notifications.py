@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from apps.orders.outbox import Dispatcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Navbatdagi Telegram xabarlarini yuborish. Doimiy worker sifatida "
+        "ishlaydi; `--once` — navbatni bir marta bo'shatib chiqish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=settings.NOTIFICATION_CONCURRENCY)
+        parser.add_argument("--interval", type=float, default=2.0, help="Navbat bo'sh bo'lganda kutish (soniya)")
+
+    def handle(self, *args, **options):
+        if not settings.BOT_TOKEN:
+            # Nol bo'lmagan kod — konteyner "muvaffaqiyatli tugadi" deb ko'rinmasin
+            raise CommandError("BOT_TOKEN sozlanmagan — xabarlar navbatda qoladi")
+        dispatcher = Dispatcher(concurrency=options["concurrency"])
+        total_sent = total_failed = 0
+        try:
+            while True:
+                close_old_connections()
+                sent, failed = dispatcher.dispatch_once(options["batch_size"])
+                total_sent, total_failed = total_sent + sent, total_failed + failed
+                if sent or failed:
+                    self.stdout.write(f"Yuborildi: {sent}, xato: {failed}")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            dispatcher.close()
+        self.stdout.write(self.style.SUCCESS(f"Jami yuborildi: {total_sent}, xato: {total_failed}"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = (
+        "Muddati (IDEMPOTENCY_KEY_TTL_HOURS) o'tgan checkout Idempotency-Key "
+        "qatorlarini bo'laklab o'chirish. Cron orqali har kuni ishga tushiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"O'chirildi: {deleted} ta Idempotency-Key."))
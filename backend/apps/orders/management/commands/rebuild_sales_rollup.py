@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.rollup import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Kunlik sotuv yig'indisini (DailySales) buyurtmalardan qayta hisoblash. "
+        "Sanalarsiz — butun tarix."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="Boshlanish sanasi (YYYY-MM-DD)")
+        parser.add_argument("--end", help="Tugash sanasi (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options["start"]) if options["start"] else None
+            end = date.fromisoformat(options["end"]) if options["end"] else None
+        except ValueError as e:
+            raise CommandError(f"Noto'g'ri sana: {e}")
+        rows = rebuild(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Yozilgan qatorlar: {rows}"))
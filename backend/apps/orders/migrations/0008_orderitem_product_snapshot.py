@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:47
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_snapshots(apps, schema_editor):
+    OrderItem = apps.get_model("orders", "OrderItem")
+    Product = apps.get_model("products", "Product")
+    product = Product.objects.filter(pk=OuterRef("product_id"))
+    OrderItem.objects.update(
+        product_name=Subquery(product.values("name")[:1]),
+        product_image=Coalesce(Subquery(product.values("primary_image__image")[:1]), models.Value("")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_idempotencykey'),
+        ('products', '0012_product_primary_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_image',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Mahsulot rasmi'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Mahsulot nomi'),
+        ),
+        migrations.RunPython(fill_snapshots, migrations.RunPython.noop),
+    ]
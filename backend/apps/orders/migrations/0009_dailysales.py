@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:51
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def fill_rollup(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    DailySales = apps.get_model("orders", "DailySales")
+
+    def items_sum(expression):
+        items = (
+            OrderItem.objects.filter(order=OuterRef("pk")).order_by().values("order")
+            .annotate(value=Sum(expression, output_field=models.DecimalField())).values("value")
+        )
+        return Coalesce(Subquery(items), models.Value(Decimal("0")), output_field=models.DecimalField())
+
+    totals = defaultdict(lambda: [0, 0, 0, 0, 0])
+    orders = Order.objects.order_by().annotate(
+        day=TruncDate("created_at"),
+        items_revenue=items_sum(F("price") * F("quantity")),
+        items_cost=items_sum(F("cost_price") * F("quantity")),
+    ).values_list("day", "status", "payment_method", "is_paid", "total", "delivery_fee", "items_revenue", "items_cost")
+    for day, status, payment, is_paid, *values in orders.iterator():
+        group = status if status in ("delivered", "cancelled") else "open"
+        row = totals[(day, group, payment, is_paid)]
+        for index, value in enumerate([1, *values]):
+            row[index] += value or 0
+    DailySales.objects.bulk_create(
+        [
+            DailySales(
+                day=day, bucket=group, payment_method=payment, is_paid=is_paid,
+                orders_count=count, revenue=revenue, delivery_fees=delivery,
+                product_revenue=product_revenue, cogs=cogs,
+            )
+            for (day, group, payment, is_paid), (count, revenue, delivery, product_revenue, cogs) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_orderitem_product_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('bucket', models.CharField(choices=[('open', 'Jarayonda'), ('delivered', 'Yetkazilgan'), ('cancelled', 'Bekor qilingan')], max_length=10)),
+                ('payment_method', models.CharField(choices=[('cash', 'Naqd pul'), ('transfer', "Karta o'tkazma")], max_length=20)),
+                ('is_paid', models.BooleanField()),
+                ('orders_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('delivery_fees', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('product_revenue', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('cogs', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Kunlik sotuv',
+                'verbose_name_plural': 'Kunlik sotuvlar',
+                'constraints': [models.UniqueConstraint(fields=('day', 'bucket', 'payment_method', 'is_paid'), name='orders_dailysales_key')],
+            },
+        ),
+        migrations.RunPython(fill_rollup, migrations.RunPython.noop),
+    ]
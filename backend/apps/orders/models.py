@@ -1,5 +1,7 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator
 from django.db import models
+from django.utils import timezone
 from apps.users.models import TelegramUser
 from apps.products.models import Product
 
@@ -16,6 +18,17 @@ class Order(models.Model):
         ("cancelled", "Bekor qilingan"),
     ]
 
+    # Ruxsat etilgan holat o'tishlari: faqat oldinga (bosqich tashlab ham);
+    # yetkazilgan va bekor qilingan — yakuniy
+    STATUS_TRANSITIONS = {
+        "pending": {"confirmed", "processing", "shipped", "delivered", "cancelled"},
+        "confirmed": {"processing", "shipped", "delivered", "cancelled"},
+        "processing": {"shipped", "delivered", "cancelled"},
+        "shipped": {"delivered", "cancelled"},
+        "delivered": set(),
+        "cancelled": set(),
+    }
+
     PAYMENT_METHOD_CHOICES = [
         ("cash", "Naqd pul"),
         ("transfer", "Karta o'tkazma"),
@@ -62,6 +75,14 @@ class Order(models.Model):
     def __str__(self):
         return f"#{self.id} - {self.user.full_name}"
 
+    @classmethod
+    def statuses_allowed_to(cls, new_status):
+        """`new_status` ga o'tish mumkin bo'lgan holatlar."""
+        return [status for status, targets in cls.STATUS_TRANSITIONS.items() if new_status in targets]
+
+    def can_transition(self, new_status):
+        return new_status in self.STATUS_TRANSITIONS.get(self.status, ())
+
     def calculate_total(self):
         items_total = sum(item.subtotal for item in self.items.all())
         self.total = items_total + self.delivery_fee
@@ -83,13 +104,17 @@ class OrderItem(models.Model):
         help_text="Buyurtma paytidagi tannarx (muzlatilgan)",
     )
     size = models.CharField(max_length=50, blank=True)
+    # Buyurtma paytidagi mahsulot ko'rinishi (muzlatilgan) — buyurtmalar
+    # tarixi mahsulotlar jadvaliga murojaat qilmaydi
+    product_name = models.CharField(max_length=255, blank=True, verbose_name="Mahsulot nomi")
+    product_image = models.CharField(max_length=255, blank=True, verbose_name="Mahsulot rasmi")
 
     class Meta:
         verbose_name = "Buyurtma elementi"
         verbose_name_plural = "Buyurtma elementlari"
 
     def __str__(self):
-        return f"{self.product.name} x {self.quantity}"
+        return f"{self.product_name or self.product.name} x {self.quantity}"
 
     @property
     def subtotal(self):
@@ -104,9 +129,125 @@ class OrderItem(models.Model):
             return 0
         return (self.price - (self.cost_price or 0)) * self.quantity
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Admin mahsulotni almashtirsa — nom/rasm qayta muzlatiladi
+        instance._loaded_product_id = instance.__dict__.get("product_id")
+        return instance
+
     def save(self, *args, **kwargs):
         if self.price is None:
             self.price = self.product.price
         if not self.cost_price and self.product_id:
             self.cost_price = self.product.cost_price
+        product_changed = getattr(self, "_loaded_product_id", self.product_id) != self.product_id
+        if (not self.product_name or product_changed) and self.product_id:
+            self.snapshot_product(
+                Product.objects.select_related("primary_image").get(pk=self.product_id)
+            )
         super().save(*args, **kwargs)
+        self._loaded_product_id = self.product_id
+
+    def snapshot_product(self, product):
+        """Mahsulot nomi va asosiy rasmini muzlatish (`primary_image` yuklangan bo'lsin)."""
+        self.product_name = product.name
+        image = product.primary_image.image if product.primary_image_id else None
+        self.product_image = image.name if image else ""
+
+
+class Notification(models.Model):
+    """Telegram xabarlari navbati (outbox).
+
+    Buyurtma yoki holat o'zgarishi bilan bitta tranzaksiyada yoziladi,
+    `dispatch_notifications` buyrug'i esa alohida jarayonda yuboradi.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Navbatda"),
+        ("sent", "Yuborilgan"),
+        ("failed", "Xato"),
+    ]
+
+    order = models.ForeignKey(
+        Order, on_delete=models.SET_NULL, null=True, blank=True, related_name="notifications"
+    )
+    chat_id = models.BigIntegerField()
+    text = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Xabarnoma"
+        verbose_name_plural = "Xabarnomalar"
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"#{self.id} → {self.chat_id} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """Checkout so'rovi uchun `Idempotency-Key` va saqlangan javob.
+
+    Takroriy so'rov buyurtmani qayta yaratmaydi — saqlangan javob qaytadi.
+    """
+
+    user = models.ForeignKey(TelegramUser, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Idempotency kaliti"
+        verbose_name_plural = "Idempotency kalitlari"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="orders_idempotency_user_key"),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class DailySales(models.Model):
+    """Kunlik sotuv yig'indisi (moliyaviy hisobot va dashboard uchun).
+
+    Buyurtma yaratilganda, holati yoki to'lov holati o'zgarganda `rollup.py`
+    orqali farq sifatida yangilanadi; `rebuild_sales_rollup` buyrug'i
+    buyurtmalardan qayta hisoblaydi.
+    """
+
+    BUCKET_CHOICES = [
+        ("open", "Jarayonda"),
+        ("delivered", "Yetkazilgan"),
+        ("cancelled", "Bekor qilingan"),
+    ]
+
+    day = models.DateField()
+    bucket = models.CharField(max_length=10, choices=BUCKET_CHOICES)
+    payment_method = models.CharField(max_length=20, choices=Order.PAYMENT_METHOD_CHOICES)
+    is_paid = models.BooleanField()
+    orders_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    delivery_fees = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    product_revenue = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    cogs = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+
+    class Meta:
+        verbose_name = "Kunlik sotuv"
+        verbose_name_plural = "Kunlik sotuvlar"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "bucket", "payment_method", "is_paid"],
+                name="orders_dailysales_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.bucket} {self.payment_method}"
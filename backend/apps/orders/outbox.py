@@ -0,0 +1,193 @@
+"""Telegram xabarlari navbatini (outbox) yuborish.
+
+`dispatch_notifications` buyrug'i navbatdan `batch_size` tadan xabar oladi
+(`select_for_update(skip_locked=True)` + ijara muddati — bir nechta worker
+bitta xabarni ikki marta yubormaydi) va ularni bitta umumiy `httpx.AsyncClient`
+orqali parallel (`concurrency` tagacha) yuboradi.
+
+Telegram cheklovlari: umumiy — sekundiga `TELEGRAM_GLOBAL_RATE` ta xabar,
+bitta chatga — `TELEGRAM_CHAT_INTERVAL` soniyada bittadan. 429 javobidagi
+`retry_after` butun worker uchun pauza bo'ladi. Vaqtinchalik xatolar
+eksponensial kutish bilan qayta uriniladi, 400/403 (bot bloklangan, chat
+topilmadi) — darhol `failed`.
+
+Ijara muddati paketdan hisoblanadi (`lease_for`): bitta chatga ko'p xabar
+bo'lsa, cheklov tufayli yuborish uzoq cho'ziladi. Baribir ulgurilmasa (429
+pauzasi, sekin tarmoq), ijara tugashiga yaqin boshlanadigan xabarlar
+yuborilmaydi va urinish hisoblanmasdan navbatga qaytariladi — ularni boshqa
+worker olsa ham ikki marta yuborilmaydi.
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import timedelta
+
+import httpx
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Ijara zaxirasi: cheklov bo'yicha hisoblangan yuborish vaqtiga qo'shiladi.
+# Yarmidan keyin yangi xabar yuborilmaydi (HTTP timeout'ga joy qoladi).
+LEASE = timedelta(minutes=2)
+# Ijara tugashi sababli yuborilmagan xabar natijasi
+NOT_SENT = None
+BACKOFF_BASE = 5  # soniya
+BACKOFF_MAX = 3600
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def lease_for(batch, per_second, chat_interval):
+    """Paketni cheklovlar bilan yuborishning eng uzun vaqti + `LEASE` zaxira."""
+    per_chat = Counter(n.chat_id for n in batch)
+    sending = max(len(batch) / per_second, (max(per_chat.values(), default=1) - 1) * chat_interval)
+    return timedelta(seconds=sending) + LEASE
+
+
+def claim_batch(limit, per_second=None, chat_interval=None):
+    """Yuborishga tayyor xabarlarni olish va ijaraga belgilash; `(batch, lease)`."""
+    per_second = per_second or settings.TELEGRAM_GLOBAL_RATE
+    chat_interval = settings.TELEGRAM_CHAT_INTERVAL if chat_interval is None else chat_interval
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:limit]
+        )
+        lease = lease_for(batch, per_second, chat_interval)
+        if batch:
+            Notification.objects.filter(pk__in=[n.pk for n in batch]).update(next_attempt_at=now + lease)
+    return batch, lease
+
+
+class RateLimiter:
+    """Umumiy va har bir chat uchun yuborish oralig'i."""
+
+    def __init__(self, per_second, chat_interval):
+        self.per_second = per_second
+        self.interval = 1 / per_second
+        self.chat_interval = chat_interval
+        self.next_global = 0.0
+        self.next_chat = {}
+        self.lock = asyncio.Lock()
+
+    async def wait(self, chat_id):
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            now = loop.time()
+            start = max(now, self.next_global, self.next_chat.get(chat_id, 0.0))
+            self.next_global = start + self.interval
+            self.next_chat[chat_id] = start + self.chat_interval
+        await asyncio.sleep(start - now)
+
+    def pause(self, seconds):
+        self.next_global = max(self.next_global, asyncio.get_running_loop().time() + seconds)
+
+
+class Dispatcher:
+    """Xabarlarni yuboruvchi; bitta event loop va HTTP pool bilan ishlaydi."""
+
+    def __init__(self, client=None, concurrency=None, global_rate=None, chat_interval=None):
+        self.loop = asyncio.new_event_loop()
+        self.client = client
+        self.deadline = None
+        self.concurrency = concurrency or settings.NOTIFICATION_CONCURRENCY
+        self.limiter = RateLimiter(
+            global_rate or settings.TELEGRAM_GLOBAL_RATE,
+            settings.TELEGRAM_CHAT_INTERVAL if chat_interval is None else chat_interval,
+        )
+
+    def close(self):
+        if self.client is not None:
+            self.loop.run_until_complete(self.client.aclose())
+        self.loop.close()
+
+    def _client(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=f"https://api.telegram.org/bot{settings.BOT_TOKEN}/",
+                timeout=10,
+                limits=httpx.Limits(max_connections=self.concurrency),
+            )
+        return self.client
+
+    async def _send(self, semaphore, notification):
+        """`(ok, retry_after, permanent, error)` yoki `NOT_SENT`."""
+        async with semaphore:
+            await self.limiter.wait(notification.chat_id)
+            if self.deadline is not None and self.loop.time() > self.deadline:
+                # Ijara tugayapti — boshqa worker olishi mumkin, yubormaymiz
+                return NOT_SENT
+            try:
+                response = await self._client().post(
+                    "sendMessage",
+                    json={"chat_id": notification.chat_id, "text": notification.text, "parse_mode": "HTML"},
+                )
+            except httpx.HTTPError as e:
+                return False, None, False, str(e) or type(e).__name__
+        if response.status_code == 200:
+            return True, None, False, ""
+        if response.status_code == 429:
+            try:
+                retry_after = int(response.json()["parameters"]["retry_after"])
+            except (ValueError, KeyError, TypeError):
+                retry_after = BACKOFF_BASE
+            self.limiter.pause(retry_after)
+            return False, retry_after, False, response.text
+        return False, None, response.status_code in (400, 403), response.text
+
+    async def _deliver(self, batch):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._send(semaphore, n) for n in batch))
+
+    def deliver(self, batch, lease=None):
+        self.deadline = None
+        if lease is not None:
+            self.deadline = self.loop.time() + (lease - LEASE / 2).total_seconds()
+        return self.loop.run_until_complete(self._deliver(batch))
+
+    def dispatch_once(self, batch_size=100):
+        """Bitta paketni yuborish; `(sent, failed)` qaytaradi."""
+        batch, lease = claim_batch(batch_size, self.limiter.per_second, self.limiter.chat_interval)
+        if not batch:
+            return 0, 0
+        results = self.deliver(batch, lease)
+        return record_results(batch, results)
+
+
+def record_results(batch, results):
+    now = timezone.now()
+    sent = failed = 0
+    for notification, result in zip(batch, results):
+        if result is NOT_SENT:
+            # Urinish emas — darhol navbatga qaytadi
+            notification.next_attempt_at = now
+            continue
+        ok, retry_after, permanent, error = result
+        notification.attempts += 1
+        if ok:
+            notification.status = "sent"
+            notification.sent_at = now
+            notification.last_error = ""
+            sent += 1
+        else:
+            notification.last_error = error[:1000]
+            if permanent or notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                notification.status = "failed"
+                failed += 1
+                logger.error(f"Xabar yuborilmadi (#{notification.pk}, chat_id={notification.chat_id}): {error}")
+            else:
+                delay = retry_after if retry_after is not None else backoff(notification.attempts)
+                notification.next_attempt_at = now + timedelta(seconds=delay)
+    Notification.objects.bulk_update(
+        batch, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+    )
+    return sent, failed
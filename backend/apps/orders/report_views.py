@@ -1,13 +1,15 @@
-"""Admin moliyaviy hisobot sahifasi (HTML + XLSX eksport)."""
-from datetime import datetime
+"""Admin moliyaviy hisobot sahifasi (HTML + XLSX eksport, davr buyurtmalari eksporti, vaqt qatori JSON)."""
+from datetime import datetime, timedelta
 
 from django.contrib import admin
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import HttpResponse
-
+from django.http import JsonResponse
 from django.shortcuts import render
 
-from .reports import compute_financial_report, resolve_period
+from .export import EXPORTS, cell, export_response, write_xlsx, xlsx_response
+from .models import Order
+from .reports import compute_financial_report, compute_time_series, resolve_granularity, resolve_period
+from .rollup import day_start
 
 
 def _parse_date(value):
@@ -17,16 +19,46 @@ def _parse_date(value):
         return None
 
 
-@staff_member_required
-def financial_report_view(request):
+def _resolve_request_period(request):
     period = request.GET.get("period", "this_month")
     start = _parse_date(request.GET.get("start"))
     end = _parse_date(request.GET.get("end"))
-    start, end, label = resolve_period(period, start, end)
+    return (period, *resolve_period(period, start, end))
+
+
+@staff_member_required
+def financial_series_view(request):
+    """Grafik uchun kun/hafta/oy kesimidagi qator (JSON)."""
+    _, start, end, _ = _resolve_request_period(request)
+    granularity = resolve_granularity(request.GET.get("granularity"), start, end)
+    series = compute_time_series(start, end, granularity)
+    return JsonResponse({
+        "start": start,
+        "end": end,
+        "granularity": granularity,
+        "series": [
+            {key: value if key == "period" else int(value) for key, value in row.items()}
+            for row in series
+        ],
+    })
+
+
+@staff_member_required
+def financial_report_view(request):
+    period, start, end, label = _resolve_request_period(request)
+
+    export = request.GET.get("export")
+    if export in EXPORTS:
+        # Davrdagi buyurtmalar/elementlar — oqim bilan, hisobotni hisoblamasdan
+        orders = Order.objects.filter(
+            created_at__gte=day_start(start), created_at__lt=day_start(end + timedelta(days=1))
+        )
+        fmt = "xlsx" if request.GET.get("format") == "xlsx" else "csv"
+        return export_response(orders, export, fmt, f"ziyora-{export}-{start}_{end}")
 
     report = compute_financial_report(start, end)
 
-    if request.GET.get("export") == "xlsx":
+    if export == "xlsx":
         return _export_xlsx(report, label)
 
     context = {
@@ -40,22 +72,12 @@ def financial_report_view(request):
 
 
 def _export_xlsx(report, label):
-    from openpyxl import Workbook
     from openpyxl.styles import Alignment, Font, PatternFill
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Hisobot"
-
     bold = Font(bold=True)
     header_fill = PatternFill("solid", fgColor="FCE7F3")  # pink-100
     money_fmt = "#,##0 \"so'm\""
 
-    ws["A1"] = "Ziyora — Moliyaviy hisobot"
-    ws["A1"].font = Font(bold=True, size=14)
-    ws["A2"] = f"Davr: {label}"
-    ws["A2"].font = Font(italic=True)
-
     rows = [
         ("Ko'rsatkich", "Qiymat", None),
         ("Buyurtmalar soni", report["orders_count"], "int"),
@@ -80,32 +102,24 @@ def _export_xlsx(report, label):
         ("Bekor qilingan qiymat", report["cancelled"]["value"], "money"),
     ]
 
-    start_row = 4
-    for i, (label_text, value, kind) in enumerate(rows):
-        r = start_row + i
-        c_label = ws.cell(row=r, column=1, value=label_text)
-        c_value = ws.cell(row=r, column=2, value=value)
-        if i == 0:
-            c_label.font = bold
-            c_value.font = bold
-            c_label.fill = header_fill
-            c_value.fill = header_fill
-        elif str(label_text).startswith("—"):
-            c_label.font = Font(bold=True, italic=True)
-        if kind == "money":
-            c_value.number_format = money_fmt
-        c_value.alignment = Alignment(horizontal="right")
-
-    ws.column_dimensions["A"].width = 36
-    ws.column_dimensions["B"].width = 20
+    def build_rows(ws):
+        # Write-only varaq: kataklar qator bo'yicha, uslub WriteOnlyCell orqali
+        yield [cell(ws, "Ziyora — Moliyaviy hisobot", font=Font(bold=True, size=14))]
+        yield [cell(ws, f"Davr: {label}", font=Font(italic=True))]
+        yield []
+        for i, (label_text, value, kind) in enumerate(rows):
+            c_label = cell(ws, label_text)
+            c_value = cell(ws, value, alignment=Alignment(horizontal="right"))
+            if i == 0:
+                c_label.font = bold
+                c_value.font = bold
+                c_label.fill = header_fill
+                c_value.fill = header_fill
+            elif str(label_text).startswith("—"):
+                c_label.font = Font(bold=True, italic=True)
+            if kind == "money":
+                c_value.number_format = money_fmt
+            yield [c_label, c_value]
 
     filename = f"ziyora-hisobot-{report['start']}_{report['end']}.xlsx"
-    resp = HttpResponse(
-        content_type=(
-            "application/vnd.openxmlformats-officedocument."
-            "spreadsheetml.sheet"
-        )
-    )
-    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
-    wb.save(resp)
-    return resp
+    return xlsx_response(write_xlsx("Hisobot", build_rows, widths=(36, 20)), filename)
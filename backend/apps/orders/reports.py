@@ -2,19 +2,19 @@
 
 Soliq rejimi va xarajat jurnali hali kiritilmagan (qaror kutilmoqda) — bu modul
 faqat sotuv ma'lumotidan yalpi foydani (tushum − tannarx) hisoblaydi.
-Davr `created_at` (buyurtma sanasi) bo'yicha olinadi.
+Davr `created_at` (buyurtma sanasi) bo'yicha olinadi; ma'lumot `DailySales`
+yig'indisidan (qarang: `rollup.py`).
 """
 from datetime import date, timedelta
 from decimal import Decimal
 
-from django.db.models import Count, DecimalField, F, Sum
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
 from django.utils import timezone
 
-from .models import Order, OrderItem
+from .models import DailySales
 
-
-def _q(value):
-    return value or Decimal("0")
+GRANULARITIES = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
 
 
 def resolve_period(period: str, start=None, end=None):
@@ -35,71 +35,126 @@ def resolve_period(period: str, start=None, end=None):
 
 
 def compute_financial_report(start: date, end: date) -> dict:
-    """Berilgan sana oralig'i uchun moliyaviy ko'rsatkichlarni hisoblaydi."""
-    orders = Order.objects.filter(
-        created_at__date__gte=start, created_at__date__lte=end
-    )
-    active = orders.exclude(status="cancelled")
-    cancelled = orders.filter(status="cancelled")
+    """Berilgan sana oralig'i uchun moliyaviy ko'rsatkichlarni hisoblaydi.
 
-    order_agg = active.aggregate(
-        count=Count("id"),
-        revenue=Sum("total"),
-        delivery=Sum("delivery_fee"),
-    )
-    item_agg = OrderItem.objects.filter(order__in=active).aggregate(
-        product_revenue=Sum(
-            F("price") * F("quantity"), output_field=DecimalField()
-        ),
-        cogs=Sum(F("cost_price") * F("quantity"), output_field=DecimalField()),
+    Buyurtmalar emas, kunlik yig'indi (`DailySales`) o'qiladi — bitta so'rov,
+    davr uzunligiga qaramay bir necha o'nlab qator.
+    """
+    zero = Decimal("0")
+    totals = {"count": 0, "revenue": zero, "delivery": zero, "product_revenue": zero, "cogs": zero}
+    by_payment = {
+        method: {"count": 0, "revenue": zero} for method in ("cash", "transfer")
+    }
+    paid = {"count": 0, "revenue": zero}
+    unpaid = {"count": 0, "revenue": zero}
+    cancelled = {"count": 0, "value": zero}
+
+    rows = DailySales.objects.filter(day__gte=start, day__lte=end).values_list(
+        "bucket", "payment_method", "is_paid",
+        "orders_count", "revenue", "delivery_fees", "product_revenue", "cogs",
     )
+    for bucket, method, is_paid, count, revenue, delivery, product_revenue, cogs in rows:
+        if bucket == "cancelled":
+            cancelled["count"] += count
+            cancelled["value"] += revenue
+            continue
+        totals["count"] += count
+        totals["revenue"] += revenue
+        totals["delivery"] += delivery
+        totals["product_revenue"] += product_revenue
+        totals["cogs"] += cogs
+        payment = by_payment.setdefault(method, {"count": 0, "revenue": zero})
+        payment["count"] += count
+        payment["revenue"] += revenue
+        group = paid if is_paid else unpaid
+        group["count"] += count
+        group["revenue"] += revenue
 
-    product_revenue = _q(item_agg["product_revenue"])
-    cogs = _q(item_agg["cogs"])
+    product_revenue = totals["product_revenue"]
+    cogs = totals["cogs"]
     gross_profit = product_revenue - cogs
     margin = (
         int(gross_profit / product_revenue * 100) if product_revenue else 0
     )
 
-    by_payment = {
-        row["payment_method"]: {
-            "count": row["count"],
-            "revenue": _q(row["revenue"]),
-        }
-        for row in active.values("payment_method").annotate(
-            count=Count("id"), revenue=Sum("total")
-        )
-    }
-
-    paid = active.filter(is_paid=True).aggregate(
-        count=Count("id"), revenue=Sum("total")
-    )
-    unpaid = active.filter(is_paid=False).aggregate(
-        count=Count("id"), revenue=Sum("total")
-    )
-    cancelled_agg = cancelled.aggregate(count=Count("id"), value=Sum("total"))
-
     return {
         "start": start,
         "end": end,
-        "orders_count": order_agg["count"] or 0,
-        "revenue": _q(order_agg["revenue"]),           # tushum (yetkazish bilan)
-        "delivery_fees": _q(order_agg["delivery"]),
+        "orders_count": totals["count"],
+        "revenue": totals["revenue"],                  # tushum (yetkazish bilan)
+        "delivery_fees": totals["delivery"],
         "product_revenue": product_revenue,            # mahsulot tushumi
         "cogs": cogs,                                  # tannarx
         "gross_profit": gross_profit,                  # yalpi foyda
         "margin": margin,                              # foyda ulushi %
-        "cash": by_payment.get("cash", {"count": 0, "revenue": Decimal("0")}),
-        "transfer": by_payment.get(
-            "transfer", {"count": 0, "revenue": Decimal("0")}
-        ),
-        "paid": {"count": paid["count"] or 0, "revenue": _q(paid["revenue"])},
-        "unpaid": {
-            "count": unpaid["count"] or 0,
-            "revenue": _q(unpaid["revenue"]),
-        },
-        "cancelled": {
-            "count": cancelled_agg["count"] or 0,
-            "value": _q(cancelled_agg["value"]),
-        },
+        "cash": by_payment["cash"],
+        "transfer": by_payment["transfer"],
+        "paid": paid,
+        "unpaid": unpaid,
+        "cancelled": cancelled,
     }
+
+
+def resolve_granularity(value, start, end):
+    """Berilmagan bo'lsa — davr uzunligiga qarab (2 oygacha kun, 1 yilgacha hafta)."""
+    if value in GRANULARITIES:
+        return value
+    days = (end - start).days
+    if days <= 62:
+        return "day"
+    return "week" if days <= 366 else "month"
+
+
+def _bucket_starts(start, end, granularity):
+    if granularity == "month":
+        current = start.replace(day=1)
+    elif granularity == "week":
+        current = start - timedelta(days=start.weekday())
+    else:
+        current = start
+    while current <= end:
+        yield current
+        if granularity == "month":
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+
+
+def compute_time_series(start: date, end: date, granularity: str = "day") -> list:
+    """Davr bo'yicha kun/hafta/oy kesimidagi ko'rsatkichlar.
+
+    `DailySales` dan bitta `Trunc*` bo'yicha guruhlangan so'rov — ko'p yillik
+    davrda ham o'qiladigan qatorlar soni kunlar soniga proporsional, buyurtmalarga emas.
+    Bo'sh oraliqlar nol bilan to'ldiriladi.
+    """
+    active = ~Q(bucket="cancelled")
+    rows = (
+        DailySales.objects.filter(day__gte=start, day__lte=end)
+        .annotate(period=GRANULARITIES[granularity]("day"))
+        .values("period")
+        .annotate(
+            sum_orders=Sum("orders_count", filter=active),
+            sum_revenue=Sum("revenue", filter=active),
+            sum_product_revenue=Sum("product_revenue", filter=active),
+            sum_cogs=Sum("cogs", filter=active),
+            sum_cancelled=Sum("revenue", filter=Q(bucket="cancelled")),
+        )
+        .order_by("period")
+    )
+    by_period = {row["period"]: row for row in rows}
+    zero = Decimal("0")
+    series = []
+    for period in _bucket_starts(start, end, granularity):
+        row = by_period.get(period, {})
+        product_revenue = row.get("sum_product_revenue") or zero
+        cogs = row.get("sum_cogs") or zero
+        series.append({
+            "period": period,
+            "orders_count": row.get("sum_orders") or 0,
+            "revenue": row.get("sum_revenue") or zero,
+            "product_revenue": product_revenue,
+            "cogs": cogs,
+            "gross_profit": product_revenue - cogs,
+            "cancelled_value": row.get("sum_cancelled") or zero,
+        })
+    return series
@@ -0,0 +1,149 @@
+"""Kunlik sotuv yig'indisini (`DailySales`) yangilab borish.
+
+Har bir buyurtmaning hissasi — kalit (kun, holat guruhi, to'lov usuli,
+to'langanmi) va qiymatlar (1, total, delivery_fee, mahsulot tushumi,
+tannarx). O'zgarishdan oldin va keyin hissalar bitta so'rovda olinadi,
+farqi esa bitta `INSERT ... ON CONFLICT DO UPDATE SET x = x + EXCLUDED.x`
+bilan yoziladi — parallel o'zgarishlar bir-birini yo'qotmaydi.
+
+    with track_orders(order_ids):
+        Order.objects.filter(pk__in=order_ids).update(is_paid=True)
+
+`QuerySet.update()` bilan o'zgartirilganda ham shu blokdan o'tkazish kerak.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import DailySales, Order, OrderItem
+
+VALUE_FIELDS = ["orders_count", "revenue", "delivery_fees", "product_revenue", "cogs"]
+
+
+def day_start(day):
+    """Mahalliy kun boshlanishi — `created_at` indeksidan foydalanish uchun."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def bucket(status):
+    if status in ("delivered", "cancelled"):
+        return status
+    return "open"
+
+
+def _items_sum(expression):
+    items = (
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(value=Sum(expression, output_field=DecimalField()))
+        .values("value")
+    )
+    return Coalesce(Subquery(items), Value(Decimal("0")), output_field=DecimalField())
+
+
+def with_rollup_values(queryset):
+    """Buyurtmalar + kun va elementlar yig'indilari (bitta so'rov)."""
+    return queryset.order_by().annotate(
+        day=TruncDate("created_at"),
+        items_revenue=_items_sum(F("price") * F("quantity")),
+        items_cost=_items_sum(F("cost_price") * F("quantity")),
+    ).values_list(
+        "day", "status", "payment_method", "is_paid", "total", "delivery_fee", "items_revenue", "items_cost"
+    )
+
+
+def contributions(queryset, sign=1):
+    """`{kalit: [soni, tushum, yetkazish, mahsulot tushumi, tannarx]}`"""
+    totals = defaultdict(lambda: [0, Decimal("0"), Decimal("0"), Decimal("0"), Decimal("0")])
+    for day, status, payment, is_paid, total, delivery, revenue, cost in with_rollup_values(queryset):
+        row = totals[(day, bucket(status), payment, is_paid)]
+        for index, value in enumerate((1, total, delivery, revenue, cost)):
+            row[index] += sign * (value or 0)
+    return totals
+
+
+def apply_delta(delta):
+    """Farqlarni yig'indi jadvaliga qo'shish (bitta SQL)."""
+    rows = [(key, values) for key, values in delta.items() if any(values)]
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(DailySales._meta.db_table)
+    key_columns = ["day", "bucket", "payment_method", "is_paid"]
+    columns = ", ".join(qn(c) for c in key_columns + VALUE_FIELDS)
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * 9) + ")"] * len(rows))
+    updates = ", ".join(f"{qn(c)} = {table}.{qn(c)} + EXCLUDED.{qn(c)}" for c in VALUE_FIELDS)
+    sql = (
+        f"INSERT INTO {table} ({columns}) VALUES {placeholders} "
+        f"ON CONFLICT ({', '.join(qn(c) for c in key_columns)}) DO UPDATE SET {updates}"
+    )
+    params = []
+    for key, values in rows:
+        params.extend(key)
+        params.extend(values)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def record_orders(queryset, sign=1):
+    """Buyurtmalar hissasini qo'shish (`sign=-1` — ayirish)."""
+    apply_delta(contributions(queryset, sign))
+
+
+def record_new_order(order, items):
+    """Yangi buyurtma hissasi xotiradagi ma'lumotdan (o'qish so'rovisiz)."""
+    key = (timezone.localdate(order.created_at), bucket(order.status), order.payment_method, order.is_paid)
+    revenue = sum((item.price * item.quantity for item in items), Decimal("0"))
+    cost = sum((item.cost_price * item.quantity for item in items), Decimal("0"))
+    apply_delta({key: [1, order.total, order.delivery_fee, revenue, cost]})
+
+
+@contextmanager
+def track_orders(order_ids, lock=True):
+    """Blok ichidagi o'zgarishlarni yig'indiga farq sifatida yozish.
+
+    `lock=False` — buyurtmalar chaqiruvchi tomonidan allaqachon qulflangan.
+    """
+    ids = list(order_ids)
+    with transaction.atomic():
+        # Parallel o'zgarish "oldingi" hissani eskirtirmasligi uchun
+        if lock:
+            list(Order.objects.select_for_update().filter(pk__in=ids).order_by("pk").values_list("pk"))
+        before = contributions(Order.objects.filter(pk__in=ids), -1)
+        yield
+        delta = before
+        for key, values in contributions(Order.objects.filter(pk__in=ids)).items():
+            row = delta[key]
+            for index, value in enumerate(values):
+                row[index] += value
+        apply_delta(delta)
+
+
+def rebuild(start=None, end=None):
+    """Yig'indini buyurtmalardan qayta hisoblash; yozilgan qatorlar soni."""
+    orders = Order.objects.all()
+    rows = DailySales.objects.all()
+    if start:
+        orders = orders.filter(created_at__gte=day_start(start))
+        rows = rows.filter(day__gte=start)
+    if end:
+        orders = orders.filter(created_at__lt=day_start(end + timedelta(days=1)))
+        rows = rows.filter(day__lte=end)
+    with transaction.atomic():
+        rows.delete()
+        totals = contributions(orders)
+        DailySales.objects.bulk_create(
+            DailySales(
+                day=day, bucket=group, payment_method=payment, is_paid=is_paid,
+                **dict(zip(VALUE_FIELDS, values)),
+            )
+            for (day, group, payment, is_paid), values in totals.items()
+        )
+    return len(totals)
@@ -1,9 +1,10 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import Order, OrderItem
-from apps.products.serializers import ProductListSerializer
+from apps.products.serializers import ProductListSerializer, SparseFieldsMixin
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
     subtotal = serializers.DecimalField(max_digits=12, decimal_places=0, read_only=True)
 
@@ -12,7 +13,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ["id", "product", "quantity", "price", "size", "subtotal"]
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     status_display = serializers.CharField(source="get_status_display", read_only=True)
     payment_method_display = serializers.CharField(
@@ -44,9 +45,67 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
     def get_delivery_zone_name(self, obj):
-        if obj.delivery_zone:
-            return f"{obj.delivery_zone.region.name} — {obj.delivery_zone.name}"
-        return None
+        return delivery_zone_name(obj)
+
+
+def delivery_zone_name(order):
+    # `delivery_zone__region` select_related bilan olinishi kerak
+    if order.delivery_zone:
+        return f"{order.delivery_zone.region.name} — {order.delivery_zone.name}"
+    return None
+
+
+class OrderHistoryItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Buyurtma elementi — muzlatilgan nom va rasm bilan (mahsulotlar jadvalisiz)."""
+
+    product_id = serializers.IntegerField(read_only=True)
+    product_image = serializers.SerializerMethodField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=0, read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = [
+            "id", "product_id", "product_name", "product_image",
+            "quantity", "price", "size", "subtotal",
+        ]
+
+    def get_product_image(self, obj):
+        if not obj.product_image:
+            return None
+        url = default_storage.url(obj.product_image)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class OrderHistorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Buyurtmalar tarixi (ro'yxat va bot uchun): faqat buyurtma, element va
+    zona jadvallari."""
+
+    items = OrderHistoryItemSerializer(many=True, read_only=True)
+    status_display = serializers.CharField(source="get_status_display", read_only=True)
+    payment_method_display = serializers.CharField(
+        source="get_payment_method_display", read_only=True
+    )
+    delivery_zone_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "status",
+            "status_display",
+            "total",
+            "delivery_fee",
+            "delivery_zone_name",
+            "payment_method",
+            "payment_method_display",
+            "is_paid",
+            "items",
+            "created_at",
+        ]
+
+    def get_delivery_zone_name(self, obj):
+        return delivery_zone_name(obj)
 
 
 class CreateOrderSerializer(serializers.Serializer):
@@ -77,15 +136,6 @@ class CreateOrderSerializer(serializers.Serializer):
             )
         return value.strip()
 
-    def validate_delivery_zone_id(self, value):
-        if value is None:
-            return value
-        from apps.delivery.models import DeliveryZone
-
-        if not DeliveryZone.objects.filter(id=value, is_active=True).exists():
-            raise serializers.ValidationError("Yetkazish zonasi topilmadi")
-        return value
-
     def validate_items(self, value):
         from apps.products.models import Product
 
@@ -95,15 +145,37 @@ class CreateOrderSerializer(serializers.Serializer):
                     "Har bir element 'product_id' va 'quantity' bo'lishi kerak"
                 )
             try:
-                qty = int(item["quantity"])
+                item["product_id"] = int(item["product_id"])
+            except (TypeError, ValueError):
+                raise serializers.ValidationError("Mahsulot id butun son bo'lishi kerak")
+            try:
+                qty = item["quantity"] = int(item["quantity"])
             except (TypeError, ValueError):
                 raise serializers.ValidationError("Miqdor butun son bo'lishi kerak")
             if qty < 1 or qty > 99:
                 raise serializers.ValidationError(
                     "Miqdor 1 dan 99 gacha bo'lishi kerak"
                 )
-            if not Product.objects.filter(id=item["product_id"], is_active=True).exists():
-                raise serializers.ValidationError(
-                    f"Mahsulot #{item['product_id']} topilmadi"
-                )
+
+        # Barcha mahsulotlar bitta so'rovda tekshiriladi
+        ids = [item["product_id"] for item in value]
+        found = set(
+            Product.objects.filter(id__in=ids, is_active=True).values_list("id", flat=True)
+        )
+        for product_id in ids:
+            if product_id not in found:
+                raise serializers.ValidationError(f"Mahsulot #{product_id} topilmadi")
         return value
+
+    def validate(self, attrs):
+        # Zona bir marta olinadi — view `delivery_zone` ni tayyor oladi
+        zone_id = attrs.pop("delivery_zone_id", None)
+        attrs["delivery_zone"] = None
+        if zone_id is not None:
+            from apps.delivery.models import DeliveryZone
+
+            zone = DeliveryZone.objects.select_related("region").filter(id=zone_id, is_active=True).first()
+            if zone is None:
+                raise serializers.ValidationError({"delivery_zone_id": "Yetkazish zonasi topilmadi"})
+            attrs["delivery_zone"] = zone
+        return attrs
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.badges import invalidate_badge
+from config.dashboard import invalidate_dashboard
+
+from .models import Order
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_stats(sender, **kwargs):
+    invalidate_dashboard()
+    invalidate_badge("pending_orders")
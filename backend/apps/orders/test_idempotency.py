@@ -0,0 +1,104 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.cart.models import Cart, CartItem
+from apps.orders.models import IdempotencyKey, Notification, Order
+from apps.products.models import Category, Product
+from apps.users.models import TelegramUser
+
+
+@override_settings(BOT_TOKEN="TEST", ADMIN_IDS=[11])
+class IdempotentCheckoutTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=565656, first_name="Test")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.product = Product.objects.create(name="Krem", price=Decimal("100000"), category=category)
+
+    def _post(self, key, quantity=1):
+        return self.client.post(
+            "/api/orders/",
+            {"items": [{"product_id": self.product.id, "quantity": quantity}], "phone": "+998901234567"},
+            format="json",
+            headers={"Idempotency-Key": key} if key else {},
+        )
+
+    def test_retry_replays_stored_response(self):
+        first = self._post("abc-1")
+        self.assertEqual(first.status_code, 201)
+        # faqat kalit: savepoint'lar (5) + insert (conflict) + o'qish —
+        # mahsulot, buyurtma, savat so'rovlari yo'q
+        with self.assertNumQueries(7):
+            second = self._post("abc-1")
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_cart_is_locked_before_products(self):
+        # Savatga qo'shish bilan bir xil qulf tartibi: savat → mahsulot
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._post("lock-1").status_code, 201)
+        sql = [q["sql"] for q in queries]
+        first_cart = next(i for i, q in enumerate(sql) if 'FROM "cart_cart"' in q)
+        # serializer tekshiruvidan keyingi qulflovchi so'rov (ustunlar bilan)
+        locked_products = next(i for i, q in enumerate(sql) if '"products_product"."in_stock"' in q)
+        self.assertLess(first_cart, locked_products)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_different_payload_with_same_key_is_rejected(self):
+        self._post("abc-2")
+        response = self._post("abc-2", quantity=3)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_does_not_keep_key(self):
+        self.product.in_stock = False
+        self.product.save()
+        self.assertEqual(self._post("abc-3").status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.product.in_stock = True
+        self.product.save()
+        self.assertEqual(self._post("abc-3").status_code, 201)
+
+    def test_keys_are_per_user(self):
+        self._post("shared")
+        other = TelegramUser.objects.create(telegram_id=575757, first_name="Other")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self._post("shared").status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_without_key_creates_every_time(self):
+        self._post(None)
+        self._post(None)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_expired_key_is_treated_as_new(self):
+        self._post("old-1")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=25))
+        response = self._post("old-1", quantity=2)
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.get().order_id, response.data["id"])
+
+    def test_purge_command_deletes_expired_keys(self):
+        self._post("old-2")
+        self._post("fresh")
+        IdempotencyKey.objects.filter(key="old-2").update(created_at=timezone.now() - timedelta(hours=25))
+        out = StringIO()
+        call_command("purge_idempotency_keys", stdout=out)
+        self.assertIn("1 ta Idempotency-Key", out.getvalue())
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["fresh"])
@@ -0,0 +1,153 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+import httpx
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.orders.models import Notification, Order
+from apps.orders.outbox import LEASE, Dispatcher, claim_batch
+from apps.orders.utils import queue_status_notifications
+from apps.products.models import Category, Product
+from apps.users.models import TelegramUser
+
+
+def mock_client(handler):
+    return httpx.AsyncClient(base_url="https://api.telegram.org/botTEST/", transport=httpx.MockTransport(handler))
+
+
+@override_settings(BOT_TOKEN="TEST", ADMIN_IDS=[11, 22])
+class NotificationQueueTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=123123, first_name="Ali")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.product = Product.objects.create(name="Krem", price=Decimal("100000"), category=category)
+
+    def _order(self):
+        return self.client.post(
+            "/api/orders/",
+            {"items": [{"product_id": self.product.id, "quantity": 2}], "phone": "+998901234567"},
+            format="json",
+        )
+
+    def test_order_queues_admin_notifications(self):
+        response = self._order()
+        self.assertEqual(response.status_code, 201)
+        notifications = Notification.objects.order_by("chat_id")
+        self.assertEqual([n.chat_id for n in notifications], [11, 22])
+        self.assertIn("Krem x2", notifications[0].text)
+        self.assertEqual(notifications[0].order_id, response.data["id"])
+
+    def test_failed_order_queues_nothing(self):
+        self.product.in_stock = False
+        self.product.save()
+        self.assertEqual(self._order().status_code, 400)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_status_notifications_for_many_orders(self):
+        orders = [Order.objects.create(user=self.user, phone="+998900000000") for _ in range(3)]
+        queue_status_notifications(orders, "shipped")
+        self.assertEqual(Notification.objects.filter(chat_id=123123).count(), 3)
+        self.assertIn("yo'lga chiqdi", Notification.objects.first().text)
+
+
+@override_settings(BOT_TOKEN="TEST", NOTIFICATION_MAX_ATTEMPTS=3)
+class DispatcherTest(TestCase):
+    def setUp(self):
+        self.requests = []
+
+    def _dispatcher(self, handler):
+        def record(request):
+            self.requests.append(request)
+            return handler(request)
+
+        dispatcher = Dispatcher(client=mock_client(record), concurrency=4, global_rate=1000, chat_interval=0)
+        self.addCleanup(dispatcher.close)
+        return dispatcher
+
+    def _queue(self, count=3):
+        Notification.objects.bulk_create(Notification(chat_id=100 + i, text=f"xabar {i}") for i in range(count))
+
+    def test_sends_and_marks_sent(self):
+        self._queue()
+        dispatcher = self._dispatcher(lambda request: httpx.Response(200, json={"ok": True}))
+        self.assertEqual(dispatcher.dispatch_once(), (3, 0))
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(Notification.objects.filter(status="sent", attempts=1).count(), 3)
+        self.assertEqual(dispatcher.dispatch_once(), (0, 0))
+
+    def test_rate_limited_is_rescheduled(self):
+        self._queue(1)
+        dispatcher = self._dispatcher(
+            lambda request: httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 30}})
+        )
+        dispatcher.dispatch_once()
+        notification = Notification.objects.get()
+        self.assertEqual(notification.status, "pending")
+        self.assertGreater(notification.next_attempt_at, timezone.now() + timezone.timedelta(seconds=25))
+
+    def test_server_errors_back_off_then_fail(self):
+        self._queue(1)
+        dispatcher = self._dispatcher(lambda request: httpx.Response(502))
+        for attempt in range(3):
+            Notification.objects.update(next_attempt_at=timezone.now())
+            dispatcher.dispatch_once()
+        notification = Notification.objects.get()
+        self.assertEqual((notification.status, notification.attempts), ("failed", 3))
+
+    def test_blocked_chat_fails_immediately(self):
+        self._queue(1)
+        dispatcher = self._dispatcher(lambda request: httpx.Response(403, json={"ok": False}))
+        self.assertEqual(dispatcher.dispatch_once(), (0, 1))
+
+    def test_claimed_rows_are_leased(self):
+        self._queue(2)
+        self.assertEqual(len(claim_batch(10)[0]), 2)
+        self.assertEqual(claim_batch(10)[0], [])
+
+    def test_lease_covers_rate_limited_chat(self):
+        # Bitta chatga 5 ta xabar, 1 s oraliq — kamida 4 s yuboriladi
+        Notification.objects.bulk_create(Notification(chat_id=100, text=f"xabar {i}") for i in range(5))
+        before = timezone.now()
+        batch, lease = claim_batch(10, per_second=30, chat_interval=1)
+        self.assertEqual(lease, LEASE + timedelta(seconds=4))
+        for notification in Notification.objects.all():
+            self.assertGreaterEqual(notification.next_attempt_at, before + lease)
+
+    def test_batch_outliving_lease_is_not_sent_twice(self):
+        self._queue(3)
+
+        def slow(request):
+            time.sleep(0.3)
+            return httpx.Response(200, json={"ok": True})
+
+        with mock.patch("apps.orders.outbox.LEASE", timedelta(seconds=0.2)):
+            dispatcher = self._dispatcher(slow)
+            dispatcher.concurrency = 1
+            # Birinchisi yuboriladi, qolganlari ijara tugagach boshlanardi
+            self.assertEqual(dispatcher.dispatch_once(), (1, 0))
+            pending = Notification.objects.filter(status="pending")
+            self.assertEqual(pending.count(), 2)
+            self.assertFalse(pending.exclude(attempts=0).exists())
+            self.assertFalse(pending.filter(next_attempt_at__gt=timezone.now()).exists())
+
+        other = self._dispatcher(lambda request: httpx.Response(200, json={"ok": True}))
+        self.assertEqual(other.dispatch_once(), (2, 0))
+        chats = [request.read() for request in self.requests]
+        self.assertEqual(len(chats), len(set(chats)))
+        self.assertEqual(Notification.objects.filter(status="sent", attempts=1).count(), 3)
+
+
+class DispatchCommandTest(TestCase):
+    @override_settings(BOT_TOKEN="")
+    def test_missing_token_fails_and_keeps_queue(self):
+        Notification.objects.create(chat_id=11, text="Salom")
+        with self.assertRaises(CommandError):
+            call_command("dispatch_notifications", "--once")
+        self.assertEqual(Notification.objects.get().status, "pending")
@@ -1,11 +1,13 @@
+from datetime import date, timedelta
 from decimal import Decimal
 
 from django.contrib.auth.models import User
 from django.test import TestCase
 from django.utils import timezone
 
-from apps.orders.models import Order, OrderItem
-from apps.orders.reports import compute_financial_report
+from apps.orders.models import DailySales, Order, OrderItem
+from apps.orders.reports import compute_financial_report, compute_time_series
+from apps.orders.rollup import record_orders
 from apps.products.models import Category, Product
 from apps.users.models import TelegramUser
 
@@ -35,6 +37,8 @@ class FinancialReportTest(TestCase):
             price=Decimal("150000"), cost_price=Decimal("100000"),
         )
         order.calculate_total()
+        # To'g'ridan-to'g'ri yaratilgan buyurtma — yig'indiga qo'lda
+        record_orders(Order.objects.filter(pk=order.pk))
         return order
 
     def test_report_profit_math(self):
@@ -63,6 +67,13 @@ class FinancialReportTest(TestCase):
         self.assertEqual(rep["gross_profit"], Decimal("100000"))
         self.assertEqual(rep["cancelled"]["count"], 1)
 
+    def test_report_reads_rollup_in_one_query(self):
+        for _ in range(3):
+            self._make_order()
+        with self.assertNumQueries(1):
+            rep = compute_financial_report(self.today, self.today)
+        self.assertEqual(rep["orders_count"], 3)
+
     def test_empty_period_no_error(self):
         rep = compute_financial_report(self.today, self.today)
         self.assertEqual(rep["orders_count"], 0)
@@ -92,3 +103,124 @@ class FinancialReportViewTest(TestCase):
         self.client.logout()
         resp = self.client.get("/admin/hisobot/")
         self.assertEqual(resp.status_code, 302)  # login sahifasiga
+
+
+class StreamingExportTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="admin", password="pass12345", email="a@a.uz"
+        )
+        self.client.login(username="admin", password="pass12345")
+        user = TelegramUser.objects.create(telegram_id=555222, first_name="Eksport")
+        category = Category.objects.create(name="Teri", slug="teri")
+        product = Product.objects.create(name="Krem", price=Decimal("50000"), category=category)
+        self.orders = []
+        for qty in (1, 2, 3):
+            order = Order.objects.create(user=user, phone="+998901112233")
+            OrderItem.objects.create(order=order, product=product, quantity=qty, price=Decimal("50000"))
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=Decimal("50000"), size="M")
+            self.orders.append(order)
+
+    def _csv_rows(self, response):
+        import csv
+
+        self.assertTrue(response.streaming)
+        text = b"".join(response.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(text.splitlines()))
+
+    def test_admin_action_streams_csv(self):
+        response = self.client.post("/admin/orders/order/", {
+            "action": "export_orders_csv",
+            "_selected_action": [o.pk for o in self.orders[:2]],
+        })
+        self.assertIn("attachment", response["Content-Disposition"])
+        rows = self._csv_rows(response)
+        self.assertEqual(rows[0][0], "ID")
+        self.assertEqual([row[0] for row in rows[1:]], [str(o.pk) for o in self.orders[:2]])
+
+    def test_lines_export_query_count_is_flat(self):
+        response = self.client.post("/admin/orders/order/", {
+            "action": "export_lines_csv",
+            "_selected_action": [o.pk for o in self.orders],
+        })
+        # Elementlar buyurtma bilan bitta JOIN so'rovda — qatorlar soniga bog'liq emas
+        with self.assertNumQueries(1):
+            rows = self._csv_rows(response)
+        self.assertEqual(len(rows), 1 + 6)
+        self.assertEqual(rows[1][4], "Krem")
+
+    def test_xlsx_export_is_write_only_workbook(self):
+        from io import BytesIO
+
+        from openpyxl import load_workbook
+
+        response = self.client.post("/admin/orders/order/", {
+            "action": "export_orders_xlsx",
+            "_selected_action": [o.pk for o in self.orders],
+        })
+        self.assertIn("spreadsheetml", response["Content-Type"])
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        self.assertEqual(sheet.max_row, 4)
+        self.assertEqual(sheet["A2"].value, self.orders[0].pk)
+
+    def test_report_period_export(self):
+        response = self.client.get("/admin/hisobot/?period=this_month&export=lines")
+        self.assertEqual(len(self._csv_rows(response)), 1 + 6)
+
+
+class TimeSeriesTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="admin", password="pass12345", email="a@a.uz"
+        )
+        self.client.login(username="admin", password="pass12345")
+        self.day = date(2025, 3, 12)  # chorshanba
+
+    def _sales(self, day, bucket="delivered", count=1, revenue=100000, cogs=60000):
+        DailySales.objects.create(
+            day=day, bucket=bucket, payment_method="cash", is_paid=True,
+            orders_count=count, revenue=revenue, delivery_fees=0,
+            product_revenue=revenue, cogs=cogs,
+        )
+
+    def test_daily_buckets_are_filled(self):
+        self._sales(self.day)
+        self._sales(self.day, bucket="cancelled", revenue=40000, cogs=0)
+        with self.assertNumQueries(1):
+            series = compute_time_series(self.day - timedelta(days=1), self.day + timedelta(days=1), "day")
+        self.assertEqual([row["period"] for row in series], [
+            self.day - timedelta(days=1), self.day, self.day + timedelta(days=1),
+        ])
+        self.assertEqual(series[0]["revenue"], 0)
+        self.assertEqual(series[1]["orders_count"], 1)
+        self.assertEqual(series[1]["gross_profit"], Decimal("40000"))
+        self.assertEqual(series[1]["cancelled_value"], Decimal("40000"))
+
+    def test_monthly_buckets_over_years(self):
+        self._sales(date(2023, 1, 5))
+        self._sales(date(2023, 1, 20))
+        self._sales(date(2025, 12, 31))
+        with self.assertNumQueries(1):
+            series = compute_time_series(date(2023, 1, 1), date(2025, 12, 31), "month")
+        self.assertEqual(len(series), 36)
+        self.assertEqual(series[0]["orders_count"], 2)
+        self.assertEqual(series[-1]["period"], date(2025, 12, 1))
+        self.assertEqual(series[-1]["orders_count"], 1)
+
+    def test_weekly_buckets_start_on_monday(self):
+        self._sales(self.day)
+        series = compute_time_series(self.day, self.day, "week")
+        self.assertEqual(series, [{
+            "period": date(2025, 3, 10), "orders_count": 1, "revenue": Decimal("100000"),
+            "product_revenue": Decimal("100000"), "cogs": Decimal("60000"),
+            "gross_profit": Decimal("40000"), "cancelled_value": Decimal("0"),
+        }])
+
+    def test_json_endpoint(self):
+        self._sales(self.day)
+        resp = self.client.get("/admin/hisobot/series/?period=custom&start=2025-03-01&end=2025-12-31")
+        data = resp.json()
+        self.assertEqual(data["granularity"], "week")
+        self.assertEqual(sum(row["revenue"] for row in data["series"]), 100000)
+        resp = self.client.get("/admin/hisobot/series/?period=custom&start=2025-03-01&end=2025-03-31&granularity=month")
+        self.assertEqual(resp.json()["series"][0]["period"], "2025-03-01")
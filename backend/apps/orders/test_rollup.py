@@ -0,0 +1,134 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.orders.models import DailySales, Order, OrderItem
+from apps.orders.rollup import rebuild, record_orders, track_orders
+from apps.products.models import Category, Product
+from apps.users.models import TelegramUser
+
+
+def rollup_rows():
+    return {
+        (row.day, row.bucket, row.payment_method, row.is_paid): (
+            row.orders_count, row.revenue, row.delivery_fees, row.product_revenue, row.cogs,
+        )
+        for row in DailySales.objects.exclude(orders_count=0)
+    }
+
+
+class DailySalesRollupTest(TestCase):
+    def setUp(self):
+        self.user = TelegramUser.objects.create(telegram_id=626262, first_name="Yig'indi")
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.product = Product.objects.create(
+            name="Krem", price=Decimal("100000"), cost_price=Decimal("60000"), category=category
+        )
+        self.today = timezone.localdate()
+
+    def _make_order(self, qty=1, **fields):
+        order = Order.objects.create(user=self.user, phone="+998901234567", **fields)
+        OrderItem.objects.create(
+            order=order, product=self.product, quantity=qty,
+            price=Decimal("100000"), cost_price=Decimal("60000"),
+        )
+        order.calculate_total()
+        record_orders(Order.objects.filter(pk=order.pk))
+        return order
+
+    def test_checkout_adds_contribution(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post(
+            "/api/orders/",
+            {"items": [{"product_id": self.product.id, "quantity": 2}], "phone": "+998901234567"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.data["id"])
+        row = DailySales.objects.get()
+        self.assertEqual(
+            (row.day, row.bucket, row.payment_method, row.is_paid), (self.today, "open", "cash", False)
+        )
+        self.assertEqual(row.orders_count, 1)
+        self.assertEqual(row.revenue, order.total)
+        self.assertEqual(row.delivery_fees, order.delivery_fee)
+        self.assertEqual(row.product_revenue, Decimal("200000"))
+        self.assertEqual(row.cogs, Decimal("120000"))
+
+    def test_changes_move_between_keys(self):
+        orders = [self._make_order(qty=2), self._make_order(qty=1)]
+        ids = [order.pk for order in orders]
+        with track_orders(ids):
+            Order.objects.filter(pk__in=ids).update(status="delivered", is_paid=True)
+        rows = rollup_rows()
+        self.assertEqual(list(rows), [(self.today, "delivered", "cash", True)])
+        self.assertEqual(rows[(self.today, "delivered", "cash", True)][0], 2)
+        self.assertEqual(rows[(self.today, "delivered", "cash", True)][3], Decimal("300000"))
+
+    def test_incremental_matches_rebuild(self):
+        first = self._make_order(qty=3)
+        self._make_order(qty=1, payment_method="transfer")
+        old = self._make_order(qty=2)
+        Order.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=3))
+        DailySales.objects.all().delete()
+        rebuild()
+        with track_orders([first.pk]):
+            Order.objects.filter(pk=first.pk).update(status="cancelled")
+        incremental = rollup_rows()
+        rebuild()
+        self.assertEqual(rollup_rows(), incremental)
+        self.assertEqual(len(incremental), 3)
+
+    def test_rebuild_range_keeps_other_days(self):
+        old = self._make_order()
+        Order.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=3))
+        DailySales.objects.all().delete()
+        rebuild()
+        self._make_order()
+        out = StringIO()
+        call_command("rebuild_sales_rollup", start=self.today.isoformat(), stdout=out)
+        self.assertIn("Yozilgan qatorlar: 1", out.getvalue())
+        self.assertEqual(DailySales.objects.count(), 2)
+
+
+class AdminRollupTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pass12345", email="a@a.uz")
+        self.client.login(username="admin", password="pass12345")
+        self.user = TelegramUser.objects.create(telegram_id=636363, first_name="Admin")
+        category = Category.objects.create(name="Teri", slug="teri")
+        product = Product.objects.create(name="Krem", price=Decimal("50000"), category=category)
+        self.orders = []
+        for _ in range(2):
+            order = Order.objects.create(user=self.user, phone="+998901234567")
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=Decimal("50000"))
+            order.calculate_total()
+            self.orders.append(order)
+        rebuild()
+
+    def _action(self, action):
+        return self.client.post(
+            "/admin/orders/order/",
+            {"action": action, "_selected_action": [order.pk for order in self.orders]},
+        )
+
+    def test_actions_update_rollup(self):
+        self._action("mark_paid")
+        self._action("mark_delivered")
+        today = timezone.localdate()
+        self.assertEqual(list(rollup_rows()), [(today, "delivered", "cash", True)])
+        self.assertEqual(rollup_rows()[(today, "delivered", "cash", True)][0], 2)
+
+    def test_delete_subtracts(self):
+        self.client.post(
+            "/admin/orders/order/",
+            {"action": "delete_selected", "_selected_action": [self.orders[0].pk], "post": "yes"},
+        )
+        self.assertEqual(DailySales.objects.get().orders_count, 1)
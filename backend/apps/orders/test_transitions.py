@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from apps.orders.admin import OrderAdminForm
+from apps.orders.models import DailySales, Notification, Order
+from apps.orders.rollup import rebuild
+from apps.orders.transitions import transition_orders
+from apps.users.models import TelegramUser
+
+
+@override_settings(BOT_TOKEN="TEST")
+class BulkTransitionTest(TestCase):
+    def setUp(self):
+        self.users = [
+            TelegramUser.objects.create(telegram_id=700 + i, first_name=f"Mijoz {i}") for i in range(5)
+        ]
+
+    def _orders(self, *statuses):
+        return [
+            Order.objects.create(user=self.users[i % len(self.users)], phone="+998901234567", status=status)
+            for i, status in enumerate(statuses)
+        ]
+
+    def test_only_allowed_transitions_are_applied(self):
+        pending, delivered, cancelled = self._orders("pending", "delivered", "cancelled")
+        orders, skipped = transition_orders(Order.objects.all(), "confirmed")
+        self.assertEqual([o.pk for o in orders], [pending.pk])
+        self.assertEqual(skipped, 2)
+        delivered.refresh_from_db()
+        cancelled.refresh_from_db()
+        self.assertEqual(delivered.status, "delivered")
+        self.assertEqual(cancelled.status, "cancelled")
+        self.assertEqual(Notification.objects.get().chat_id, pending.user.telegram_id)
+
+    def test_query_count_does_not_grow_with_selection(self):
+        def run():
+            with self.assertNumQueries(9):
+                transition_orders(Order.objects.filter(status="pending"), "confirmed")
+
+        self._orders("pending")
+        run()
+        self._orders(*["pending"] * 10)
+        run()
+        self.assertEqual(Notification.objects.count(), 11)
+
+    def test_transition_updates_rollup(self):
+        self._orders("pending", "shipped")
+        rebuild()
+        transition_orders(Order.objects.all(), "delivered")
+        rows = {row.bucket: row.orders_count for row in DailySales.objects.exclude(orders_count=0)}
+        self.assertEqual(rows, {"delivered": 2})
+
+
+class AdminStatusTest(TestCase):
+    def setUp(self):
+        User.objects.create_superuser(username="admin", password="pass12345", email="a@a.uz")
+        self.client.login(username="admin", password="pass12345")
+        user = TelegramUser.objects.create(telegram_id=777, first_name="Admin")
+        self.order = Order.objects.create(user=user, phone="+998901234567", status="delivered")
+
+    def test_action_reports_skipped(self):
+        response = self.client.post(
+            "/admin/orders/order/",
+            {"action": "mark_processing", "_selected_action": [self.order.pk]},
+            follow=True,
+        )
+        self.assertContains(response, "1 ta buyurtma o&#x27;tkazib yuborildi")
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "delivered")
+
+    def test_change_form_rejects_backward_transition(self):
+        form = OrderAdminForm(instance=self.order)
+        data = {**form.initial, "status": "pending"}
+        data["user"] = self.order.user_id
+        bound = OrderAdminForm(data, instance=self.order)
+        self.assertFalse(bound.is_valid())
+        self.assertIn("status", bound.errors)
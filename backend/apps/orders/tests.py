@@ -1,9 +1,10 @@
 from decimal import Decimal
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 
 from apps.users.models import TelegramUser
-from apps.products.models import Category, Product
+from apps.products.models import Category, Product, ProductImage
+from apps.products.test_image_urls import TEST_MEDIA_ROOT, MediaTempMixin, make_image
 from apps.orders.models import Order, OrderItem
 from apps.delivery.models import Region, DeliveryZone
 
@@ -266,3 +267,162 @@ class OrderAPITest(TestCase):
         other_order = Order.objects.create(user=other_user, phone="+998900000000")
         response = self.client.get(f"/api/orders/{other_order.id}/")
         self.assertEqual(response.status_code, 404)
+
+
+class OrderCursorPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=777001, first_name="Cursor")
+        self.client.force_authenticate(user=self.user)
+        self.orders = [
+            Order.objects.create(user=self.user, phone="+998901234567") for _ in range(3)
+        ]
+
+    def test_cursor_pages_without_count(self):
+        response = self.client.get("/api/orders/?cursor=&page_size=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.data)
+        ids = [row["id"] for row in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        ids += [row["id"] for row in response.data["results"]]
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(ids, [o.id for o in reversed(self.orders)])
+
+
+class OrderCardShapeTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=777002, first_name="Card")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Makiyaj", slug="makiyaj")
+        product = Product.objects.create(name="Lab bo'yog'i", price=Decimal("50000"), category=category)
+        order = Order.objects.create(user=self.user, phone="+998901234567")
+        OrderItem.objects.create(order=order, product=product, quantity=1)
+
+    def test_order_items_use_card_products(self):
+        order = Order.objects.get()
+        response = self.client.get(f"/api/orders/{order.id}/", {"shape": "card"})
+        product = response.data["items"][0]["product"]
+        self.assertEqual(product["name"], "Lab bo'yog'i")
+        self.assertIn("main_image", product)
+        self.assertNotIn("category", product)
+
+
+class OrderCreateSetBasedTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=321321, first_name="Test")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.products = [
+            Product.objects.create(
+                name=f"Krem {i}", price=Decimal("100000"), cost_price=Decimal("60000"), category=category
+            )
+            for i in range(6)
+        ]
+        region = Region.objects.create(name="Test viloyat")
+        self.zone = DeliveryZone.objects.create(region=region, name="Zona", fee=Decimal("20000"))
+
+    def _payload(self, products):
+        return {
+            "items": [{"product_id": p.id, "quantity": 2} for p in products],
+            "phone": "+998901234567",
+            "delivery_zone_id": self.zone.id,
+        }
+
+    def _queries(self, products):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/orders/", self._payload(products), format="json")
+        self.assertEqual(response.status_code, 201)
+        return ctx.captured_queries
+
+    def test_query_count_independent_of_items(self):
+        self._queries(self.products[:1])  # savat yaratiladi
+        self.assertEqual(len(self._queries(self.products[:1])), len(self._queries(self.products)))
+
+    def test_products_locked_once_in_id_order(self):
+        queries = [q["sql"] for q in self._queries(list(reversed(self.products)))]
+        order_insert = next(i for i, sql in enumerate(queries) if sql.startswith('INSERT INTO "orders_order"'))
+        product_selects = [sql for sql in queries[:order_insert] if 'FROM "products_product"' in sql]
+        # tekshiruv (id__in) + qulf
+        self.assertEqual(len(product_selects), 2)
+        self.assertIn('ORDER BY "products_product"."id" ASC', product_selects[1])
+
+    def test_lines_and_totals(self):
+        response = self.client.post("/api/orders/", self._payload(self.products[:3]), format="json")
+        order = Order.objects.get(pk=response.data["id"])
+        self.assertEqual(order.total, Decimal("620000"))
+        self.assertEqual(
+            list(order.items.order_by("id").values_list("quantity", "price", "cost_price"))[0],
+            (2, Decimal("100000"), Decimal("60000")),
+        )
+
+    def test_inactive_zone_rejected(self):
+        self.zone.is_active = False
+        self.zone.save()
+        response = self.client.post("/api/orders/", self._payload(self.products[:1]), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("delivery_zone_id", response.data)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class OrderHistoryTest(MediaTempMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = TelegramUser.objects.create(telegram_id=818181, first_name="Tarix")
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Teri", slug="teri")
+        region = Region.objects.create(name="Toshkent")
+        zone = DeliveryZone.objects.create(region=region, name="Chilonzor", fee=Decimal("20000"))
+        self.product = Product.objects.create(name="Krem", price=Decimal("100000"), category=category)
+        ProductImage.objects.create(product=self.product, image=make_image(), is_main=True)
+        for _ in range(3):
+            order = Order.objects.create(user=self.user, phone="+998901234567", delivery_zone=zone)
+            OrderItem.objects.create(order=order, product=self.product, quantity=2)
+
+    def test_snapshot_survives_product_changes(self):
+        self.product.name = "Yangi nom"
+        self.product.save()
+        self.product.images.all().delete()
+        item = self.client.get("/api/orders/").data["results"][0]["items"][0]
+        self.assertEqual(item["product_name"], "Krem")
+        self.assertTrue(item["product_image"].startswith("http://testserver/media/products/"))
+        self.assertEqual(item["product_id"], self.product.id)
+
+    def test_history_skips_product_tables(self):
+        # count + buyurtmalar (zona, viloyat bilan) + elementlar — buyurtmalar
+        # soniga bog'liq emas, mahsulot jadvallari yo'q
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/orders/")
+        first = response.data["results"][0]
+        self.assertEqual(first["delivery_zone_name"], "Toshkent — Chilonzor")
+        self.assertNotIn("product", first["items"][0])
+
+    def test_changing_line_product_resnapshots(self):
+        other = Product.objects.create(name="Shampun", price=Decimal("30000"), category=self.product.category)
+        item = OrderItem.objects.filter(order__user=self.user).first()
+        item.product = other
+        item.save()
+        item.refresh_from_db()
+        self.assertEqual(item.product_name, "Shampun")
+        self.assertEqual(item.product_image, "")
+        # Mahsulot o'zgarmasa — muzlatilgan nom saqlanadi
+        Product.objects.filter(pk=other.pk).update(name="Boshqa")
+        item.quantity = 3
+        item.save()
+        item.refresh_from_db()
+        self.assertEqual(item.product_name, "Shampun")
+
+    def test_checkout_freezes_snapshot(self):
+        response = self.client.post(
+            "/api/orders/",
+            {"items": [{"product_id": self.product.id, "quantity": 1}], "phone": "+998901234567"},
+            format="json",
+        )
+        item = OrderItem.objects.get(order_id=response.data["id"])
+        self.product.refresh_from_db()
+        self.assertEqual(item.product_name, "Krem")
+        self.assertEqual(item.product_image, self.product.primary_image.image.name)
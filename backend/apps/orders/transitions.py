@@ -0,0 +1,51 @@
+"""Buyurtmalar holatini ommaviy o'zgartirish.
+
+Tanlangan buyurtmalardan faqat ruxsat etilgan o'tishdagilari
+(`Order.STATUS_TRANSITIONS`) bitta `UPDATE ... WHERE id IN (...) AND status IN
+(...)` bilan yangilanadi; mijozlarga xabarlar outbox navbatiga bitta INSERT
+bilan yoziladi (yuborish — `dispatch_notifications` worker'i, tezlik
+cheklovi bilan). So'rovlar soni tanlangan buyurtmalar soniga bog'liq emas.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from config.badges import invalidate_badge
+from config.dashboard import invalidate_dashboard
+
+from .models import Order
+from .rollup import track_orders
+from .utils import queue_status_notifications
+
+
+def transition_orders(queryset, new_status):
+    """Ruxsat etilganlarini `new_status` ga o'tkazadi; `(o'tkazilganlar, o'tkazib yuborilganlar soni)`."""
+    sources = Order.statuses_allowed_to(new_status)
+    with transaction.atomic():
+        # Admin queryset'idagi annotatsiyalar (GROUP BY) FOR UPDATE bilan mos emas
+        selected = (
+            Order.objects.filter(pk__in=queryset.order_by().values("pk"))
+            .select_related("user")
+            .select_for_update(of=("self",))
+            .order_by("pk")
+        )
+        orders = []
+        skipped = 0
+        for order in selected:
+            if order.status in sources:
+                orders.append(order)
+            else:
+                skipped += 1
+        if not orders:
+            return [], skipped
+        ids = [order.pk for order in orders]
+        with track_orders(ids, lock=False):
+            Order.objects.filter(pk__in=ids, status__in=sources).update(
+                status=new_status, updated_at=timezone.now()
+            )
+        for order in orders:
+            order.status = new_status
+        queue_status_notifications(orders, new_status)
+        # `update()` signal yubormaydi
+        invalidate_dashboard()
+        invalidate_badge("pending_orders")
+    return orders, skipped
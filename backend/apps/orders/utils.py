@@ -1,31 +1,25 @@
 import logging
-import httpx
 from django.conf import settings
 
-from .models import Order
+from config.badges import cached_count
+
+from .models import Notification, Order
 
 logger = logging.getLogger(__name__)
 
 
 def get_pending_orders_count(request):
-    """Return pending orders count for sidebar badge."""
-    count = Order.objects.filter(status="pending").count()
+    """Return pending orders count for sidebar badge (cached)."""
+    count = cached_count("pending_orders", Order.objects.filter(status="pending").count)
     return count if count > 0 else None
 
 
-def send_order_notification(order: Order):
-    """Yangi buyurtma haqida admin userlarga Telegram orqali xabar yuborish."""
-    bot_token = getattr(settings, "BOT_TOKEN", None)
-    admin_ids = getattr(settings, "ADMIN_IDS", [])
-
-    if not bot_token or not admin_ids:
-        logger.warning("BOT_TOKEN yoki ADMIN_IDS sozlanmagan")
-        return
-
-    # Buyurtma ma'lumotlarini tayyorlash (prefetch bilan N+1 oldini olish)
-    items = order.items.select_related("product").all()
+def order_notification_text(order: Order, items=None):
+    """Yangi buyurtma haqida adminlar uchun xabar matni."""
+    if items is None:
+        items = order.items.all()
     items_text = "\n".join(
-        f"  • {item.product.name} x{item.quantity} — {item.price:,.0f} so'm"
+        f"  • {item.product_name} x{item.quantity} — {item.price:,.0f} so'm"
         for item in items
     )
 
@@ -49,35 +43,29 @@ def send_order_notification(order: Order):
 
     if order.comment:
         message += f"\n💬 <b>Izoh:</b> {order.comment}"
+    return message
 
-    # Har bir admin userga xabar yuborish
-    for admin_id in admin_ids:
-        _send_telegram_message(bot_token, admin_id, message)
-
-
-def send_status_notification(order: Order, new_status: str):
-    """Buyurtma holati o'zgarganda foydalanuvchiga Telegram orqali xabar yuborish."""
-    bot_token = getattr(settings, "BOT_TOKEN", None)
-    if not bot_token:
-        return
-
-    STATUS_LABELS = {
-        "pending": "⏳ Kutilmoqda",
-        "confirmed": "✅ Tasdiqlangan",
-        "processing": "🔄 Tayyorlanmoqda",
-        "shipped": "🚚 Yo'lda",
-        "delivered": "📦 Yetkazildi",
-        "cancelled": "❌ Bekor qilingan",
-    }
-
-    STATUS_MESSAGES = {
-        "confirmed": "Buyurtmangiz tasdiqlandi! Tez orada tayyorlaymiz.",
-        "processing": "Buyurtmangiz tayyorlanmoqda...",
-        "shipped": "Buyurtmangiz yo'lga chiqdi!",
-        "delivered": "Buyurtmangiz yetkazildi! Xaridingiz uchun rahmat!",
-        "cancelled": "Buyurtmangiz bekor qilindi.",
-    }
 
+STATUS_LABELS = {
+    "pending": "⏳ Kutilmoqda",
+    "confirmed": "✅ Tasdiqlangan",
+    "processing": "🔄 Tayyorlanmoqda",
+    "shipped": "🚚 Yo'lda",
+    "delivered": "📦 Yetkazildi",
+    "cancelled": "❌ Bekor qilingan",
+}
+
+STATUS_MESSAGES = {
+    "confirmed": "Buyurtmangiz tasdiqlandi! Tez orada tayyorlaymiz.",
+    "processing": "Buyurtmangiz tayyorlanmoqda...",
+    "shipped": "Buyurtmangiz yo'lga chiqdi!",
+    "delivered": "Buyurtmangiz yetkazildi! Xaridingiz uchun rahmat!",
+    "cancelled": "Buyurtmangiz bekor qilindi.",
+}
+
+
+def status_notification_text(order: Order, new_status: str):
+    """Holat o'zgarishi haqida mijoz uchun xabar matni."""
     status_label = STATUS_LABELS.get(new_status, new_status)
     extra_msg = STATUS_MESSAGES.get(new_status, "")
     total_formatted = f"{order.total:,.0f}".replace(",", " ")
@@ -90,24 +78,37 @@ def send_status_notification(order: Order, new_status: str):
     )
     if extra_msg:
         message += f"\n{extra_msg}"
+    return message
+
 
-    telegram_id = order.user.telegram_id
-    _send_telegram_message(bot_token, telegram_id, message)
-
-
-def _send_telegram_message(bot_token: str, chat_id: int, text: str):
-    """Telegram API orqali xabar yuborish."""
-    try:
-        with httpx.Client(timeout=10) as client:
-            response = client.post(
-                f"https://api.telegram.org/bot{bot_token}/sendMessage",
-                json={
-                    "chat_id": chat_id,
-                    "text": text,
-                    "parse_mode": "HTML",
-                },
-            )
-            if response.status_code != 200:
-                logger.error(f"Telegram xabar yuborishda xatolik: {response.text}")
-    except Exception as e:
-        logger.error(f"Telegram xabar yuborishda xatolik (chat_id={chat_id}): {e}")
+def queue_order_notification(order: Order, items=None):
+    """Yangi buyurtma xabarini adminlar uchun navbatga yozish.
+
+    Chaqiruvchi tranzaksiyasida yoziladi — buyurtma bekor bo'lsa, xabar ham yo'q.
+    """
+    admin_ids = getattr(settings, "ADMIN_IDS", [])
+    if not getattr(settings, "BOT_TOKEN", None) or not admin_ids:
+        logger.warning("BOT_TOKEN yoki ADMIN_IDS sozlanmagan")
+        return []
+
+    text = order_notification_text(order, items)
+    return Notification.objects.bulk_create(
+        Notification(order=order, chat_id=admin_id, text=text) for admin_id in admin_ids
+    )
+
+
+def queue_status_notifications(orders, new_status: str):
+    """Holat o'zgargan buyurtmalar egalariga xabarlarni navbatga yozish.
+
+    `orders` da `user` oldindan yuklangan bo'lishi kerak (select_related).
+    """
+    if not getattr(settings, "BOT_TOKEN", None):
+        return []
+    return Notification.objects.bulk_create(
+        Notification(
+            order=order,
+            chat_id=order.user.telegram_id,
+            text=status_notification_text(order, new_status),
+        )
+        for order in orders
+    )
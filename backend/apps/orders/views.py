@@ -1,13 +1,19 @@
 import logging
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 
 from .models import Order, OrderItem
-from .serializers import OrderSerializer, CreateOrderSerializer
-from .utils import send_order_notification
+from .serializers import CreateOrderSerializer, OrderHistorySerializer, OrderSerializer
+from .idempotency import idempotent
+from .rollup import record_new_order
+from .utils import queue_order_notification
+from apps.cart.models import Cart
+from apps.cart.versioning import change_cart, delete_items
 from apps.products.models import Product
+from apps.products.serializers import get_shape_options
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +26,38 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     serializer_class = OrderSerializer
     http_method_names = ["get", "post"]
+    cursor_ordering_fields = ["created_at"]
 
     def get_queryset(self):
-        if hasattr(self.request.user, "telegram_id"):
-            return Order.objects.filter(user=self.request.user).prefetch_related(
-                "items__product"
+        if not hasattr(self.request.user, "telegram_id"):
+            return Order.objects.none()
+        queryset = Order.objects.filter(user=self.request.user).select_related(
+            "delivery_zone__region"
+        )
+        if self.action == "list":
+            # Tarix: elementlarning muzlatilgan nom/rasmi — mahsulotlarsiz
+            return queryset.prefetch_related(
+                Prefetch("items", queryset=OrderItem.objects.order_by("id"))
+            )
+        return queryset.prefetch_related(self.items_product_prefetch())
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return OrderHistorySerializer
+        return OrderSerializer
+
+    def items_product_prefetch(self):
+        _, _, card = get_shape_options(self.request)
+        if card:
+            return Prefetch(
+                "items__product",
+                queryset=Product.objects.select_related("brand", "primary_image"),
             )
-        return Order.objects.none()
+        return Prefetch(
+            "items__product",
+            queryset=Product.objects.select_related("category", "brand", "primary_image")
+            .prefetch_related("images"),
+        )
 
     def create(self, request, *args, **kwargs):
         if not hasattr(request.user, "telegram_id"):
@@ -35,60 +66,48 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
+        return self._create_order(request)
+
+    @idempotent
+    def _create_order(self, request):
         serializer = CreateOrderSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         data = serializer.validated_data
+        delivery_zone = data["delivery_zone"]
 
         try:
             with transaction.atomic():
-                # Yetkazish zonasi (ixtiyoriy)
-                delivery_zone = None
-                zone_id = data.get("delivery_zone_id")
-                if zone_id:
-                    from apps.delivery.models import DeliveryZone
-
-                    try:
-                        delivery_zone = DeliveryZone.objects.select_related(
-                            "region"
-                        ).get(id=zone_id, is_active=True)
-                    except DeliveryZone.DoesNotExist:
-                        raise ValueError("Yetkazish zonasi topilmadi")
-
-                # Buyurtma yaratish
-                order = Order.objects.create(
-                    user=request.user,
-                    phone=data["phone"],
-                    delivery_address=data.get("delivery_address", ""),
-                    delivery_zone=delivery_zone,
-                    comment=data.get("comment", ""),
-                    payment_method=data.get("payment_method", "cash"),
-                )
+                # Savat mahsulotlardan oldin qulflanadi: savatga qo'shish ham
+                # avval savatni, so'ng (CartItem FK orqali) mahsulotni qulflaydi.
+                # Idempotency-Key bilan hammasi bitta tranzaksiyada — teskari
+                # tartib PostgreSQL'da deadlock berardi.
+                cart = Cart.objects.select_for_update().filter(user=request.user).first()
+
+                # Mahsulotlar bitta so'rovda, id tartibida qulflanadi — bir xil
+                # mahsulotli parallel buyurtmalar bir-birini deadlock qilmaydi
+                product_ids = sorted({item["product_id"] for item in data["items"]})
+                products = {
+                    product.id: product
+                    for product in Product.objects.select_for_update(of=("self",))
+                    .filter(id__in=product_ids, is_active=True)
+                    .select_related("primary_image")
+                    .only("id", "name", "price", "cost_price", "in_stock", "primary_image__image")
+                    .order_by("id")
+                }
 
-                # Elementlarni qo'shish
                 items_total = Decimal("0")
+                lines = []
                 for item_data in data["items"]:
-                    try:
-                        product = Product.objects.select_for_update().get(
-                            id=item_data["product_id"], is_active=True
-                        )
-                    except Product.DoesNotExist:
+                    product = products.get(item_data["product_id"])
+                    if product is None:
                         raise ValueError(
                             f"Mahsulot #{item_data['product_id']} topilmadi"
                         )
-
                     if not product.in_stock:
                         raise ValueError(f"'{product.name}' sotuvda yo'q")
-
-                    OrderItem.objects.create(
-                        order=order,
-                        product=product,
-                        quantity=item_data["quantity"],
-                        price=product.price,
-                        cost_price=product.cost_price,
-                        size=item_data.get("size", ""),
-                    )
                     items_total += product.price * item_data["quantity"]
+                    lines.append((product, item_data))
 
                 # Yetkazish narxini hisoblash
                 if delivery_zone:
@@ -99,9 +118,33 @@ class OrderViewSet(viewsets.ModelViewSet):
                         if items_total >= FREE_DELIVERY_THRESHOLD
                         else DELIVERY_FEE
                     )
-                order.delivery_fee = delivery_fee
-                order.total = items_total + delivery_fee
-                order.save(update_fields=["delivery_fee", "total"])
+
+                order = Order.objects.create(
+                    user=request.user,
+                    phone=data["phone"],
+                    delivery_address=data.get("delivery_address", ""),
+                    delivery_zone=delivery_zone,
+                    comment=data.get("comment", ""),
+                    payment_method=data.get("payment_method", "cash"),
+                    delivery_fee=delivery_fee,
+                    total=items_total + delivery_fee,
+                )
+                order_items = []
+                for product, item_data in lines:
+                    order_item = OrderItem(
+                        order=order,
+                        product=product,
+                        quantity=item_data["quantity"],
+                        price=product.price,
+                        cost_price=product.cost_price,
+                        size=item_data.get("size", ""),
+                    )
+                    order_item.snapshot_product(product)
+                    order_items.append(order_item)
+                OrderItem.objects.bulk_create(order_items)
+                record_new_order(order, order_items)
+                # Adminlarga xabar — buyurtma bilan bitta tranzaksiyada navbatga
+                queue_order_notification(order, items=order_items)
 
         except ValueError as e:
             return Response(
@@ -109,19 +152,16 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Buyurtmadan keyin foydalanuvchi savatini tozalash
-        try:
-            cart = request.user.cart
-            cart.items.all().delete()
-        except Exception as e:
-            logger.warning(f"Savatni tozalashda xatolik (user={request.user.id}): {e}")
-
-        # Admin userlarga notification yuborish
-        try:
-            send_order_notification(order)
-        except Exception as e:
-            logger.error(f"Notification yuborishda xatolik: {e}")
+        # Buyurtmadan keyin foydalanuvchi savatini tozalash (savat bo'lmasa —
+        # yangisini yaratmaymiz, aks holda yangi qulf mahsulotlardan keyin olinadi)
+        if cart is not None:
+            try:
+                with change_cart(cart=cart) as change:
+                    delete_items(change, change.cart.items.all())
+            except Exception as e:
+                logger.warning(f"Savatni tozalashda xatolik (user={request.user.id}): {e}")
 
+        prefetch_related_objects([order], self.items_product_prefetch())
         return Response(
             OrderSerializer(order, context=self.get_serializer_context()).data,
             status=status.HTTP_201_CREATED,
@@ -1,12 +1,16 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from django.db.models import Count
+from django.utils import timezone
 from unfold.admin import ModelAdmin, TabularInline
 from unfold.contrib.import_export.forms import ExportForm, ImportForm
 from unfold.decorators import display, action
 from import_export import fields, resources
 from import_export.admin import ImportExportModelAdmin
 from import_export.widgets import ForeignKeyWidget
+from apps.cart.versioning import touch_product_carts
+from config.dashboard import invalidate_dashboard
+from .cache import bump_catalog_version
+from .renditions import thumbnail_url
 from .models import Banner, Brand, Category, Product, ProductImage
 
 
@@ -79,7 +83,7 @@ class BannerAdmin(ModelAdmin):
             return format_html(
                 '<img src="{}" class="rounded-lg shadow-sm" '
                 'style="width: 80px; height: 40px; object-fit: cover;" />',
-                obj.image.url,
+                thumbnail_url(obj, "image"),
             )
         return format_html(
             '<div class="rounded-lg flex items-center justify-center" '
@@ -127,7 +131,7 @@ class ProductImageInline(TabularInline):
         if obj.image:
             return format_html(
                 '<img src="{}" class="rounded-lg shadow-sm" style="max-width: 80px; max-height: 80px; object-fit: cover;" />',
-                obj.image.url
+                thumbnail_url(obj, "image")
             )
         return format_html('<span class="text-gray-400">—</span>')
 
@@ -142,16 +146,13 @@ class CategoryAdmin(ModelAdmin):
     list_filter = ["is_active"]
     list_filter_submit = True
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).annotate(products_count=Count("products"))
-
     @display(description="Icon", label=True)
     def display_icon(self, obj):
         return obj.icon or "—"
 
     @display(description="Mahsulotlar", ordering="products_count")
     def display_products_count(self, obj):
-        count = getattr(obj, "products_count", 0)
+        count = obj.products_count
         if count > 0:
             return format_html(
                 '<span class="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-primary-100 text-primary-800">{} ta</span>',
@@ -194,16 +195,13 @@ class BrandAdmin(ModelAdmin):
         }),
     )
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).annotate(products_count=Count("products"))
-
     @display(description="Logo")
     def display_logo(self, obj):
         if obj.logo:
             return format_html(
                 '<img src="{}" class="rounded-lg shadow-sm" '
                 'style="width: 48px; height: 48px; object-fit: contain; background:#fff;" />',
-                obj.logo.url,
+                thumbnail_url(obj, "logo"),
             )
         return format_html(
             '<div class="flex items-center justify-center w-12 h-12 bg-pink-100 rounded-lg">'
@@ -213,7 +211,7 @@ class BrandAdmin(ModelAdmin):
 
     @display(description="Mahsulotlar", ordering="products_count")
     def display_products_count(self, obj):
-        count = getattr(obj, "products_count", 0)
+        count = obj.products_count
         if count > 0:
             return format_html(
                 '<span class="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-primary-100 text-primary-800">{} ta</span>',
@@ -304,15 +302,12 @@ class ProductAdmin(ImportExportModelAdmin, ModelAdmin):
 
     @display(description="Rasm")
     def display_image(self, obj):
-        images = list(obj.images.all())
-        main_image = next((i for i in images if i.is_main), None) or (
-            images[0] if images else None
-        )
+        main_image = obj.primary_image
         if main_image and main_image.image:
             return format_html(
                 '<img src="{}" class="rounded-lg shadow-sm" '
                 'style="width: 50px; height: 50px; object-fit: cover;" />',
-                main_image.image.url,
+                thumbnail_url(main_image, "image"),
             )
         return format_html(
             '<div class="flex items-center justify-center w-12 h-12 bg-pink-100 rounded-lg">'
@@ -386,26 +381,38 @@ class ProductAdmin(ImportExportModelAdmin, ModelAdmin):
                 img.save()
         self.message_user(request, f"{queryset.count()} ta mahsulot nusxalandi.")
 
+    def _set_in_stock(self, queryset, in_stock):
+        # `in_stock` bo'yicha filtrlangan changelist'da queryset update'dan
+        # keyin bo'sh qoladi — id'lar oldindan olinadi
+        ids = list(queryset.values_list("pk", flat=True))
+        Product.objects.filter(pk__in=ids).update(in_stock=in_stock, updated_at=timezone.now())
+        bump_catalog_version()
+        touch_product_carts(ids)
+        invalidate_dashboard()
+        return len(ids)
+
     @action(description="Sotuvda deb belgilash", icon="check_circle")
     def mark_in_stock(self, request, queryset):
-        queryset.update(in_stock=True)
-        self.message_user(request, f"{queryset.count()} ta mahsulot sotuvda deb belgilandi.")
+        count = self._set_in_stock(queryset, True)
+        self.message_user(request, f"{count} ta mahsulot sotuvda deb belgilandi.")
 
     @action(description="Sotuvda emas deb belgilash", icon="remove_circle")
     def mark_out_of_stock(self, request, queryset):
-        queryset.update(in_stock=False)
-        self.message_user(request, f"{queryset.count()} ta mahsulot sotuvda emas deb belgilandi.")
+        count = self._set_in_stock(queryset, False)
+        self.message_user(request, f"{count} ta mahsulot sotuvda emas deb belgilandi.")
 
     @action(description="Maxsus deb belgilash", icon="star")
     def mark_featured(self, request, queryset):
-        queryset.update(is_featured=True)
+        queryset.update(is_featured=True, updated_at=timezone.now())
+        bump_catalog_version()
         self.message_user(request, f"{queryset.count()} ta mahsulot maxsus deb belgilandi.")
 
     @action(description="Maxsusdan chiqarish", icon="star_border")
     def unmark_featured(self, request, queryset):
-        queryset.update(is_featured=False)
+        queryset.update(is_featured=False, updated_at=timezone.now())
+        bump_catalog_version()
         self.message_user(request, f"{queryset.count()} ta mahsulot maxsusdan chiqarildi.")
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related("brand", "category").prefetch_related("images")
+        return super().get_queryset(request).select_related("brand", "category", "primary_image")
 
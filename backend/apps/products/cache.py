@@ -0,0 +1,98 @@
+"""Katalog javoblari keshi.
+
+Kalit = katalog versiyasi + so'rov parametrlari (normallashtirilgan). Mahsulot,
+rasm, brend yoki kategoriya o'zgarganda versiya oshiriladi (`signals.py`) —
+eski kalitlar o'z-o'zidan ishlatilmay qoladi va TTL bilan tozalanadi.
+"""
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Kalit yo'qolgan bo'lsa (restart, eviction) — vaqtdan boshlaymiz,
+        # shunda eski versiyadagi yozuvlar qayta ishlatilmaydi.
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def _incr_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+
+
+def bump_catalog_version():
+    """Katalog keshini eskirtirish.
+
+    Darhol va commit'dan keyin yana oshiriladi: tranzaksiya davomida eski
+    ma'lumotni o'qigan parallel so'rov uni yangi versiya ostida saqlab
+    qo'ymasligi uchun.
+    """
+    _incr_catalog_version()
+    transaction.on_commit(_incr_catalog_version)
+
+
+def normalize_params(query_params):
+    """Bo'sh qiymatlarni tashlab, parametrlarni tartiblangan ro'yxatga keltiradi."""
+    items = []
+    for key in sorted(query_params.keys()):
+        values = sorted(v.strip() for v in query_params.getlist(key) if v.strip())
+        if key == "cursor":
+            # Bo'sh `?cursor=` ham ma'noli — keyset rejimining birinchi sahifasi
+            values = values or [""]
+        elif not values or (key == "page" and values == ["1"]):
+            continue
+        items.append((key, values))
+    return items
+
+
+def catalog_cache_key(prefix, request, **kwargs):
+    # Rasm URL'lari build_absolute_uri bilan quriladi — sxema va host ham kalitda
+    raw = repr((
+        request.scheme,
+        request.get_host(),
+        sorted(kwargs.items()),
+        normalize_params(request.query_params),
+    ))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"catalog:{get_catalog_version()}:{prefix}:{digest}"
+
+
+def make_etag(data, *parts):
+    """Javob ma'lumotidan kuchli (strong) ETag."""
+    raw = json.dumps([data, *parts], cls=JSONEncoder, sort_keys=True, ensure_ascii=False)
+    return f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def cached_catalog_response(prefix):
+    """ViewSet action'i javobini katalog versiyasi bo'yicha keshlaydi."""
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = catalog_cache_key(prefix, request, **kwargs)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,90 @@
+"""Read-only API uchun shartli GET (ETag / Last-Modified).
+
+Javob tayyorlashdan oldin view'ga bog'liq modellar bo'yicha bitta yengil so'rov
+yuboriladi — har biri uchun `MAX(updated_at)` va `COUNT(*)` (o'chirilgan
+yozuvni sezish uchun). `If-None-Match` yoki `If-Modified-Since` mos kelsa —
+serializatsiyasiz 304 qaytadi.
+
+`.update()` bilan o'zgartirilganda `updated_at` ni ham qo'lda yangilash
+kerak (auto_now faqat `save()` da ishlaydi). O'chirish faqat ETag'da
+seziladi — `If-Modified-Since` uchun oxirgi o'zgarish vaqti o'zgarmaydi.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, Max, Value
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .cache import get_catalog_version, normalize_params
+
+
+def probe(models):
+    """`{model label: (MAX(updated_at), COUNT(*))}` — bitta SQL so'rovda."""
+    branches = [
+        model._default_manager.order_by()
+        .values(model=Value(model._meta.label, output_field=CharField()))
+        .annotate(last=Max("updated_at"), count=Count("pk"))
+        for model in models
+    ]
+    rows = branches[0].union(*branches[1:], all=True)
+    return {row["model"]: (row["last"], row["count"]) for row in rows}
+
+
+class ConditionalGetMixin:
+    """ReadOnly ViewSet'lar uchun ETag va Last-Modified.
+
+    `conditional_models` — javobga ta'sir qiluvchi barcha modellar
+    (ichki serializerlar va annotatsiyalar ham).
+    """
+
+    conditional_models = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        view = condition(etag_func=self._etag, last_modified_func=self._last_modified)
+        response = view(super().dispatch)(request, *args, **kwargs)
+        # Brauzer taxminiy (heuristic) keshlamasin — har safar tekshirsin
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def get_conditional_state(self):
+        return probe(self.conditional_models)
+
+    def _probe(self, request):
+        if not hasattr(request, "_conditional_probe"):
+            request._conditional_probe = self.get_conditional_state()
+        return request._conditional_probe
+
+    def _etag(self, request, *args, **kwargs):
+        state = sorted(
+            (label, last.isoformat() if last else None, count)
+            for label, (last, count) in self._probe(request).items()
+        )
+        # Rasm URL'lari absolyut, format Accept'ga bog'liq — ular ham kalitda
+        raw = repr((
+            state,
+            request.scheme,
+            request.get_host(),
+            request.path,
+            normalize_params(request.GET),
+            request.headers.get("Accept", ""),
+        ))
+        return f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+    def _last_modified(self, request, *args, **kwargs):
+        stamps = [last for last, _ in self._probe(request).values() if last]
+        return max(stamps) if stamps else None
+
+
+class CatalogConditionalGetMixin(ConditionalGetMixin):
+    """Katalog view'lari uchun: probe natijasi katalog versiyasi ostida
+    keshlanadi — iliq keshda 304 ham, 200 ham bazaga bormaydi."""
+
+    def get_conditional_state(self):
+        key = f"catalog:{get_catalog_version()}:probe:{type(self).__name__}"
+        state = cache.get(key)
+        if state is None:
+            state = super().get_conditional_state()
+            cache.set(key, state, settings.CATALOG_CACHE_TIMEOUT)
+        return state
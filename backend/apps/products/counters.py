@@ -0,0 +1,60 @@
+"""Brend va kategoriyalardagi faol mahsulotlar soni (`products_count`).
+
+Mahsulot yaratilganda, o'chirilganda, faolsizlantirilganda yoki boshqa
+brend/kategoriyaga ko'chirilganda `F()` bilan o'sha tranzaksiyada
+o'zgartiriladi (`Product.save`, `signals.py`). `recount_catalog_counters`
+buyrug'i hammasini bazadagi haqiqiy sonlardan qayta hisoblaydi.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def counter_state(product):
+    """Mahsulotning hisoblagichlarga hissasi: (category_id, brand_id) yoki None."""
+    if not product.is_active:
+        return None
+    return product.category_id, product.brand_id
+
+
+def _adjust(state, delta):
+    from .models import Brand, Category
+
+    category_id, brand_id = state
+    if category_id:
+        Category.objects.filter(pk=category_id).update(products_count=F("products_count") + delta)
+    if brand_id:
+        Brand.objects.filter(pk=brand_id).update(products_count=F("products_count") + delta)
+
+
+def apply_counter_change(old, new):
+    """Eski holatdan yangisiga o'tishdagi farqni yozish."""
+    if old == new:
+        return
+    if old:
+        _adjust(old, -1)
+    if new:
+        _adjust(new, 1)
+
+
+def active_count_subquery(field):
+    from .models import Product
+
+    counts = (
+        Product.objects.filter(is_active=True, **{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def recount(model, field):
+    """`model` (Brand/Category) hisoblagichlarini bitta UPDATE bilan tuzatish.
+
+    Faqat noto'g'ri qatorlar yangilanadi; ularning soni qaytariladi.
+    """
+    actual = active_count_subquery(field)
+    drifted = model.objects.annotate(actual=actual).exclude(products_count=F("actual"))
+    return drifted.update(products_count=actual, updated_at=timezone.now())
@@ -0,0 +1,111 @@
+"""Katalog filtrlari uchun facet sonlari.
+
+Har bir facet o'z parametrisiz (qolgan filtrlar qo'llangan holda) sanaladi —
+foydalanuvchi boshqa variantni tanlasa nechta natija chiqishini ko'radi.
+Barcha guruhlangan so'rovlar `UNION ALL` bilan bitta SQL'ga birlashtiriladi.
+"""
+from django.db.models import Case, CharField, Count, F, IntegerField, Value, When
+from django.db.models.functions import Cast, Floor
+from django_filters.utils import translate_validation
+
+from .filters import ProductFilter
+from .models import Product
+from .search import search_products
+
+PRICE_STEP = 50000
+
+# facet → uni sanashda e'tiborga olinmaydigan filtr parametrlari
+FACET_PARAMS = {
+    "category": ["category"],
+    "brand": ["brand"],
+    "product_type": ["product_type"],
+    "skin_type": ["skin_type"],
+    "is_featured": ["is_featured"],
+    "in_stock": ["in_stock"],
+    "price": ["min_price", "max_price"],
+}
+
+
+def _bool_text(field):
+    return Case(When(**{field: True}, then=Value("true")), default=Value("false"), output_field=CharField())
+
+
+def _facet_values(facet, price_step):
+    """facet uchun (value, label) ifodalari."""
+    if facet == "category":
+        return F("category__slug"), F("category__name")
+    if facet == "brand":
+        return F("brand__slug"), F("brand__name")
+    if facet in ("is_featured", "in_stock"):
+        return _bool_text(facet), Value("")
+    if facet == "price":
+        bucket = Cast(Floor(F("price") / price_step), IntegerField()) * price_step
+        return Cast(bucket, CharField()), Value("")
+    return F(facet), Value("")
+
+
+def _filtered(base, params, skip=()):
+    data = params.copy()
+    for name in skip:
+        data.pop(name, None)
+    filterset = ProductFilter(data=data, queryset=base)
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    queryset = filterset.qs
+    term = params.get("search", "").strip()
+    if term:
+        queryset = search_products(queryset, term)
+    return queryset.order_by()
+
+
+def compute_facets(params, price_step=PRICE_STEP):
+    base = Product.objects.filter(is_active=True)
+    branches = [
+        _filtered(base, params).values(
+            facet=Value("total", output_field=CharField()),
+            value=Value("", output_field=CharField()),
+            label=Value("", output_field=CharField()),
+        ).annotate(count=Count("id"))
+    ]
+    for facet, skip in FACET_PARAMS.items():
+        value, label = _facet_values(facet, price_step)
+        queryset = _filtered(base, params, skip)
+        if facet == "brand":
+            queryset = queryset.filter(brand__isnull=False)
+        elif facet == "skin_type":
+            queryset = queryset.exclude(skin_type="")
+        branches.append(
+            queryset.values(
+                facet=Value(facet, output_field=CharField()),
+                value=Cast(value, CharField()),
+                label=Cast(label, CharField()),
+            ).annotate(count=Count("id"))
+        )
+
+    rows = branches[0].union(*branches[1:], all=True)
+    return _shape(rows, price_step)
+
+
+def _shape(rows, price_step):
+    labels = {
+        "product_type": dict(Product.PRODUCT_TYPES),
+        "skin_type": dict(Product.SKIN_TYPES),
+    }
+    result = {facet: [] for facet in FACET_PARAMS}
+    result["total"] = 0
+    for row in rows:
+        facet, value, count = row["facet"], row["value"], row["count"]
+        if facet == "total":
+            result["total"] = count
+        elif facet == "price":
+            start = int(value)
+            result["price"].append({"min": start, "max": start + price_step, "count": count})
+        else:
+            label = row["label"] or labels.get(facet, {}).get(value, value)
+            result[facet].append({"value": value, "label": label, "count": count})
+
+    result["price"].sort(key=lambda bucket: bucket["min"])
+    for facet in FACET_PARAMS:
+        if facet != "price":
+            result[facet].sort(key=lambda item: (-item["count"], item["label"]))
+    return result
@@ -1,5 +1,8 @@
 import django_filters
+from rest_framework.filters import BaseFilterBackend
+
 from .models import Product
+from .search import search_products
 
 
 class ProductFilter(django_filters.FilterSet):
@@ -17,3 +20,22 @@ class ProductFilter(django_filters.FilterSet):
     class Meta:
         model = Product
         fields = ["category", "brand", "product_type", "skin_type", "is_featured", "in_stock"]
+
+
+class ProductSearchFilter(BaseFilterBackend):
+    """`?search=` — to'liq matnli, reyting bo'yicha tartiblangan qidiruv.
+
+    OrderingFilter'dan keyin turishi kerak: `ordering` berilmagan bo'lsa,
+    natijalar avval reyting, keyin sana bo'yicha tartiblanadi.
+    """
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "").strip()
+        if not term:
+            return queryset
+        queryset = search_products(queryset, term)
+        if request.query_params.get("ordering"):
+            return queryset
+        return queryset.order_by("-search_rank", "-created_at")
@@ -0,0 +1,47 @@
+"""Bosh sahifa javobi: bannerlar, kategoriyalar, tavsiya brendlar, tavsiya va
+yangi mahsulotlar — bitta so'rovda.
+
+So'rovlar soni ma'lumot hajmiga bog'liq emas (6 ta): har bir bo'lim uchun
+bittadan, mahsulot rasmlari esa ikkala bo'lim uchun bitta prefetch bilan
+(`shape=card` da asosiy rasm select_related bilan keladi — 5 ta).
+"""
+from django.db.models import prefetch_related_objects
+
+from .models import Banner, Brand, Category, Product
+from .serializers import (
+    BannerSerializer,
+    BrandSerializer,
+    CategorySerializer,
+    ProductListSerializer,
+    get_shape_options,
+)
+
+SECTION_SIZE = 10
+
+
+def _products(request):
+    _, expand, card = get_shape_options(request)
+    queryset = Product.objects.filter(is_active=True).select_related("category", "brand")
+    if card:
+        queryset = ProductListSerializer.card_queryset(queryset, expand).prefetch_related(None)
+        lookups = ["images"] if "images" in expand else []
+    else:
+        lookups = ["images"]
+
+    featured = list(queryset.filter(is_featured=True)[:SECTION_SIZE])
+    new_arrivals = list(queryset.order_by("-created_at")[:SECTION_SIZE])
+    prefetch_related_objects(featured + new_arrivals, *lookups)
+    return featured, new_arrivals
+
+
+def build_home(request):
+    context = {"request": request}
+    featured, new_arrivals = _products(request)
+    brands = Brand.objects.filter(is_active=True, is_featured=True)
+    return {
+        "banners": BannerSerializer(Banner.objects.filter(is_active=True), many=True, context=context).data,
+        "categories": CategorySerializer(Category.objects.filter(is_active=True), many=True, context=context).data,
+        "featured_brands": BrandSerializer(brands, many=True, context=context).data,
+        "featured_products": ProductListSerializer(featured, many=True, context=context).data,
+        "new_arrivals": ProductListSerializer(new_arrivals, many=True, context=context).data,
+    }
@@ -0,0 +1,45 @@
+"""Rasm renditsiyalarini yasash (faqat Pillow).
+
+Bu modul Django'ga bog'liq emas — ProcessPoolExecutor ishchi jarayonida
+(spawn) sozlamalarsiz import qilinadi.
+"""
+import os
+
+from PIL import Image, ImageOps
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def render_renditions(source_path, output_dir, stem, widths):
+    """Asl rasmdan har bir kenglik uchun WebP va JPEG nusxa yasaydi.
+
+    Kattalashtirilmaydi: asl rasmdan keng o'lchamlar tashlab ketiladi (asl
+    kenglik bitta renditsiya sifatida qo'shiladi). Natija:
+    `{"320": {"webp": "<fayl nomi>", "jpeg": "<fayl nomi>"}, ...}` —
+    nomlar `output_dir` ga nisbatan.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    result = {}
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        targets = sorted({w for w in widths if w < image.width} | {min(max(widths), image.width)})
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+            webp_name = f"{stem}_w{width}.webp"
+            resized.save(os.path.join(output_dir, webp_name), "WEBP", quality=WEBP_QUALITY, method=4)
+
+            jpeg_name = f"{stem}_w{width}.jpg"
+            flat = resized
+            if resized.mode == "RGBA":
+                flat = Image.new("RGB", resized.size, "white")
+                flat.paste(resized, mask=resized.split()[3])
+            flat.save(os.path.join(output_dir, jpeg_name), "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+
+            result[str(width)] = {"webp": webp_name, "jpeg": jpeg_name}
+    return result
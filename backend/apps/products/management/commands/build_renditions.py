@@ -0,0 +1,59 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.products.imaging import render_renditions
+from apps.products.renditions import (
+    needs_renditions,
+    rendition_fields,
+    rendition_job,
+    store_renditions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mavjud rasmlar uchun WebP/JPEG renditsiyalarini yasash. Tayyor "
+        "rasmlar o'tkazib yuboriladi — to'xtatilsa, qayta ishga tushirish kifoya."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--force", action="store_true", help="Tayyorlarini ham qayta yasash")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            for model, field in rendition_fields().items():
+                done = failed = 0
+                queryset = model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+                batch = []
+                for obj in queryset.only("pk", field, "renditions").order_by("pk").iterator(chunk_size=batch_size):
+                    if options["force"] or needs_renditions(obj, field):
+                        batch.append(obj)
+                    if len(batch) >= batch_size:
+                        ok, err = self._run(executor, model, field, batch)
+                        done, failed, batch = done + ok, failed + err, []
+                if batch:
+                    ok, err = self._run(executor, model, field, batch)
+                    done, failed = done + ok, failed + err
+                self.stdout.write(f"{model.__name__}: {done} ta tayyor, {failed} ta xato")
+        self.stdout.write(self.style.SUCCESS("Renditsiyalar yangilandi."))
+
+    def _run(self, executor, model, field, batch):
+        jobs = [(obj, *rendition_job(obj, field)) for obj in batch]
+        futures = [(obj, source, rel_dir, executor.submit(render_renditions, *args)) for obj, source, rel_dir, args in jobs]
+        ok = err = 0
+        for obj, source, rel_dir, future in futures:
+            try:
+                store_renditions(model, obj.pk, field, source, rel_dir, future.result())
+                ok += 1
+            except Exception as e:
+                err += 1
+                self.stderr.write(f"{model.__name__} #{obj.pk}: {e}")
+        return ok, err
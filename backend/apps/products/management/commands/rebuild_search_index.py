@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.models import Product
+from apps.products.search import index_products
+
+
+class Command(BaseCommand):
+    help = "Mahsulotlar qidiruv indeksini to'liq qayta qurish"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        batch, total = [], 0
+        for product in Product.objects.select_related("brand").iterator(chunk_size=batch_size):
+            batch.append(product)
+            if len(batch) >= batch_size:
+                index_products(batch)
+                total += len(batch)
+                batch = []
+        index_products(batch)
+        total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"{total} ta mahsulot indekslandi."))
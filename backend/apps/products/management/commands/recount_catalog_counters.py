@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.products.cache import bump_catalog_version
+from apps.products.counters import recount
+from config.badges import invalidate_badge
+from apps.products.models import Brand, Category
+
+
+class Command(BaseCommand):
+    help = "Brend va kategoriyalardagi faol mahsulotlar sonini qayta hisoblash"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            brands = recount(Brand, "brand")
+            categories = recount(Category, "category")
+            if brands or categories:
+                bump_catalog_version()
+                invalidate_badge("products")
+        self.stdout.write(self.style.SUCCESS(
+            f"Tuzatildi: {brands} ta brend, {categories} ta kategoriya."
+        ))
@@ -0,0 +1,102 @@
+import re
+import unicodedata
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Migratsiya jonli koddan (apps.products.search) mustaqil bo'lishi uchun
+# jadval nomi va indekslash shu yerda muzlatilgan.
+FTS_TABLE = "products_product_fts"
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(
+    fields=["search_vector"], name="products_product_search_gin"
+)
+
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo",
+    "ж": "j", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "x", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "",
+    "ы": "i", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "ў": "o", "қ": "q", "ғ": "g", "ҳ": "h",
+}
+
+
+def normalize_text(text):
+    if not text:
+        return ""
+    text = "".join(CYRILLIC_TO_LATIN.get(ch, ch) for ch in text.lower())
+    for ch in "'`ʻʼ‘’":
+        text = text.replace(ch, "")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def document(product):
+    return (
+        normalize_text(product.name),
+        normalize_text(product.brand.name if product.brand_id else ""),
+        normalize_text(product.description),
+    )
+
+
+def index_all(Product, schema_editor):
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models import Value
+
+    products = list(Product.objects.select_related("brand"))
+    if not products:
+        return
+    if schema_editor.connection.vendor == "postgresql":
+        for product in products:
+            name, brand, description = document(product)
+            product.search_vector = (
+                SearchVector(Value(name), weight="A", config="simple")
+                + SearchVector(Value(brand), weight="B", config="simple")
+                + SearchVector(Value(description), weight="C", config="simple")
+            )
+        Product.objects.bulk_update(products, ["search_vector"], batch_size=500)
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name, brand, description) "
+            "VALUES (%s, %s, %s, %s)",
+            [(p.pk, *document(p)) for p in products],
+        )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(name, brand, description, tokenize='unicode61')"
+        )
+    elif vendor != "postgresql":
+        return
+    index_all(apps.get_model("products", "Product"), schema_editor)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_alter_product_cost_price"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # SQLite'da oddiy indeks bo'ladi (USING gin e'tiborsiz qoldiriladi)
+        migrations.AddIndex(model_name="product", index=SEARCH_INDEX),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
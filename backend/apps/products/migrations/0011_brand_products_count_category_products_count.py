@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:31
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    for model_name, field in (("Brand", "brand"), ("Category", "category")):
+        counts = (
+            Product.objects.filter(is_active=True, **{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        apps.get_model("products", model_name).objects.update(
+            products_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_banner_updated_at_brand_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brand',
+            name='products_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Faol mahsulotlar soni (avtomatik)'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='products_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Faol mahsulotlar soni (avtomatik)'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
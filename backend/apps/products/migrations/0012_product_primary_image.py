@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_primary_image(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    ProductImage = apps.get_model("products", "ProductImage")
+    Product.objects.update(
+        primary_image=Subquery(
+            ProductImage.objects.filter(product=OuterRef("pk"))
+            .order_by("-is_main", "order", "id")
+            .values("pk")[:1]
+        )
+    )
+    # Eski ma'lumotda bir nechta is_main bo'lishi mumkin — faqat tanlangani qoladi
+    ProductImage.objects.filter(is_main=True).exclude(
+        pk__in=Product.objects.filter(primary_image__isnull=False).values("primary_image")
+    ).update(is_main=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_brand_products_count_category_products_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.productimage'),
+        ),
+        migrations.RunPython(fill_primary_image, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,24 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
 from django.utils.text import slugify
 
+from .counters import apply_counter_change, counter_state
+
+
+def without_fields(instance, save_kwargs, *names):
+    """Alohida (F()/signal bilan) yuritiladigan ustunlarni `save()` eskirgan
+    qiymat bilan ustidan yozmasligi uchun `update_fields` ni cheklash."""
+    if instance.pk is None or instance._state.adding or save_kwargs.get("update_fields") is not None:
+        return save_kwargs
+    fields = [
+        f.name for f in instance._meta.concrete_fields
+        if not f.primary_key and f.name not in names
+    ]
+    return {**save_kwargs, "update_fields": fields}
+
 
 class Banner(models.Model):
     """Bosh sahifa carousel bannerlari"""
@@ -15,9 +33,11 @@ class Banner(models.Model):
     )
     link = models.CharField(max_length=200, blank=True, help_text="Bosilganda o'tish linki")
     image = models.ImageField(upload_to="banners/", blank=True, null=True)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Banner"
@@ -35,8 +55,13 @@ class Category(models.Model):
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     icon = models.CharField(max_length=10, blank=True, help_text="Emoji")
     image = models.ImageField(upload_to="categories/", blank=True, null=True)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    products_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Faol mahsulotlar soni (avtomatik)"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Kategoriya"
@@ -49,7 +74,7 @@ class Category(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name, allow_unicode=True)
-        super().save(*args, **kwargs)
+        super().save(*args, **without_fields(self, kwargs, "products_count"))
 
 
 class Brand(models.Model):
@@ -58,12 +83,17 @@ class Brand(models.Model):
     name = models.CharField(max_length=120)
     slug = models.SlugField(max_length=120, unique=True, blank=True)
     logo = models.ImageField(upload_to="brands/", blank=True, null=True)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     country = models.CharField(max_length=80, blank=True, help_text="Ishlab chiqaruvchi davlat")
     description = models.TextField(blank=True)
     is_featured = models.BooleanField(default=False, help_text="Bosh sahifada ko'rsatish")
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
+    products_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Faol mahsulotlar soni (avtomatik)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Brend"
@@ -76,7 +106,7 @@ class Brand(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name, allow_unicode=True)
-        super().save(*args, **kwargs)
+        super().save(*args, **without_fields(self, kwargs, "products_count"))
 
 
 class Product(models.Model):
@@ -135,10 +165,24 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Asosiy rasm (is_main, bo'lmasa birinchisi) — ProductImage signallari yuritadi
+    primary_image = models.ForeignKey(
+        "ProductImage",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+
+    # PostgreSQL qidiruv indeksi (search.py). SQLite'da FTS5 jadvali ishlatiladi.
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         verbose_name = "Mahsulot"
         verbose_name_plural = "Mahsulotlar"
         ordering = ["-created_at"]
+        indexes = [GinIndex(fields=["search_vector"], name="products_product_search_gin")]
 
     def __str__(self):
         return self.name
@@ -148,7 +192,24 @@ class Product(models.Model):
         # CSV importdagi bo'sh katak yoki API None yuborsa — 0 deb yozamiz.
         if self.cost_price is None:
             self.cost_price = 0
-        super().save(*args, **kwargs)
+        if self.pk is None:
+            # Nusxalangan mahsulot asl mahsulot rasmini ko'rsatib qolmasin
+            self.primary_image = None
+        with transaction.atomic():
+            # Eski holat bazadan (qator qulflanadi) — eskirgan obyekt yoki
+            # parallel saqlash hisoblagichlarni ikki marta o'zgartirmasin
+            old = None
+            if self.pk:
+                row = (
+                    Product.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values("is_active", "category_id", "brand_id")
+                    .first()
+                )
+                if row and row["is_active"]:
+                    old = (row["category_id"], row["brand_id"])
+            super().save(*args, **without_fields(self, kwargs, "primary_image"))
+            apply_counter_change(old, counter_state(self))
 
     @property
     def discount_percent(self):
@@ -165,13 +226,22 @@ class Product(models.Model):
 
     @property
     def main_image(self):
-        main = self.images.filter(is_main=True).first()
-        if not main:
-            main = self.images.first()
-        if main and main.image:
-            return main.image.url
+        # select_related("primary_image") bilan qo'shimcha so'rovsiz
+        if self.primary_image_id and self.primary_image.image:
+            return self.primary_image.image.url
         return None
 
+    @classmethod
+    def refresh_primary_image(cls, product_id):
+        """`primary_image` ni rasmlar jadvalidan qayta tanlash (bitta UPDATE)."""
+        cls.objects.filter(pk=product_id).update(
+            primary_image=Subquery(
+                ProductImage.objects.filter(product=OuterRef("pk"))
+                .order_by(*ProductImage.MAIN_ORDERING)
+                .values("pk")[:1]
+            )
+        )
+
 
 class ProductImage(models.Model):
     """Mahsulot rasmi"""
@@ -180,8 +250,13 @@ class ProductImage(models.Model):
         Product, on_delete=models.CASCADE, related_name="images"
     )
     image = models.ImageField(upload_to="products/", blank=True, null=True)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     is_main = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Asosiy rasmni tanlash tartibi
+    MAIN_ORDERING = ["-is_main", "order", "id"]
 
     class Meta:
         verbose_name = "Mahsulot rasmi"
@@ -194,7 +269,15 @@ class ProductImage(models.Model):
     def save(self, *args, **kwargs):
         with transaction.atomic():
             if self.is_main:
-                ProductImage.objects.filter(
-                    product=self.product, is_main=True
-                ).update(is_main=False)
+                # is_main faqat bitta rasmda — u esa primary_image. Boshqa
+                # rasmlarni skanerlash o'rniga faqat oldingi asosiyni tushiramiz.
+                previous = (
+                    Product.objects.filter(pk=self.product_id)
+                    .values_list("primary_image_id", flat=True)
+                    .first()
+                )
+                if previous and previous != self.pk:
+                    ProductImage.objects.filter(pk=previous, is_main=True).update(
+                        is_main=False, updated_at=timezone.now()
+                    )
             super().save(*args, **kwargs)
@@ -0,0 +1,152 @@
+"""Yuklangan rasmlar uchun WebP/JPEG renditsiyalar.
+
+Rasm saqlangach (commit'dan keyin) renditsiyalar process pool'da yasaladi va
+modelning `renditions` maydoniga yoziladi:
+`{"source": "<asl fayl>", "widths": {"320": {"webp": ..., "jpeg": ...}}}`.
+`source` joriy fayl nomiga mos kelmasa, renditsiyalar eskirgan hisoblanadi.
+Rasm almashtirilsa yoki o'chirilsa, eski renditsiya fayllari ham o'chiriladi.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+from .imaging import render_renditions
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = (320, 640, 1024)
+RENDITIONS_DIR = "renditions"
+
+_executor = None
+
+
+def rendition_fields():
+    """Renditsiya yasaladigan model → rasm maydoni."""
+    from .models import Banner, Brand, Category, ProductImage
+
+    return {ProductImage: "image", Brand: "logo", Banner: "image", Category: "image"}
+
+
+def needs_renditions(instance, field):
+    file = getattr(instance, field)
+    return bool(file) and (instance.renditions or {}).get("source") != file.name
+
+
+def rendition_job(instance, field):
+    source = getattr(instance, field).name
+    rel_dir = f"{RENDITIONS_DIR}/{os.path.dirname(source)}".rstrip("/")
+    stem = os.path.splitext(os.path.basename(source))[0]
+    args = (default_storage.path(source), default_storage.path(rel_dir), stem, RENDITION_WIDTHS)
+    return source, rel_dir, args
+
+
+def rendition_names(renditions):
+    """`renditions` maydonidagi barcha fayl nomlari."""
+    return {
+        name
+        for names in (renditions or {}).get("widths", {}).values()
+        for name in names.values()
+    }
+
+
+def delete_rendition_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            logger.warning(f"Renditsiya faylini o'chirib bo'lmadi ({name}): {e}")
+
+
+def store_renditions(model, pk, field, source, rel_dir, rendered):
+    renditions = {
+        "source": source,
+        "widths": {
+            width: {fmt: f"{rel_dir}/{name}" for fmt, name in names.items()}
+            for width, names in rendered.items()
+        },
+    }
+    previous = model.objects.filter(pk=pk).values_list("renditions", flat=True).first()
+    # Fayl shu orada almashtirilgan bo'lsa — yozmaymiz (yangisi o'z navbatida)
+    updated = model.objects.filter(pk=pk, **{field: source}).update(
+        renditions=renditions, updated_at=timezone.now()
+    )
+    if updated:
+        # Almashtirilgan rasmning renditsiyalari endi hech kimga kerak emas
+        delete_rendition_files(rendition_names(previous) - rendition_names(renditions))
+        bump_catalog_version()
+    return updated
+
+
+def build_renditions(instance, field):
+    """Renditsiyalarni joriy jarayonda yasash (backfill va test uchun)."""
+    source, rel_dir, args = rendition_job(instance, field)
+    rendered = render_renditions(*args)
+    return store_renditions(type(instance), instance.pk, field, source, rel_dir, rendered)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_RENDITION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def schedule_renditions(instance, field):
+    """Renditsiyalarni so'rov oqimidan tashqarida yasashga navbatga qo'yish."""
+    if not settings.IMAGE_RENDITION_WORKERS:
+        build_renditions(instance, field)
+        return
+    model, pk = type(instance), instance.pk
+    source, rel_dir, args = rendition_job(instance, field)
+
+    def on_done(future):
+        try:
+            store_renditions(model, pk, field, source, rel_dir, future.result())
+        except Exception as e:
+            logger.error(f"Renditsiya yasashda xatolik ({model.__name__} #{pk}): {e}")
+        finally:
+            connection.close()
+
+    get_executor().submit(render_renditions, *args).add_done_callback(on_done)
+
+
+def _url(name, request=None):
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request else url
+
+
+def rendition_srcset(instance, field, request=None):
+    """`{"webp": {"320": url, ...}, "jpeg": {...}}` yoki eskirgan bo'lsa `{}`."""
+    file = getattr(instance, field)
+    renditions = instance.renditions or {}
+    if not file or renditions.get("source") != file.name:
+        return {}
+    srcset = {}
+    for width, names in sorted(renditions["widths"].items(), key=lambda item: int(item[0])):
+        for fmt, name in names.items():
+            srcset.setdefault(fmt, {})[width] = _url(name, request)
+    return srcset
+
+
+def thumbnail_url(instance, field, width=320):
+    """Admin preview uchun eng kichik mos WebP renditsiya, bo'lmasa asl rasm."""
+    file = getattr(instance, field)
+    if not file:
+        return None
+    srcset = rendition_srcset(instance, field).get("webp", {})
+    fitting = [w for w in srcset if int(w) >= width]
+    if fitting:
+        return srcset[min(fitting, key=int)]
+    if srcset:
+        return srcset[max(srcset, key=int)]
+    return file.url
@@ -0,0 +1,154 @@
+"""Mahsulotlar bo'yicha to'liq matnli qidiruv.
+
+PostgreSQL: `Product.search_vector` (GIN indeks) — nom (A), brend (B) va
+tavsif (C) og'irliklari bilan, `ts_rank` bo'yicha tartiblanadi.
+SQLite (dev): `products_product_fts` FTS5 jadvali, `bm25` bo'yicha.
+
+Ikkala holatda ham matn `normalize_text` orqali o'tadi: kirill yozuvi lotinga
+o'giriladi, apostrof va diakritiklar olib tashlanadi — "крем", "krem" va
+"o'g'il"/"ogil" bir xil topiladi.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, FloatField, Value, When
+
+FTS_TABLE = "products_product_fts"
+
+# Name > brend > tavsif (SQLite bm25 uchun ustun og'irliklari)
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+# FTS natijalari soni chegarasi (dev fallback uchun yetarli)
+FTS_LIMIT = 500
+
+# PostgreSQL'da bitta UPDATE'dagi mahsulotlar soni
+BATCH_SIZE = 500
+
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo",
+    "ж": "j", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "x", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "",
+    "ы": "i", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    # O'zbek kirill harflari
+    "ў": "o", "қ": "q", "ғ": "g", "ҳ": "h",
+}
+
+APOSTROPHES = "'`ʻʼ‘’"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text):
+    """Matnni qidiruv uchun yagona lotin ko'rinishiga keltiradi."""
+    if not text:
+        return ""
+    text = "".join(CYRILLIC_TO_LATIN.get(ch, ch) for ch in text.lower())
+    for ch in APOSTROPHES:
+        text = text.replace(ch, "")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_RE.findall(text))
+
+
+def tokenize(text):
+    return normalize_text(text).split()
+
+
+def _document(product):
+    brand_name = product.brand.name if product.brand_id else ""
+    return (
+        normalize_text(product.name),
+        normalize_text(brand_name),
+        normalize_text(product.description),
+    )
+
+
+def _is_postgres():
+    return connection.vendor == "postgresql"
+
+
+def search_vector_expression(product):
+    """PostgreSQL uchun og'irlikli tsvector ifodasi."""
+    from django.contrib.postgres.search import SearchVector
+
+    name, brand, description = _document(product)
+    return (
+        SearchVector(Value(name), weight="A", config="simple")
+        + SearchVector(Value(brand), weight="B", config="simple")
+        + SearchVector(Value(description), weight="C", config="simple")
+    )
+
+
+def index_products(products):
+    """Berilgan mahsulotlar uchun qidiruv indeksini yangilash."""
+    products = list(products)
+    if not products:
+        return
+    model = type(products[0])
+    if _is_postgres():
+        # Bitta UPDATE ... CASE (har BATCH_SIZE mahsulotga) — brend nomi
+        # o'zgarganda N ta alohida so'rov emas
+        rows = [model(pk=p.pk, search_vector=search_vector_expression(p)) for p in products]
+        model.objects.bulk_update(rows, ["search_vector"], batch_size=BATCH_SIZE)
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name, brand, description) "
+            "VALUES (%s, %s, %s, %s)",
+            [(p.pk, *_document(p)) for p in products],
+        )
+
+
+def unindex_product(product_id):
+    if _is_postgres():
+        return  # search_vector qator bilan birga o'chadi
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product_id])
+
+
+def _empty(queryset):
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+
+def search_products(queryset, term):
+    """Querysetni qidiruv so'zi bo'yicha filtrlaydi va `search_rank` qo'shadi.
+
+    Har bir so'z prefiks sifatida izlanadi ("kre" → "krem"), barcha so'zlar
+    mos kelishi kerak. Qidiruvga yaroqli so'z bo'lmasa — bo'sh natija.
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return _empty(queryset)
+
+    if _is_postgres():
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(
+            " & ".join(f"{token}:*" for token in tokens),
+            config="simple",
+            search_type="raw",
+        )
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank("search_vector", query)
+        )
+
+    match = " ".join(f'"{token}"*' for token in tokens)
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, bm25({FTS_TABLE}, {weights}) AS score FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s ORDER BY score LIMIT {FTS_LIMIT}",
+            [match],
+        )
+        rows = cursor.fetchall()
+    if not rows:
+        return _empty(queryset)
+    # bm25: kichikroq — yaxshiroq; PostgreSQL bilan bir xil yo'nalish uchun teskari
+    return queryset.filter(pk__in=[pk for pk, _ in rows]).annotate(
+        search_rank=Case(
+            *[When(pk=pk, then=Value(-score)) for pk, score in rows],
+            output_field=FloatField(),
+        )
+    )
@@ -1,8 +1,63 @@
 from rest_framework import serializers
 from .models import Banner, Brand, Category, Product, ProductImage
-
-
-class BannerSerializer(serializers.ModelSerializer):
+from .renditions import rendition_srcset
+
+
+def parse_fields_param(value):
+    """`id,name,product.name` → {"id": {}, "name": {}, "product": {"name": {}}}"""
+    tree = {}
+    for path in (value or "").split(","):
+        node = tree
+        for part in filter(None, path.strip().split(".")):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def get_shape_options(request):
+    """So'rovdan (`fields`, `expand`, `card`) sozlamalarini o'qiydi."""
+    if request is None:
+        return {}, set(), False
+    params = getattr(request, "query_params", request.GET)
+    expand = {name.strip() for name in params.get("expand", "").split(",") if name.strip()}
+    return parse_fields_param(params.get("fields")), expand, params.get("shape") == "card"
+
+
+class SparseFieldsMixin:
+    """`?fields=`, `?expand=` va `?shape=card` ni qo'llab-quvvatlash.
+
+    Maydonlar ro'yxati request'dan (ildiz serializer konteksti orqali) olinadi
+    va ichki serializerlarga ham nuqta bilan tarqaladi: `fields=id,product.name`.
+    Meta'da:
+      - `card_fields` — `shape=card` da qoladigan maydonlar;
+      - `card_only_fields` — faqat kartochkada chiqadigan maydonlar;
+      - `expandable_fields` — kartochkada faqat `?expand=` bilan chiqadi.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        meta = getattr(self, "Meta", None)
+        spec, expand, card = get_shape_options(self.context.get("request"))
+        for name in self._path_from_root():
+            spec = spec.get(name, {})
+
+        if card and getattr(meta, "card_fields", None):
+            allowed = set(meta.card_fields) | (expand & set(getattr(meta, "expandable_fields", [])))
+        else:
+            allowed = set(fields) - set(getattr(meta, "card_only_fields", []))
+        if spec:
+            allowed &= set(spec)
+        return {name: field for name, field in fields.items() if name in allowed}
+
+    def _path_from_root(self):
+        path, node = [], self
+        while node.parent is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        return reversed(path)
+
+
+class BannerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Banner serializeri"""
 
     class Meta:
@@ -10,15 +65,14 @@ class BannerSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "subtitle", "emoji", "gradient", "link", "image"]
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "slug", "icon", "image"]
 
 
-class BrandSerializer(serializers.ModelSerializer):
+class BrandSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     logo = serializers.SerializerMethodField()
-    products_count = serializers.IntegerField(read_only=True, required=False)
 
     class Meta:
         model = Brand
@@ -33,12 +87,16 @@ class BrandSerializer(serializers.ModelSerializer):
         return obj.logo.url
 
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class ProductImageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductImage
-        fields = ["id", "image", "is_main"]
+        fields = ["id", "image", "is_main", "srcset"]
+
+    def get_srcset(self, obj):
+        return rendition_srcset(obj, "image", self.context.get("request"))
 
     def get_image(self, obj):
         if not obj.image:
@@ -49,13 +107,22 @@ class ProductImageSerializer(serializers.ModelSerializer):
         return obj.image.url
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Mahsulotlar ro'yxati uchun"""
 
     category = CategorySerializer(read_only=True)
     brand = BrandSerializer(read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
     discount_percent = serializers.IntegerField(read_only=True)
+    main_image = serializers.SerializerMethodField()
+    brand_name = serializers.SerializerMethodField()
+
+    # `shape=card` uchun yuklanadigan ustunlar (select_related bilan)
+    CARD_COLUMNS = [
+        "id", "name", "price", "old_price", "in_stock", "is_featured",
+        "created_at", "brand__name", "primary_image__image",
+    ]
+    CARD_RELATED = ["brand", "primary_image"]
 
     class Meta:
         model = Product
@@ -72,10 +139,51 @@ class ProductListSerializer(serializers.ModelSerializer):
             "in_stock",
             "is_featured",
             "discount_percent",
+            "main_image",
+            "brand_name",
         ]
-
-
-class ProductDetailSerializer(serializers.ModelSerializer):
+        card_fields = [
+            "id", "name", "price", "old_price", "discount_percent",
+            "in_stock", "main_image", "brand_name",
+        ]
+        card_only_fields = ["main_image", "brand_name"]
+        expandable_fields = ["brand", "category", "images"]
+
+    def get_main_image(self, obj):
+        # Saqlangan havola — select_related("primary_image") bilan rasmlar
+        # jadvaliga murojaat yo'q
+        image = obj.primary_image.image if obj.primary_image_id else None
+        if not image:
+            return None
+        request = self.context.get("request")
+        if request:
+            return request.build_absolute_uri(image.url)
+        return image.url
+
+    def get_brand_name(self, obj):
+        return obj.brand.name if obj.brand_id else None
+
+    @classmethod
+    def card_queryset(cls, queryset, expand=()):
+        """Kartochka uchun faqat kerakli ustunlar va asosiy rasm."""
+        columns = list(cls.CARD_COLUMNS)
+        related = list(cls.CARD_RELATED)
+        if "brand" in expand:
+            columns += [f"brand__{f}" for f in BrandSerializer.Meta.fields]
+        if "category" in expand:
+            related.append("category")
+            columns += [f"category__{f}" for f in CategorySerializer.Meta.fields]
+        queryset = (
+            queryset.select_related(None).select_related(*related)
+            .only(*columns)
+            .prefetch_related(None)
+        )
+        if "images" in expand:
+            queryset = queryset.prefetch_related("images")
+        return queryset
+
+
+class ProductDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Bitta mahsulot uchun to'liq ma'lumot"""
 
     category = CategorySerializer(read_only=True)
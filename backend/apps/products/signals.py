@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.cart.versioning import touch_product_carts
+from config.badges import invalidate_badge
+from config.dashboard import invalidate_dashboard
+
+from .cache import bump_catalog_version
+from .counters import apply_counter_change, counter_state
+from .models import Banner, Brand, Category, Product, ProductImage
+from .renditions import (
+    delete_rendition_files,
+    needs_renditions,
+    rendition_fields,
+    rendition_names,
+    schedule_renditions,
+)
+from .search import index_products, unindex_product
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Banner)
+@receiver(post_delete, sender=Banner)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Katalog o'zgarganda keshlangan javoblarni eskirtirish."""
+    bump_catalog_version()
+
+
+@receiver(post_delete, sender=Product)
+def decrement_catalog_counters(sender, instance, **kwargs):
+    """O'chirish o'sha tranzaksiyada (Collector.delete) — hisoblagich ham."""
+    apply_counter_change(counter_state(instance), None)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def update_primary_image(sender, instance, raw=False, **kwargs):
+    """Rasm qo'shilganda, tartibi/is_main o'zgarganda yoki o'chirilganda."""
+    if raw:
+        return
+    Product.refresh_primary_image(instance.product_id)
+    touch_product_carts([instance.product_id])
+
+
+@receiver(post_save, sender=Product)
+def touch_carts_on_product_change(sender, instance, created=False, raw=False, **kwargs):
+    """Narx/sotuvda borligi/nom savat javobiga kiradi — savatlar versiyasi oshadi."""
+    if created or raw:
+        return
+    touch_product_carts([instance.pk])
+
+
+@receiver(pre_delete, sender=Product)
+def tombstone_cart_items(sender, instance, **kwargs):
+    """Savat elementlari CASCADE bilan o'chadi — delta mijozlar `removed` da bilsin."""
+    touch_product_carts([instance.pk], removed=True)
+
+
+@receiver(post_save, sender=Product)
+def update_product_search_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_products([instance])
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_search_index(sender, instance, **kwargs):
+    unindex_product(instance.pk)
+
+
+@receiver(post_save, sender=Brand)
+def update_brand_products_search_index(sender, instance, created=False, raw=False, **kwargs):
+    """Brend nomi indeksda ham bor — uning mahsulotlarini qayta indekslash."""
+    if created or raw:
+        return
+    index_products(instance.products.select_related("brand"))
+
+
+def _schedule_renditions(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    field = rendition_fields()[sender]
+    if needs_renditions(instance, field):
+        transaction.on_commit(lambda: schedule_renditions(instance, field))
+    elif not getattr(instance, field) and instance.renditions:
+        sender.objects.filter(pk=instance.pk).update(renditions={})
+        _delete_renditions(sender, instance)
+
+
+def _delete_renditions(sender, instance, **kwargs):
+    names = rendition_names(instance.renditions)
+    if names:
+        transaction.on_commit(lambda: delete_rendition_files(names))
+
+
+for _model in rendition_fields():
+    post_save.connect(_schedule_renditions, sender=_model, dispatch_uid=f"renditions-{_model.__name__}")
+    post_delete.connect(_delete_renditions, sender=_model, dispatch_uid=f"renditions-delete-{_model.__name__}")
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_stats(sender, **kwargs):
+    invalidate_dashboard()
+    invalidate_badge("products")
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.cache import get_catalog_version
+from apps.products.models import Brand, Category, Product
+
+
+class CatalogCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Makiyaj", slug="makiyaj")
+        self.brand = Brand.objects.create(name="Nivea", slug="nivea")
+        self.product = Product.objects.create(
+            name="Lab bo'yog'i",
+            price=Decimal("150000"),
+            category=self.category,
+            brand=self.brand,
+            product_type="makeup",
+        )
+
+    def test_warm_list_runs_no_queries(self):
+        self.client.get("/api/products/", {"brand": "nivea"})
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/products/", {"brand": "nivea"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+
+    def test_param_order_and_blanks_share_cache_entry(self):
+        self.client.get("/api/products/?brand=nivea&ordering=price&search=")
+        with self.assertNumQueries(0):
+            self.client.get("/api/products/?ordering=price&brand=nivea&page=1")
+
+    def test_price_change_invalidates(self):
+        self.client.get(f"/api/products/{self.product.id}/")
+        version = get_catalog_version()
+        self.product.price = Decimal("120000")
+        self.product.save()
+        self.assertGreater(get_catalog_version(), version)
+        response = self.client.get(f"/api/products/{self.product.id}/")
+        self.assertEqual(response.data["price"], "120000")
+
+    def test_brand_change_invalidates_list(self):
+        self.client.get("/api/products/")
+        self.brand.name = "Nivea Men"
+        self.brand.save()
+        response = self.client.get("/api/products/")
+        self.assertEqual(response.data["results"][0]["brand"]["name"], "Nivea Men")
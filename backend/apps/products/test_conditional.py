@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.models import Brand, Category, Product
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Makiyaj", slug="makiyaj")
+        self.brand = Brand.objects.create(name="Nivea", slug="nivea")
+        self.product = Product.objects.create(
+            name="Krem", price=Decimal("90000"), category=self.category, brand=self.brand
+        )
+
+    def test_validators_present(self):
+        response = self.client.get("/api/products/")
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_if_none_match_returns_304_without_queries(self):
+        etag = self.client.get("/api/categories/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_cold_304_runs_only_probe(self):
+        etag = self.client.get("/api/brands/")["ETag"]
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/brands/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get("/api/products/")["Last-Modified"]
+        response = self.client.get("/api/products/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_depends_on_params(self):
+        first = self.client.get("/api/products/", {"brand": "nivea"})["ETag"]
+        second = self.client.get("/api/products/", {"brand": "dior"})["ETag"]
+        self.assertNotEqual(first, second)
+
+    def test_change_and_delete_invalidate(self):
+        etag = self.client.get("/api/categories/")["ETag"]
+        self.category.name = "Pardoz"
+        self.category.save()
+        response = self.client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["name"], "Pardoz")
+
+        etag = response["ETag"]
+        Category.objects.create(name="Parfyum", slug="parfyum").delete()
+        Brand.objects.create(name="Dior", slug="dior")
+        self.assertEqual(self.client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # products_count annotatsiyasi — mahsulot o'chsa brendlar ham o'zgaradi
+        etag = self.client.get("/api/brands/")["ETag"]
+        self.product.delete()
+        self.assertEqual(self.client.get("/api/brands/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
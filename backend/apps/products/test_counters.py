@@ -0,0 +1,90 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.models import Brand, Category, Product
+from apps.products.utils import get_products_count
+
+
+class CatalogCountersTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.skincare = Category.objects.create(name="Teri", slug="teri")
+        self.makeup = Category.objects.create(name="Makiyaj", slug="makiyaj")
+        self.nivea = Brand.objects.create(name="Nivea", slug="nivea")
+        self.dior = Brand.objects.create(name="Dior", slug="dior")
+
+    def _product(self, **kwargs):
+        data = {"name": "Krem", "price": Decimal("50000"), "category": self.skincare, "brand": self.nivea}
+        data.update(kwargs)
+        return Product.objects.create(**data)
+
+    def _counts(self):
+        return (
+            Category.objects.get(pk=self.skincare.pk).products_count,
+            Category.objects.get(pk=self.makeup.pk).products_count,
+            Brand.objects.get(pk=self.nivea.pk).products_count,
+            Brand.objects.get(pk=self.dior.pk).products_count,
+        )
+
+    def test_create_and_inactive(self):
+        self._product()
+        self._product(is_active=False)
+        self._product(brand=None)
+        self.assertEqual(self._counts(), (2, 0, 1, 0))
+
+    def test_deactivate_and_move(self):
+        product = self._product()
+        product.is_active = False
+        product.save()
+        self.assertEqual(self._counts(), (0, 0, 0, 0))
+        product.is_active = True
+        product.category = self.makeup
+        product.brand = self.dior
+        product.save()
+        self.assertEqual(self._counts(), (0, 1, 0, 1))
+
+    def test_stale_instance_does_not_double_count(self):
+        product = self._product()
+        stale = Product.objects.get(pk=product.pk)
+        product.is_active = False
+        product.save()
+        stale.is_active = False
+        stale.save()
+        self.assertEqual(self._counts(), (0, 0, 0, 0))
+
+    def test_brand_save_keeps_counter(self):
+        self._product()
+        self.nivea.name = "Nivea Men"
+        self.nivea.save()
+        self.assertEqual(Brand.objects.get(pk=self.nivea.pk).products_count, 1)
+
+    def test_delete(self):
+        self._product().delete()
+        self._product()
+        self._product(is_active=False)
+        Product.objects.all().delete()
+        self.assertEqual(self._counts(), (0, 0, 0, 0))
+
+    def test_recount_command(self):
+        self._product()
+        Brand.objects.update(products_count=7)
+        out = StringIO()
+        call_command("recount_catalog_counters", stdout=out)
+        self.assertIn("2 ta brend, 0 ta kategoriya", out.getvalue())
+        self.assertEqual(self._counts(), (1, 0, 1, 0))
+
+    def test_readers_use_stored_columns(self):
+        self._product()
+        self._product(is_active=False)
+        self.assertEqual(get_products_count(None), 1)
+        client = APIClient()
+        # probe + brendlar (JOIN/GROUP BY yo'q)
+        with self.assertNumQueries(2):
+            response = client.get("/api/brands/")
+        counts = {row["slug"]: row["products_count"] for row in response.data}
+        self.assertEqual(counts, {"nivea": 1, "dior": 0})
@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.models import Brand, Category, Product
+
+
+class ProductFacetsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        makeup = Category.objects.create(name="Makiyaj", slug="makiyaj")
+        skincare = Category.objects.create(name="Teri parvarishi", slug="skincare")
+        nivea = Brand.objects.create(name="Nivea", slug="nivea")
+        dior = Brand.objects.create(name="Dior", slug="dior")
+        Product.objects.create(name="Krem", price=Decimal("40000"), category=skincare, brand=nivea,
+                               product_type="skincare", skin_type="dry")
+        Product.objects.create(name="Losyon", price=Decimal("60000"), category=skincare, brand=nivea,
+                               product_type="skincare", in_stock=False)
+        Product.objects.create(name="Pomada", price=Decimal("120000"), category=makeup, brand=dior,
+                               product_type="makeup", is_featured=True)
+        Product.objects.create(name="Eski", price=Decimal("10000"), category=makeup, is_active=False)
+
+    def _facets(self, **params):
+        response = self.client.get("/api/products/facets/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def _counts(self, data, facet):
+        return {item["value"]: item["count"] for item in data[facet]}
+
+    def test_counts_without_filters(self):
+        data = self._facets()
+        self.assertEqual(data["total"], 3)
+        self.assertEqual(self._counts(data, "category"), {"skincare": 2, "makiyaj": 1})
+        self.assertEqual(self._counts(data, "brand"), {"nivea": 2, "dior": 1})
+        self.assertEqual(self._counts(data, "in_stock"), {"true": 2, "false": 1})
+        self.assertEqual(self._counts(data, "skin_type"), {"all": 2, "dry": 1})
+        self.assertEqual(data["product_type"][0]["label"], "Teri parvarishi")
+        self.assertEqual(
+            [(b["min"], b["count"]) for b in data["price"]],
+            [(0, 1), (50000, 1), (100000, 1)],
+        )
+
+    def test_facet_ignores_its_own_filter(self):
+        data = self._facets(brand="nivea")
+        self.assertEqual(data["total"], 2)
+        self.assertEqual(self._counts(data, "brand"), {"nivea": 2, "dior": 1})
+        self.assertEqual(self._counts(data, "category"), {"skincare": 2})
+
+    def test_price_step_and_range(self):
+        data = self._facets(price_step=100000, min_price=50000)
+        self.assertEqual(data["total"], 2)
+        self.assertEqual([(b["min"], b["count"]) for b in data["price"]], [(0, 2), (100000, 1)])
+
+    def test_single_query_and_cached(self):
+        # shartli GET probe'i + facet so'rovi
+        with self.assertNumQueries(2):
+            self._facets(category="skincare")
+        with self.assertNumQueries(0):
+            self._facets(category="skincare")
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get("/api/products/facets/", {"price_step": "0"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/products/facets/", {"min_price": "abc"}).status_code, 400)
@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.products.models import Banner, Brand, Category, Product, ProductImage
+from apps.products.test_image_urls import TEST_MEDIA_ROOT, MediaTempMixin, make_image
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class HomeEndpointTest(MediaTempMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Banner.objects.create(title="Chegirma")
+        self.category = Category.objects.create(name="Makiyaj", slug="makiyaj")
+        self.brand = Brand.objects.create(name="Nivea", slug="nivea", is_featured=True)
+        for i in range(12):
+            product = Product.objects.create(
+                name=f"Mahsulot {i}",
+                price=Decimal("100000") + i,
+                category=self.category,
+                brand=self.brand,
+                is_featured=i % 2 == 0,
+            )
+            ProductImage.objects.create(product=product, image=make_image(f"p{i}.jpg"), is_main=True)
+
+    def test_sections(self):
+        response = self.client.get("/api/home/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["banners"]), 1)
+        self.assertEqual(len(response.data["categories"]), 1)
+        self.assertEqual(response.data["featured_brands"][0]["products_count"], 12)
+        self.assertEqual(len(response.data["featured_products"]), 6)
+        self.assertEqual(len(response.data["new_arrivals"]), 10)
+        self.assertEqual(response.data["new_arrivals"][0]["name"], "Mahsulot 11")
+        self.assertEqual(len(response.data["new_arrivals"][0]["images"]), 1)
+
+    def test_query_count_is_bounded(self):
+        with self.assertNumQueries(6):
+            self.client.get("/api/home/")
+        cache.clear()
+        with self.assertNumQueries(5):
+            self.client.get("/api/home/", {"shape": "card"})
+
+    def test_etag_not_modified(self):
+        response = self.client.get("/api/home/")
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/home/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_etag_changes_with_catalog(self):
+        etag = self.client.get("/api/home/")["ETag"]
+        Banner.objects.create(title="Yangi banner")
+        response = self.client.get("/api/home/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data["banners"]), 2)
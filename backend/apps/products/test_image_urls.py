@@ -22,9 +22,9 @@ from apps.users.models import TelegramUser
 TEST_MEDIA_ROOT = tempfile.mkdtemp(prefix="ziyora-test-media-")
 
 
-def make_image(name="pic.jpg"):
+def make_image(name="pic.jpg", size=(10, 10)):
     buf = io.BytesIO()
-    Image.new("RGB", (10, 10), "red").save(buf, format="JPEG")
+    Image.new("RGB", size, "red").save(buf, format="JPEG")
     buf.seek(0)
     return SimpleUploadedFile(name, buf.read(), content_type="image/jpeg")
 
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.products.models import Category, Product, ProductImage
+from apps.products.test_image_urls import TEST_MEDIA_ROOT, MediaTempMixin, make_image
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, IMAGE_RENDITION_WORKERS=0)
+class PrimaryImageTest(MediaTempMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.product = Product.objects.create(name="Krem", price=Decimal("50000"), category=category)
+
+    def _image(self, **kwargs):
+        return ProductImage.objects.create(product=self.product, image=make_image(), **kwargs)
+
+    def _primary_id(self):
+        return Product.objects.get(pk=self.product.pk).primary_image_id
+
+    def test_first_image_then_main(self):
+        first = self._image(order=1)
+        self.assertEqual(self._primary_id(), first.pk)
+        main = self._image(order=2, is_main=True)
+        self.assertEqual(self._primary_id(), main.pk)
+        first.refresh_from_db()
+        self.assertFalse(first.is_main)
+
+        first.is_main = True
+        first.save()
+        main.refresh_from_db()
+        self.assertFalse(main.is_main)
+        self.assertEqual(self._primary_id(), first.pk)
+
+    def test_reorder_and_delete(self):
+        a = self._image(order=1)
+        b = self._image(order=2)
+        b.order = 0
+        b.save()
+        self.assertEqual(self._primary_id(), b.pk)
+        b.delete()
+        self.assertEqual(self._primary_id(), a.pk)
+        a.delete()
+        self.assertIsNone(self._primary_id())
+
+    def test_stale_product_save_keeps_reference(self):
+        image = self._image()
+        self.product.name = "Krem 2"
+        self.product.save()
+        self.assertEqual(self._primary_id(), image.pk)
+
+    def test_duplicate_has_no_primary(self):
+        self._image()
+        copy = Product.objects.get(pk=self.product.pk)
+        copy.pk = None
+        copy.save()
+        self.assertIsNone(Product.objects.get(pk=copy.pk).primary_image_id)
+
+    def test_main_image_property_without_images_table(self):
+        image = self._image()
+        product = Product.objects.select_related("primary_image").get(pk=self.product.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(product.main_image, image.image.url)
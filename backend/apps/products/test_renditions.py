@@ -0,0 +1,128 @@
+import io
+import os
+import threading
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.products import renditions
+from apps.products.models import Category, Product, ProductImage
+from apps.products.renditions import RENDITION_WIDTHS, rendition_names, thumbnail_url
+from apps.products.test_image_urls import TEST_MEDIA_ROOT, MediaTempMixin, make_image
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, IMAGE_RENDITION_WORKERS=0)
+class RenditionTest(MediaTempMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Makiyaj")
+        self.product = Product.objects.create(name="Krem", price=100000, category=self.category)
+
+    def _upload(self, size=(800, 400)):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(
+                product=self.product, image=make_image(size=size), is_main=True
+            )
+        image.refresh_from_db()
+        return image
+
+    def test_upload_builds_webp_and_jpeg(self):
+        image = self._upload()
+        widths = image.renditions["widths"]
+        self.assertEqual(image.renditions["source"], image.image.name)
+        # 1024 asl kenglikdan (800) katta — kattalashtirilmaydi
+        self.assertEqual(sorted(widths, key=int), ["320", "640", "800"])
+        for names in widths.values():
+            for name in names.values():
+                self.assertTrue(os.path.exists(os.path.join(TEST_MEDIA_ROOT, name)))
+
+    def test_srcset_in_api(self):
+        self._upload()
+        response = self.client.get(f"/api/products/{self.product.id}/")
+        srcset = response.data["images"][0]["srcset"]
+        self.assertEqual(set(srcset), {"webp", "jpeg"})
+        self.assertTrue(srcset["webp"]["320"].startswith("http://"))
+        self.assertTrue(srcset["webp"]["320"].endswith(".webp"))
+
+    def test_admin_thumbnail_uses_smallest_rendition(self):
+        image = self._upload()
+        self.assertTrue(thumbnail_url(image, "image").endswith(f"_w{RENDITION_WIDTHS[0]}.webp"))
+
+    def test_backfill_command_is_resumable(self):
+        image = ProductImage.objects.create(product=self.product, image=make_image(), is_main=True)
+        self.assertEqual(image.renditions, {})
+        call_command("build_renditions", workers=1, stdout=io.StringIO())
+        image.refresh_from_db()
+        self.assertEqual(image.renditions["source"], image.image.name)
+        self.assertEqual(image.renditions["widths"]["10"]["webp"][-8:], "w10.webp")
+
+        # Qayta ishga tushirish — tayyor rasmlar qayta yasalmaydi
+        paths = [
+            os.path.join(TEST_MEDIA_ROOT, name)
+            for names in image.renditions["widths"].values()
+            for name in names.values()
+        ]
+        mtimes = [os.stat(path).st_mtime_ns for path in paths]
+        out = io.StringIO()
+        with mock.patch("apps.products.management.commands.build_renditions.store_renditions") as store:
+            call_command("build_renditions", workers=1, stdout=out)
+        store.assert_not_called()
+        self.assertIn("ProductImage: 0 ta tayyor", out.getvalue())
+        updated_at = image.updated_at
+        image.refresh_from_db()
+        self.assertEqual(image.updated_at, updated_at)
+        self.assertEqual([os.stat(path).st_mtime_ns for path in paths], mtimes)
+
+    def test_replaced_and_deleted_images_drop_old_files(self):
+        image = self._upload()
+        old_paths = [os.path.join(TEST_MEDIA_ROOT, name) for name in rendition_names(image.renditions)]
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = make_image(name="new.jpg", size=(400, 200))
+            image.save()
+        image.refresh_from_db()
+        self.assertFalse(any(os.path.exists(path) for path in old_paths))
+        new_paths = [os.path.join(TEST_MEDIA_ROOT, name) for name in rendition_names(image.renditions)]
+        self.assertTrue(new_paths and all(os.path.exists(path) for path in new_paths))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        self.assertFalse(any(os.path.exists(path) for path in new_paths))
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, IMAGE_RENDITION_WORKERS=1)
+class RenditionPoolTest(MediaTempMixin, TransactionTestCase):
+    """`schedule_renditions` → process pool → `on_done` (pool oqimida) yozadi."""
+
+    def tearDown(self):
+        if renditions._executor is not None:
+            renditions._executor.shutdown()
+            renditions._executor = None
+        super().tearDown()
+
+    def test_pool_result_is_stored(self):
+        category = Category.objects.create(name="Makiyaj")
+        product = Product.objects.create(name="Krem", price=100000, category=category)
+
+        # `on_done` pool oqimida ishlaydi — saqlanishini kutamiz
+        stored = threading.Event()
+        store = renditions.store_renditions
+
+        def store_and_signal(*args):
+            try:
+                return store(*args)
+            finally:
+                stored.set()
+
+        with mock.patch.object(renditions, "store_renditions", store_and_signal):
+            # autocommit: on_commit darhol ishlaydi → submit → on_done
+            image = ProductImage.objects.create(
+                product=product, image=make_image(size=(400, 200)), is_main=True
+            )
+            self.assertTrue(stored.wait(timeout=60))
+        image.refresh_from_db()
+        self.assertEqual(image.renditions["source"], image.image.name)
+        self.assertEqual(image.renditions["widths"].keys(), {"320", "400"})
+        for name in rendition_names(image.renditions):
+            self.assertTrue(os.path.exists(os.path.join(TEST_MEDIA_ROOT, name)))
@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.models import Brand, Category, Product
+from apps.products.search import normalize_text
+
+
+class NormalizeTextTest(TestCase):
+    def test_cyrillic_to_latin(self):
+        self.assertEqual(normalize_text("Крем для лица"), "krem dlya litsa")
+
+    def test_uzbek_cyrillic_letters(self):
+        self.assertEqual(normalize_text("Ўғил қиз"), "ogil qiz")
+
+    def test_apostrophes_and_diacritics(self):
+        self.assertEqual(normalize_text("L'Oréal o‘g‘il"), "loreal ogil")
+
+
+class ProductSearchAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Teri parvarishi", slug="skincare")
+        self.brand = Brand.objects.create(name="L'Oréal", slug="loreal")
+        self.by_description = Product.objects.create(
+            name="Tonik",
+            description="Yuz uchun krem bilan birga ishlating",
+            price=Decimal("50000"),
+            category=self.category,
+        )
+        self.by_name = Product.objects.create(
+            name="Namlovchi krem",
+            price=Decimal("150000"),
+            category=self.category,
+            brand=self.brand,
+        )
+
+    def _search(self, term, **params):
+        response = self.client.get("/api/products/", {"search": term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_name_match_ranked_above_description(self):
+        self.assertEqual(self._search("krem"), [self.by_name.id, self.by_description.id])
+
+    def test_cyrillic_query_matches_latin_name(self):
+        self.assertEqual(self._search("намловчи"), [self.by_name.id])
+
+    def test_prefix_and_brand_match(self):
+        self.assertEqual(self._search("lore"), [self.by_name.id])
+
+    def test_explicit_ordering_wins_over_rank(self):
+        self.assertEqual(
+            self._search("krem", ordering="price"),
+            [self.by_description.id, self.by_name.id],
+        )
+
+    def test_index_updated_on_save_and_delete(self):
+        self.by_description.name = "Atir suvi"
+        self.by_description.save()
+        self.assertEqual(self._search("atir"), [self.by_description.id])
+        self.by_description.delete()
+        self.assertEqual(self._search("atir"), [])
+
+    def test_brand_rename_reindexes_products(self):
+        self.brand.name = "Garnier"
+        self.brand.save()
+        self.assertEqual(self._search("garnier"), [self.by_name.id])
@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.models import Brand, Category, Product, ProductImage
+from apps.users.models import Favorite, TelegramUser
+
+
+class SparseFieldsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Makiyaj", slug="makiyaj")
+        self.brand = Brand.objects.create(name="Nivea", slug="nivea", description="Uzun tavsif")
+        self.products = []
+        for i in range(3):
+            product = Product.objects.create(
+                name=f"Krem {i}", price=Decimal("100000"), old_price=Decimal("125000"),
+                category=self.category, brand=self.brand,
+            )
+            ProductImage.objects.create(product=product, order=0)
+            ProductImage.objects.create(product=product, order=1, is_main=True)
+            self.products.append(product)
+
+    def test_default_shape_unchanged(self):
+        row = self.client.get("/api/products/").data["results"][0]
+        self.assertIn("images", row)
+        self.assertIn("description", row["brand"])
+        self.assertNotIn("main_image", row)
+        self.assertNotIn("brand_name", row)
+
+    def test_fields_param_limits_top_level(self):
+        row = self.client.get("/api/products/", {"fields": "id,name"}).data["results"][0]
+        self.assertEqual(set(row), {"id", "name"})
+
+    def test_nested_fields_param(self):
+        row = self.client.get("/api/products/", {"fields": "id,brand.name"}).data["results"][0]
+        self.assertEqual(row["brand"], {"name": "Nivea"})
+
+    def test_card_shape(self):
+        response = self.client.get("/api/products/", {"shape": "card"})
+        row = response.data["results"][0]
+        self.assertEqual(
+            set(row),
+            {"id", "name", "price", "old_price", "discount_percent", "in_stock", "main_image", "brand_name"},
+        )
+        self.assertEqual(row["brand_name"], "Nivea")
+        self.assertEqual(row["discount_percent"], 20)
+
+    def test_card_shape_query_count_is_constant(self):
+        # probe + count + mahsulotlar (brend va asosiy rasm bilan)
+        with self.assertNumQueries(3):
+            self.client.get("/api/products/", {"shape": "card"})
+
+    def test_card_expand(self):
+        row = self.client.get(
+            "/api/products/", {"shape": "card", "expand": "brand,images"}
+        ).data["results"][0]
+        self.assertEqual(row["brand"]["name"], "Nivea")
+        self.assertEqual(len(row["images"]), 2)
+        self.assertNotIn("category", row)
+
+    def test_favorites_card_shape(self):
+        user = TelegramUser.objects.create(telegram_id=888001, first_name="Fav")
+        Favorite.objects.create(user=user, product=self.products[0])
+        self.client.force_authenticate(user=user)
+        row = self.client.get("/api/users/favorites/", {"shape": "card", "fields": "id,product"}).data[0]
+        self.assertEqual(set(row), {"id", "product"})
+        self.assertIn("main_image", row["product"])
+        self.assertNotIn("images", row["product"])
@@ -271,3 +271,54 @@ class ProductImportTest(TestCase):
         self.assertEqual(product.price, Decimal("150000"))
         self.assertEqual(product.cost_price, Decimal("100000"))
         self.assertEqual(product.product_type, "makeup")
+
+
+class ProductCursorPaginationTest(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = APIClient()
+        category = Category.objects.create(name="Makiyaj", slug="makiyaj")
+        # Narxlar takrorlanadi — (price, id) tie-breaker tekshiriladi
+        self.products = [
+            Product.objects.create(name=f"Mahsulot {i}", price=Decimal(1000 * (i // 2 + 1)), category=category)
+            for i in range(5)
+        ]
+
+    def _walk(self, url):
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            pages.append(response.data)
+            ids += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+        return ids, pages
+
+    def test_cursor_walk_newest_first(self):
+        ids, pages = self._walk("/api/products/?cursor=&page_size=2")
+        self.assertEqual(ids, [p.id for p in reversed(self.products)])
+        self.assertIsNone(pages[0]["previous"])
+
+    def test_cursor_walk_by_price(self):
+        ids, _ = self._walk("/api/products/?cursor=&ordering=price&page_size=2")
+        expected = sorted(self.products, key=lambda p: (p.price, p.id))
+        self.assertEqual(ids, [p.id for p in expected])
+
+    def test_previous_link_returns_prior_page(self):
+        _, pages = self._walk("/api/products/?cursor=&ordering=price&page_size=2")
+        back = self.client.get(pages[1]["previous"])
+        self.assertEqual(
+            [row["id"] for row in back.data["results"]],
+            [row["id"] for row in pages[0]["results"]],
+        )
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get("/api/products/?cursor=bm9wZQ")
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_mode_unchanged(self):
+        response = self.client.get("/api/products/")
+        self.assertEqual(response.data["count"], 5)
@@ -9,5 +9,6 @@ router.register("brands", views.BrandViewSet, basename="brand")
 router.register("products", views.ProductViewSet, basename="product")
 
 urlpatterns = [
+    path("home/", views.home, name="home"),
     path("", include(router.urls)),
 ]
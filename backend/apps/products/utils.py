@@ -1,6 +1,12 @@
-from .models import Product
+from django.db.models import Sum
+
+from config.badges import cached_count
+
+from .models import Category
 
 
 def get_products_count(request):
-    """Return total products count for sidebar badge."""
-    return Product.objects.filter(is_active=True).count()
+    """Return active products count for sidebar badge (stored category counters, cached)."""
+    return cached_count(
+        "products", lambda: Category.objects.aggregate(total=Sum("products_count"))["total"] or 0
+    )
@@ -1,52 +1,59 @@
-from rest_framework import viewsets, filters
-from rest_framework.decorators import action
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from django.db.models import Count
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Banner, Brand, Category, Product
+from .cache import cached_catalog_response, catalog_cache_key, make_etag
+from .conditional import CatalogConditionalGetMixin
+from .facets import PRICE_STEP, compute_facets
+from .home import build_home
+from .models import Banner, Brand, Category, Product, ProductImage
 from .serializers import (
     BannerSerializer,
     BrandSerializer,
     CategorySerializer,
     ProductListSerializer,
     ProductDetailSerializer,
+    get_shape_options,
 )
-from .filters import ProductFilter
+from .filters import ProductFilter, ProductSearchFilter
 
 
-class BannerViewSet(viewsets.ReadOnlyModelViewSet):
+class BannerViewSet(CatalogConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Bannerlar API"""
 
+    conditional_models = [Banner]
     queryset = Banner.objects.filter(is_active=True)
     serializer_class = BannerSerializer
     permission_classes = [AllowAny]
     pagination_class = None
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CatalogConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Kategoriyalar API"""
 
+    conditional_models = [Category]
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
     pagination_class = None
 
 
-class BrandViewSet(viewsets.ReadOnlyModelViewSet):
+class BrandViewSet(CatalogConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Brendlar API"""
 
+    conditional_models = [Brand, Product]
     serializer_class = BrandSerializer
     permission_classes = [AllowAny]
     pagination_class = None
     lookup_field = "slug"
 
     def get_queryset(self):
-        return (
-            Brand.objects.filter(is_active=True)
-            .annotate(products_count=Count("products"))
-        )
+        return Brand.objects.filter(is_active=True)
 
     @action(detail=False, methods=["get"])
     def featured(self, request):
@@ -56,36 +63,91 @@ class BrandViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(CatalogConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Mahsulotlar API"""
 
+    conditional_models = [Product, ProductImage, Category, Brand]
     queryset = (
         Product.objects.filter(is_active=True)
         .select_related("category", "brand")
         .prefetch_related("images")
     )
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter]
     filterset_class = ProductFilter
-    search_fields = ["name", "description", "brand__name"]
     ordering_fields = ["price", "created_at"]
     ordering = ["-created_at"]
+    cursor_ordering_fields = ["price", "created_at"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != "retrieve":
+            _, expand, card = get_shape_options(self.request)
+            if card:
+                queryset = ProductListSerializer.card_queryset(queryset, expand)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "retrieve":
             return ProductDetailSerializer
         return ProductListSerializer
 
+    @cached_catalog_response("products:list")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_catalog_response("products:detail")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=False, methods=["get"])
+    @cached_catalog_response("products:featured")
     def featured(self, request):
         """Tavsiya qilingan mahsulotlar"""
         queryset = self.get_queryset().filter(is_featured=True)[:10]
-        serializer = ProductListSerializer(queryset, many=True)
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=["get"])
+    @cached_catalog_response("products:facets")
+    def facets(self, request):
+        """Filtr variantlari bo'yicha sonlar va narx gistogrammasi"""
+        try:
+            price_step = int(request.query_params.get("price_step", PRICE_STEP))
+        except ValueError:
+            price_step = 0
+        if price_step <= 0:
+            return Response(
+                {"error": "price_step musbat butun son bo'lishi kerak"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(compute_facets(request.query_params, price_step))
+
+    @action(detail=False, methods=["get"])
+    @cached_catalog_response("products:new_arrivals")
     def new_arrivals(self, request):
         """Yangi mahsulotlar"""
         queryset = self.get_queryset().order_by("-created_at")[:10]
-        serializer = ProductListSerializer(queryset, many=True)
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def home(request):
+    """Bosh sahifa bo'limlari bitta javobda (ETag bilan, takroriy ochilishda 304)"""
+    fmt = request.accepted_renderer.format
+    key = catalog_cache_key("home", request, format=fmt)
+    cached = cache.get(key)
+    if cached is None:
+        data = build_home(request)
+        cached = {"data": data, "etag": make_etag(data, fmt)}
+        cache.set(key, cached, settings.CATALOG_CACHE_TIMEOUT)
+
+    response = get_conditional_response(request, etag=cached["etag"])
+    if response is None:
+        response = Response(cached["data"])
+    response["ETag"] = cached["etag"]
+    # Brauzer har safar tekshirsin — o'zgarmagan bo'lsa 304 (tana yuborilmaydi)
+    patch_cache_control(response, no_cache=True)
+    return response
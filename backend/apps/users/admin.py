@@ -3,6 +3,8 @@ from django.utils.html import format_html
 from django.db.models import Count, Sum
 from unfold.admin import ModelAdmin
 from unfold.decorators import display, action
+from config.badges import invalidate_badge
+from config.dashboard import invalidate_dashboard
 from .models import TelegramUser, Favorite
 
 
@@ -115,11 +117,15 @@ class TelegramUserAdmin(ModelAdmin):
     @action(description="Faollashtirish", icon="check_circle")
     def activate_users(self, request, queryset):
         queryset.update(is_active=True)
+        invalidate_badge("users")
+        invalidate_dashboard()
         self.message_user(request, f"{queryset.count()} ta foydalanuvchi faollashtirildi.")
 
     @action(description="O'chirish", icon="block")
     def deactivate_users(self, request, queryset):
         queryset.update(is_active=False)
+        invalidate_badge("users")
+        invalidate_dashboard()
         self.message_user(request, f"{queryset.count()} ta foydalanuvchi o'chirildi.")
 
 
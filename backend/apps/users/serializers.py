@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from apps.products.serializers import ProductListSerializer, SparseFieldsMixin
+
 from .models import TelegramUser, Favorite
 
 
@@ -21,8 +23,7 @@ class TelegramUserSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "telegram_id", "created_at"]
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
-    from apps.products.serializers import ProductListSerializer
+class FavoriteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     product = ProductListSerializer(read_only=True)
 
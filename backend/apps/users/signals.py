@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.badges import invalidate_badge
+from config.dashboard import invalidate_dashboard
+
+from .models import TelegramUser
+
+
+@receiver(post_save, sender=TelegramUser)
+def invalidate_user_stats(sender, instance, created=False, update_fields=None, **kwargs):
+    # Autentifikatsiya har so'rovda `update_or_create` qiladi (faqat ism
+    # maydonlari) — bu hisoblagichlarga ta'sir qilmaydi
+    if created or update_fields is None or "is_active" in update_fields:
+        invalidate_dashboard()
+        invalidate_badge("users")
+
+
+@receiver(post_delete, sender=TelegramUser)
+def invalidate_user_stats_on_delete(sender, **kwargs):
+    invalidate_dashboard()
+    invalidate_badge("users")
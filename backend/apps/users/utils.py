@@ -1,6 +1,8 @@
+from config.badges import cached_count
+
 from .models import TelegramUser
 
 
 def get_users_count(request):
-    """Return total users count for sidebar badge."""
-    return TelegramUser.objects.filter(is_active=True).count()
+    """Return total users count for sidebar badge (cached)."""
+    return cached_count("users", TelegramUser.objects.filter(is_active=True).count)
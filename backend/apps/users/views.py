@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework import viewsets
 
 from apps.products.models import Product
+from apps.products.serializers import get_shape_options
 
 from .models import Favorite
 from .serializers import TelegramUserSerializer, FavoriteSerializer
@@ -50,11 +51,15 @@ class FavoriteViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         if not hasattr(self.request.user, "telegram_id"):
             return Favorite.objects.none()
-        return (
-            Favorite.objects.filter(user=self.request.user)
-            .select_related("product", "product__category")
-            .prefetch_related("product__images")
-        )
+        queryset = Favorite.objects.filter(user=self.request.user)
+        _, expand, card = get_shape_options(self.request)
+        if card:
+            return queryset.select_related("product__brand", "product__primary_image").prefetch_related(
+                *[f"product__{name}" for name in expand & {"images"}],
+            )
+        return queryset.select_related(
+            "product", "product__category", "product__brand"
+        ).prefetch_related("product__images")
 
     @action(detail=False, methods=["post"], url_path="toggle")
     def toggle(self, request):
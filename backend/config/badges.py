@@ -0,0 +1,28 @@
+"""Admin sidebar badge hisoblagichlari keshi.
+
+Unfold badge funksiyalari har bir admin sahifasida chaqiriladi — sonlar
+umumiy keshdan (Redis) o'qiladi. Tegishli model o'zgarganda kalit commit'dan
+keyin o'chiriladi (`signals.py` lar, ommaviy `update()` lardan keyin qo'lda),
+keyingi sahifa uni bitta so'rov bilan qayta hisoblaydi. `BADGE_CACHE_TIMEOUT`
+— davriy tekshiruv: signal chetlab o'tilgan o'zgarishlar (SQL, shell) ham shu
+muddatdan keyin to'g'rilanadi.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _key(name):
+    return f"badge:{name}"
+
+
+def cached_count(name, count):
+    value = cache.get(_key(name))
+    if value is None:
+        value = count()
+        cache.set(_key(name), value, settings.BADGE_CACHE_TIMEOUT)
+    return value
+
+
+def invalidate_badge(name):
+    transaction.on_commit(lambda: cache.delete(_key(name)))
@@ -1,64 +1,101 @@
-from django.db.models import Count, Sum
-from django.utils import timezone
+"""Admin bosh sahifasi statistikasi.
+
+Har bir jadvaldan bitta so'rov (shartli agregatsiya), natija keshda
+`DASHBOARD_CACHE_TIMEOUT` soniya saqlanadi. Buyurtma, mahsulot yoki
+foydalanuvchi qo'shilganda/o'zgarganda kesh commit'dan keyin o'chiriladi
+(`invalidate_dashboard` — `signals.py` lar va ommaviy o'zgarishlardan).
+Savatlar tez-tez o'zgaradi — ular uchun faqat TTL.
+"""
 from datetime import timedelta
 
-from apps.orders.models import Order
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from apps.cart.models import CartItem
+from apps.orders.models import DailySales, Order, OrderItem
 from apps.products.models import Product
 from apps.users.models import TelegramUser
-from apps.cart.models import Cart
 
+DASHBOARD_CACHE_KEY = "dashboard:stats"
 
-def get_dashboard_callback(request, context):
-    today = timezone.now()
-    month_ago = today - timedelta(days=30)
-    week_ago = today - timedelta(days=7)
 
-    # Umumiy statistika
-    total_orders = Order.objects.count()
-    pending_orders = Order.objects.filter(status="pending").count()
-    total_revenue = (
-        Order.objects.filter(status="delivered").aggregate(
-            total=Sum("total")
-        )["total"]
-        or 0
-    )
-    month_revenue = (
-        Order.objects.filter(
-            status="delivered", created_at__gte=month_ago
-        ).aggregate(total=Sum("total"))["total"]
-        or 0
-    )
+def invalidate_dashboard(**kwargs):
+    """Keshni o'chirish; signal receiver sifatida ham ishlatiladi."""
+    transaction.on_commit(lambda: cache.delete(DASHBOARD_CACHE_KEY))
 
-    total_users = TelegramUser.objects.filter(is_active=True).count()
-    new_users_week = TelegramUser.objects.filter(created_at__gte=week_ago).count()
 
-    total_products = Product.objects.filter(is_active=True).count()
-    out_of_stock = Product.objects.filter(is_active=True, in_stock=False).count()
-    active_carts = Cart.objects.filter(items__isnull=False).distinct().count()
+def collect_dashboard_stats():
+    now = timezone.now()
+    month_start = timezone.localdate(now - timedelta(days=30))
+    week_ago = now - timedelta(days=7)
 
-    # So'nggi buyurtmalar
-    recent_orders = Order.objects.select_related("user").order_by("-created_at")[:5]
+    # Buyurtmalar soni va tushum — kunlik yig'indidan
+    sales = DailySales.objects.aggregate(
+        total_orders=Sum("orders_count"),
+        total_revenue=Sum("revenue", filter=Q(bucket="delivered")),
+        month_revenue=Sum("revenue", filter=Q(bucket="delivered", day__gte=month_start)),
+    )
+    users = TelegramUser.objects.aggregate(
+        total=Count("pk", filter=Q(is_active=True)),
+        new_week=Count("pk", filter=Q(created_at__gte=week_ago)),
+    )
+    products = Product.objects.filter(is_active=True).aggregate(
+        total=Count("pk"),
+        out_of_stock=Count("pk", filter=Q(in_stock=False)),
+    )
+    # Savat jadvaliga JOIN'siz — elementi bor savatlar
+    active_carts = CartItem.objects.aggregate(count=Count("cart", distinct=True))["count"]
+
+    # Kutilayotganlar soni va so'nggi buyurtmalar
+    pending_orders = Order.objects.filter(status="pending").count()
+    recent_orders = list(
+        Order.objects.order_by("-created_at").values(
+            "id", "status", "total", "created_at", "user__first_name"
+        )[:5]
+    )
 
-    # Top mahsulotlar (buyurtma soni bo'yicha)
-    top_products = Product.objects.filter(
-        is_active=True,
-        orderitem__isnull=False,
-    ).annotate(
-        order_count=Count("orderitem")
-    ).order_by("-order_count")[:5]
+    # Top mahsulotlar (buyurtma elementlari soni bo'yicha)
+    top_products = list(
+        OrderItem.objects.filter(product__is_active=True)
+        .values("product_id")
+        .annotate(order_count=Count("pk"))
+        .values("product_id", "product__name", "product__price", "order_count")
+        .order_by("-order_count")[:5]
+    )
 
-    context.update({
-        "total_orders": total_orders,
+    return {
+        "total_orders": sales["total_orders"] or 0,
         "pending_orders": pending_orders,
-        "total_revenue": f"{total_revenue:,.0f}",
-        "month_revenue": f"{month_revenue:,.0f}",
-        "total_users": total_users,
-        "new_users_week": new_users_week,
-        "total_products": total_products,
-        "out_of_stock": out_of_stock,
+        "total_revenue": f"{sales['total_revenue'] or 0:,.0f}",
+        "month_revenue": f"{sales['month_revenue'] or 0:,.0f}",
+        "total_users": users["total"],
+        "new_users_week": users["new_week"],
+        "total_products": products["total"],
+        "out_of_stock": products["out_of_stock"],
         "active_carts": active_carts,
-        "recent_orders": recent_orders,
-        "top_products": top_products,
-    })
+        # Shablon `order.user.first_name`, `product.name` ko'rinishida o'qiydi
+        "recent_orders": [
+            {
+                "id": order["id"], "status": order["status"], "total": order["total"],
+                "created_at": order["created_at"], "user": {"first_name": order["user__first_name"]},
+            }
+            for order in recent_orders
+        ],
+        "top_products": [
+            {"id": row["product_id"], "name": row["product__name"], "price": row["product__price"],
+             "order_count": row["order_count"]}
+            for row in top_products
+        ],
+    }
 
+
+def get_dashboard_callback(request, context):
+    stats = cache.get(DASHBOARD_CACHE_KEY)
+    if stats is None:
+        stats = collect_dashboard_stats()
+        cache.set(DASHBOARD_CACHE_KEY, stats, settings.DASHBOARD_CACHE_TIMEOUT)
+    context.update(stats)
     return context
@@ -0,0 +1,125 @@
+"""Umumiy pagination.
+
+Standart holatda — `PageNumberPagination` (count + page). So'rovda `cursor`
+parametri bo'lsa (birinchi sahifa uchun bo'sh `?cursor=`), keyset rejimi
+ishlaydi: `(tartib maydoni, id)` juftligi bo'yicha WHERE bilan keyingi
+sahifa olinadi — COUNT(*) va OFFSET yo'q, chuqur sahifalar ham tez.
+
+Keyset faqat view'ning `cursor_ordering_fields` ro'yxatidagi maydonlar
+bo'yicha ishlaydi (masalan, `-created_at`, `price`). Boshqa tartibda
+(masalan, qidiruv reytingi) oddiy sahifalashga qaytiladi.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Noto'g'ri cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = self._resolve_ordering(queryset, view)
+        if self.keyset is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        field, descending = self.keyset
+        cursor = self._decode_cursor(request, queryset.model)
+        reverse = bool(cursor and cursor["r"])
+
+        queryset = queryset.order_by(*self._order_by(field, descending, reverse))
+        if cursor:
+            queryset = queryset.filter(
+                self._after(field, descending, reverse, cursor["v"], cursor["id"])
+            )
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+        return Response({
+            "next": self._link(self.last_row, reverse=False) if self.has_next else None,
+            "previous": self._link(self.first_row, reverse=True) if self.has_previous else None,
+            "results": data,
+        })
+
+    # --- ichki yordamchilar ---
+
+    def _resolve_ordering(self, queryset, view):
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        if not ordering:
+            return None
+        first = ordering[0]
+        field = first.lstrip("-")
+        allowed = getattr(view, "cursor_ordering_fields", ["created_at"])
+        if field not in allowed:
+            return None
+        return field, first.startswith("-")
+
+    @staticmethod
+    def _order_by(field, descending, reverse):
+        desc = descending != reverse
+        return [f"-{field}" if desc else field, "-id" if reverse else "id"]
+
+    @staticmethod
+    def _after(field, descending, reverse, value, pk):
+        """(field, id) juftligi bo'yicha cursor'dan keyingi qatorlar sharti."""
+        desc = descending != reverse
+        op = "lt" if desc else "gt"
+        id_op = "lt" if reverse else "gt"
+        return Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{id_op}": pk})
+
+    def _decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param, "")
+        if not encoded:
+            return None
+        field, descending = self.keyset
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if cursor["o"] != ("-" if descending else "") + field:
+                raise ValueError
+            return {
+                "v": model._meta.get_field(field).to_python(cursor["v"]),
+                "id": int(cursor["id"]),
+                "r": bool(cursor["r"]),
+            }
+        except (binascii.Error, ValueError, ValidationError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _link(self, row, reverse):
+        field, descending = self.keyset
+        value = getattr(row, field)
+        payload = {
+            "o": ("-" if descending else "") + field,
+            "v": value.isoformat() if hasattr(value, "isoformat") else str(value),
+            "id": row.pk,
+            "r": 1 if reverse else 0,
+        }
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
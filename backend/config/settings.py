@@ -96,6 +96,34 @@ else:
         }
     }
 
+# Cache
+# Production: Redis (gunicorn worker'lari orasida umumiy), Development: LocMem
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Katalog javoblari keshi (soniya). Asosiy invalidatsiya — katalog versiyasi,
+# TTL faqat zaxira chora.
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", "600"))
+
+# Admin dashboard statistikasi keshi (soniya). Buyurtma/mahsulot/foydalanuvchi
+# qo'shilganda darhol yangilanadi; TTL savatlar va boshqa o'zgarishlar uchun.
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", "60"))
+
+# Sidebar badge sonlari keshi (soniya). Signal'lar bilan yangilanadi; TTL —
+# signal'siz o'zgarishlar uchun davriy qayta hisoblash.
+BADGE_CACHE_TIMEOUT = int(os.getenv("BADGE_CACHE_TIMEOUT", "300"))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -119,6 +147,18 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Rasm renditsiyalari (WebP/JPEG) uchun process pool hajmi; 0 — sinxron
+IMAGE_RENDITION_WORKERS = int(os.getenv("IMAGE_RENDITION_WORKERS", "2"))
+
+# Tashlab ketilgan savatlar: shuncha kun o'zgarmasa o'chiriladi
+# (`compact_abandoned_carts` buyrug'i yoki admin amali)
+CART_IDLE_DAYS = int(os.getenv("CART_IDLE_DAYS", "60"))
+CART_COMPACTION_BATCH_SIZE = int(os.getenv("CART_COMPACTION_BATCH_SIZE", "500"))
+
+# Checkout Idempotency-Key shuncha soat amal qiladi; eskilari e'tiborsiz
+# qoldiriladi va `purge_idempotency_keys` buyrug'i bilan o'chiriladi
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
 # Reverse proxy (nginx) TLS'ni tugatadi va X-Forwarded-Proto yuboradi.
 # Busiz Django so'rovni HTTP deb biladi va build_absolute_uri() rasm/fayl
 # URL'larini http:// bilan yasaydi — HTTPS sahifada ular mixed content
@@ -136,7 +176,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "config.pagination.KeysetPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -178,6 +218,7 @@ CORS_ALLOW_HEADERS = [
     "x-telegram-init-data",
     "x-bot-token",
     "x-telegram-user-id",
+    "if-match",  # savat batch sinxronlashi (versiya tekshiruvi)
 ]
 
 # Development uchun localhost origin larga ruxsat
@@ -194,6 +235,13 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 BOT_TOKEN = os.getenv("BOT_TOKEN", TELEGRAM_BOT_TOKEN)  # Notification uchun
 ADMIN_IDS = [int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip()]
 
+# Xabarnomalar navbati (`dispatch_notifications` worker'i)
+NOTIFICATION_CONCURRENCY = int(os.getenv("NOTIFICATION_CONCURRENCY", "8"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "8"))
+# Telegram cheklovlari: ~30 xabar/soniya umumiy, bitta chatga ~1 xabar/soniya
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+TELEGRAM_CHAT_INTERVAL = float(os.getenv("TELEGRAM_CHAT_INTERVAL", "1.0"))
+
 # Unfold Admin Configuration
 UNFOLD = {
     "SITE_TITLE": "Ziyora",
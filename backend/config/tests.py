@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.cart.models import Cart, CartItem
+from apps.orders.models import Order, OrderItem
+from apps.orders.rollup import rebuild
+from apps.orders.transitions import transition_orders
+from apps.orders.utils import get_pending_orders_count
+from apps.products.models import Category, Product
+from apps.products.utils import get_products_count
+from apps.users.models import TelegramUser
+from apps.users.utils import get_users_count
+from config.dashboard import DASHBOARD_CACHE_KEY, collect_dashboard_stats, get_dashboard_callback
+
+
+class DashboardStatsTest(TestCase):
+    def setUp(self):
+        cache.delete(DASHBOARD_CACHE_KEY)
+        self.user = TelegramUser.objects.create(telegram_id=919191, first_name="Panel")
+        category = Category.objects.create(name="Teri", slug="teri")
+        self.product = Product.objects.create(name="Krem", price=Decimal("50000"), category=category)
+        Product.objects.create(name="Tugagan", price=Decimal("1000"), category=category, in_stock=False)
+        for status in ("pending", "delivered"):
+            order = Order.objects.create(user=self.user, phone="+998901234567", status=status)
+            OrderItem.objects.create(order=order, product=self.product, quantity=2, price=Decimal("50000"))
+            order.calculate_total()
+        rebuild()
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1, size="M")
+
+    def test_stats_one_query_per_table(self):
+        # yig'indi, foydalanuvchilar, mahsulotlar, savat elementlari,
+        # kutilayotganlar, so'nggi buyurtmalar, top mahsulotlar
+        with self.assertNumQueries(7):
+            stats = collect_dashboard_stats()
+        self.assertEqual(stats["total_orders"], 2)
+        self.assertEqual(stats["pending_orders"], 1)
+        self.assertEqual(stats["total_revenue"], "100,000")
+        self.assertEqual(stats["total_users"], 1)
+        self.assertEqual(stats["new_users_week"], 1)
+        self.assertEqual(stats["total_products"], 2)
+        self.assertEqual(stats["out_of_stock"], 1)
+        self.assertEqual(stats["active_carts"], 1)
+        self.assertEqual(stats["recent_orders"][0]["user"]["first_name"], "Panel")
+        self.assertEqual(stats["top_products"][0]["name"], "Krem")
+        self.assertEqual(stats["top_products"][0]["order_count"], 2)
+
+    def test_cached_between_renders(self):
+        get_dashboard_callback(None, {})
+        with self.assertNumQueries(0):
+            context = get_dashboard_callback(None, {})
+        self.assertEqual(context["total_orders"], 2)
+
+    @override_settings(BOT_TOKEN="")
+    def test_invalidated_on_commit(self):
+        get_dashboard_callback(None, {})
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_orders(Order.objects.filter(status="pending"), "confirmed")
+        self.assertIsNone(cache.get(DASHBOARD_CACHE_KEY))
+        get_dashboard_callback(None, {})
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name="Yangi", price=Decimal("1000"), category=self.product.category)
+        self.assertEqual(get_dashboard_callback(None, {})["total_products"], 3)
+
+    def test_admin_index_renders(self):
+        User.objects.create_superuser(username="admin", password="pass12345", email="a@a.uz")
+        self.client.login(username="admin", password="pass12345")
+        response = self.client.get("/admin/")
+        self.assertContains(response, "Panel")
+        self.assertContains(response, "Krem")
+
+
+class SidebarBadgeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = TelegramUser.objects.create(telegram_id=929292, first_name="Badge")
+        Order.objects.create(user=self.user, phone="+998901234567")
+
+    def test_badges_served_from_cache(self):
+        self.assertEqual(get_pending_orders_count(None), 1)
+        self.assertEqual(get_users_count(None), 1)
+        get_products_count(None)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pending_orders_count(None), 1)
+            self.assertEqual(get_users_count(None), 1)
+            self.assertEqual(get_products_count(None), 0)
+
+    def test_signals_refresh_after_commit(self):
+        get_pending_orders_count(None)
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(user=self.user, phone="+998901234567")
+        self.assertEqual(get_pending_orders_count(None), 2)
+        get_users_count(None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(get_users_count(None), 0)
+
+    def test_auth_refresh_keeps_user_badge(self):
+        get_users_count(None)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            TelegramUser.objects.update_or_create(telegram_id=929292, defaults={"first_name": "Yangi"})
+        self.assertEqual(callbacks, [])
+
+    def test_admin_pages_skip_counts(self):
+        User.objects.create_superuser(username="admin", password="pass12345", email="a@a.uz")
+        self.client.login(username="admin", password="pass12345")
+        def pending_counts():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get("/admin/users/telegramuser/")
+            return [q["sql"] for q in queries if "COUNT(*)" in q["sql"] and "'pending'" in q["sql"]]
+
+        self.assertEqual(len(pending_counts()), 1)
+        self.assertEqual(pending_counts(), [])
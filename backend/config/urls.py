@@ -3,11 +3,12 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from apps.orders.report_views import financial_report_view
+from apps.orders.report_views import financial_report_view, financial_series_view
 
 urlpatterns = [
     # Admin include'dan OLDIN — aks holda admin/ uni ushlab qoladi
     path("admin/hisobot/", financial_report_view, name="financial_report"),
+    path("admin/hisobot/series/", financial_series_view, name="financial_series"),
     path("admin/", admin.site.urls),
     path("api/", include("apps.products.urls")),
     path("api/", include("apps.orders.urls")),
@@ -58,8 +58,8 @@ def format_order_message(order: dict) -> str:
     items = order.get("items", [])
     items_text = ""
     for item in items[:5]:
-        product = item.get("product", {})
-        name = product.get("name", "Noma'lum")
+        # Tarix javobida muzlatilgan nom; eski shaklda — ichki product
+        name = item.get("product_name") or item.get("product", {}).get("name", "Noma'lum")
         qty = item.get("quantity", 1)
         price = f"{int(float(item.get('price', 0))):,}".replace(",", " ")
         items_text += f"  \u2022 {name} x{qty} \u2014 {price} so'm\n"
@@ -38,3 +38,26 @@ export async function clearCartApi(): Promise<Cart> {
   const { data } = await apiClient.delete("/cart/clear/");
   return data;
 }
+
+export type CartOperation =
+  | { op: "add"; product_id: number; quantity?: number; size?: string }
+  | { op: "set"; product_id: number; quantity: number; size?: string }
+  | { op: "remove"; product_id: number; size?: string };
+
+export interface CartBatchResult extends Cart {
+  skipped: { index: number; error: string }[];
+}
+
+// Bitta batch so'rovdagi amallar chegarasi (CartBatchSerializer.max_length)
+export const CART_BATCH_LIMIT = 100;
+
+// Bir nechta o'zgarish — bitta so'rov va bitta tranzaksiyada.
+// `version` berilsa If-Match yuboriladi: savat shu orada o'zgargan bo'lsa — 412
+export async function batchCart(
+  operations: CartOperation[],
+  version?: number
+): Promise<CartBatchResult> {
+  const headers = version === undefined ? {} : { "If-Match": `"v${version}"` };
+  const { data } = await apiClient.post("/cart/batch/", { operations }, { headers });
+  return data;
+}
@@ -1,5 +1,5 @@
 import apiClient from "./client";
-import type { Order, CartItem, PaymentMethod } from "../../types";
+import type { Order, OrderSummary, CartItem, PaymentMethod } from "../../types";
 
 export interface CreateOrderData {
   items: {
@@ -15,12 +15,17 @@ export interface CreateOrderData {
 }
 
 export interface OrdersResponse {
-  orders: Order[];
+  orders: OrderSummary[];
   next: string | null;
 }
 
-export async function createOrder(data: CreateOrderData): Promise<Order> {
-  const response = await apiClient.post<Order>("/orders/", data);
+export async function createOrder(
+  data: CreateOrderData,
+  idempotencyKey?: string,
+): Promise<Order> {
+  const response = await apiClient.post<Order>("/orders/", data, {
+    headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
+  });
   return response.data;
 }
 
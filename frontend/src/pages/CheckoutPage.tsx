@@ -1,4 +1,4 @@
-import { useState, useEffect, useMemo } from "react";
+import { useState, useEffect, useMemo, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { motion } from "framer-motion";
 import {
@@ -40,6 +40,7 @@ export function CheckoutPage() {
   const [isLoading, setIsLoading] = useState(false);
   const [isSuccess, setIsSuccess] = useState(false);
   const [orderId, setOrderId] = useState<number | null>(null);
+  const attemptRef = useRef<{ signature: string; key: string } | null>(null);
 
   const [regions, setRegions] = useState<DeliveryRegion[]>([]);
   const [regionId, setRegionId] = useState<number | null>(null);
@@ -130,15 +131,24 @@ export function CheckoutPage() {
 
     setIsLoading(true);
 
+    const payload = {
+      items: prepareOrderItems(items),
+      phone: phone.trim(),
+      delivery_address: address.trim() || undefined,
+      delivery_zone_id: zoneId,
+      comment: comment.trim() || undefined,
+      payment_method: paymentMethod,
+    };
+    // Bir xil buyurtmani qayta yuborish (tarmoq xatosi) bitta kalit bilan —
+    // server ikkinchi buyurtma yaratmaydi
+    const signature = JSON.stringify(payload);
+    if (attemptRef.current?.signature !== signature) {
+      attemptRef.current = { signature, key: crypto.randomUUID() };
+    }
+
     try {
-      const order = await createOrder({
-        items: prepareOrderItems(items),
-        phone: phone.trim(),
-        delivery_address: address.trim() || undefined,
-        delivery_zone_id: zoneId,
-        comment: comment.trim() || undefined,
-        payment_method: paymentMethod,
-      });
+      const order = await createOrder(payload, attemptRef.current.key);
+      attemptRef.current = null;
 
       setOrderId(order.id);
       setIsSuccess(true);
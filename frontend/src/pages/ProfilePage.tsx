@@ -28,7 +28,7 @@ import { useUserStore } from "../stores/userStore";
 import { toast } from "../stores/toastStore";
 import { getOrders, getOrdersByUrl } from "../lib/api/orders";
 import { formatPrice } from "../lib/utils";
-import type { Order, OrderStatus } from "../types";
+import type { OrderSummary, OrderStatus } from "../types";
 
 const STATUS_CONFIG: Record<
   OrderStatus,
@@ -50,7 +50,7 @@ const LANGUAGE_LABELS: Record<string, string> = {
 export function ProfilePage() {
   const navigate = useNavigate();
   const [cartOpen, setCartOpen] = useState(false);
-  const [orders, setOrders] = useState<Order[]>([]);
+  const [orders, setOrders] = useState<OrderSummary[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [nextOrdersPage, setNextOrdersPage] = useState<string | null>(null);
@@ -280,11 +280,8 @@ export function ProfilePage() {
                         {order.items.slice(0, 4).map((item) => (
                           <img
                             key={item.id}
-                            src={
-                              item.product.images[0]?.image ||
-                              "/placeholder.svg"
-                            }
-                            alt={item.product.name}
+                            src={item.product_image || "/placeholder.svg"}
+                            alt={item.product_name}
                             className="w-12 h-12 rounded-lg object-cover shrink-0"
                           />
                         ))}
@@ -126,22 +126,22 @@ export const useCartStore = create<CartState>()(
           if (cart.items && cart.items.length > 0) {
             set({ items: cart.items });
           } else {
-            // Backend bo'sh — local items ni backend ga yuborish
-            const localItems = get().items;
-            for (const item of localItems) {
-              try {
-                await cartApi.addToCart(
-                  item.product.id,
-                  item.quantity,
-                  item.size || ""
-                );
-              } catch {
-                // skip
-              }
-            }
-            // Qayta olish
-            if (localItems.length > 0) {
-              const updated = await cartApi.getCart();
+            // Backend bo'sh — local items ni batch so'rovlar bilan yuborish
+            // (har birida ko'pi bilan CART_BATCH_LIMIT ta amal). Har bo'lak
+            // oldingisi qaytargan versiya bilan (If-Match) yuboriladi.
+            const operations = get().items.map((item) => ({
+              op: "add" as const,
+              product_id: item.product.id,
+              quantity: Math.min(item.quantity, 99),
+              size: item.size || "",
+            }));
+            let version = cart.version;
+            for (let i = 0; i < operations.length; i += cartApi.CART_BATCH_LIMIT) {
+              const updated = await cartApi.batchCart(
+                operations.slice(i, i + cartApi.CART_BATCH_LIMIT),
+                version
+              );
+              version = updated.version;
               if (updated.items && updated.items.length > 0) {
                 set({ items: updated.items });
               }
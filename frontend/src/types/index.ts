@@ -80,6 +80,7 @@ export interface Cart {
   items: CartItem[];
   total: number;
   items_count: number;
+  version?: number;
 }
 
 export interface User {
@@ -136,6 +137,26 @@ export interface OrderItem {
   size?: string;
 }
 
+// Buyurtmalar tarixi (`GET /orders/`): buyurtma paytidagi nom va rasm
+export interface OrderHistoryItem {
+  id: number;
+  product_id: number;
+  product_name: string;
+  product_image: string | null;
+  quantity: number;
+  price: number;
+  size?: string;
+  subtotal: number;
+}
+
+export interface OrderSummary
+  extends Omit<
+    Order,
+    "user" | "items" | "delivery_zone" | "phone" | "delivery_address" | "comment"
+  > {
+  items: OrderHistoryItem[];
+}
+
 export type OrderStatus =
   | "pending"
   | "confirmed"